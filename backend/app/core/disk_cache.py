@@ -0,0 +1,178 @@
+"""LRUディスクキャッシュ（ASR結果キャッシュ・要約結果キャッシュの共通実装）
+
+- 保存先: {cache_dir}/{キー先頭2文字}/{キー}.json
+- キー → ファイルサイズの索引をメモリに持ち、保存・統計のたびにディレクトリを走査しない
+  （起動時に一度だけ走査し、最終アクセス時刻順に索引を復元する）
+- 合計サイズ（max_bytes）または件数（max_entries）が上限を超えたら、
+  最も長く使われていないエントリから削除する
+- 複数のワーカープロセスで同じディレクトリを共有できる。他のプロセスが保存したエントリは、
+  索引に無いキーの取得時にファイルを確認して索引に取り込む。削除は各プロセスが自分の索引に
+  ある分だけ行うため、ディレクトリ全体では上限をプロセス数倍まで超えることがある
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class DiskLruCache:
+    """サイズ・件数上限付きのLRUディスクキャッシュ（スレッドセーフ）"""
+
+    # ログに出すキャッシュの名前
+    label = "ディスクキャッシュ"
+
+    def __init__(
+        self, cache_dir: str, max_bytes: int | None = None, max_entries: int | None = None
+    ):
+        """
+        Args:
+            cache_dir: キャッシュディレクトリ
+            max_bytes: キャッシュ全体の最大サイズ（バイト、Noneは無制限）
+            max_entries: キャッシュする最大件数（Noneは無制限）
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # キー → ファイルサイズ（古い順）
+        self._entries: OrderedDict[str, int] = OrderedDict()
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self._load_index()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _load_index(self) -> None:
+        """既存のキャッシュファイルを最終アクセス時刻順に読み込む"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        found = []
+        for root, _dirs, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                found.append((stat.st_mtime, name[:-5], stat.st_size))
+
+        for _mtime, key, size in sorted(found):
+            self._entries[key] = size
+            self._total_bytes += size
+        self._evict()
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """キャッシュされた結果を取得する
+
+        Args:
+            key: キャッシュキー
+
+        Returns:
+            保存された結果（キャッシュに無い場合はNone）
+        """
+        path = self._path(key)
+        with self._lock:
+            try:
+                with open(path, encoding="utf-8") as f:
+                    result = json.load(f)
+                # 最終アクセス時刻（再起動後のLRU順の復元に使用）を更新
+                os.utime(path)
+                size = os.path.getsize(path)
+            except FileNotFoundError:
+                # 他のプロセスが削除した（または保存していない）
+                self._forget(key)
+                self.misses += 1
+                return None
+            except (OSError, ValueError) as e:
+                logger.warning("%sの読み込みに失敗: %s", self.label, e)
+                self._remove(key)
+                self.misses += 1
+                return None
+
+            # 他のプロセスが保存したエントリは、ここで索引に取り込む
+            self._forget(key)
+            self._entries[key] = size
+            self._total_bytes += size
+            self.hits += 1
+            self._evict()
+            return result
+
+    def put(self, key: str, result: dict[str, Any]) -> None:
+        """結果をキャッシュに保存する
+
+        Args:
+            key: キャッシュキー
+            result: 保存する結果（JSONに変換できる辞書）
+        """
+        data = json.dumps(result, ensure_ascii=False).encode("utf-8")
+        path = self._path(key)
+        with self._lock:
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                # 一時ファイル名はプロセスごとに分け、同じキーの同時保存で壊れないようにする
+                temp_path = f"{path}.{os.getpid()}.tmp"
+                with open(temp_path, "wb") as f:
+                    f.write(data)
+                os.replace(temp_path, path)
+            except OSError as e:
+                logger.warning("%sの保存に失敗: %s", self.label, e)
+                return
+
+            self._forget(key)
+            self._entries[key] = len(data)
+            self._total_bytes += len(data)
+            self.stores += 1
+            self._evict()
+
+    def _forget(self, key: str) -> None:
+        """エントリを索引から外す（ファイルは残す、ロック内で呼ぶ）"""
+        size = self._entries.pop(key, None)
+        if size is not None:
+            self._total_bytes -= size
+
+    def _remove(self, key: str) -> None:
+        """エントリを削除する（ロック内で呼ぶ）"""
+        self._forget(key)
+        try:
+            os.unlink(self._path(key))
+        except OSError:
+            pass
+
+    def _over_limit(self) -> bool:
+        if self.max_bytes is not None and self._total_bytes > self.max_bytes:
+            return True
+        return self.max_entries is not None and len(self._entries) > self.max_entries
+
+    def _evict(self) -> None:
+        """合計サイズ・件数が上限以下になるまで古いエントリを削除する（ロック内で呼ぶ）"""
+        while self._entries and self._over_limit():
+            key = next(iter(self._entries))
+            self._remove(key)
+            self.evictions += 1
+
+    def stats(self) -> dict[str, Any]:
+        """キャッシュの統計情報（ヒット率など）を返す"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "stores": self.stores,
+                "evictions": self.evictions,
+            }
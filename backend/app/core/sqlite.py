@@ -0,0 +1,38 @@
+"""SQLiteの共通ユーティリティ
+
+複数ワーカー（uvicorn --workers）から同じDBファイルを共有するための接続設定をまとめる。
+"""
+from __future__ import annotations
+
+import os
+import sqlite3
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+
+@contextmanager
+def connect(path: str, busy_timeout_ms: int = 5000) -> Iterator[sqlite3.Connection]:
+    """SQLiteに接続する（withブロックを抜けると接続を閉じる）
+
+    WALモードで開き、他プロセスのロック待ちを busy_timeout_ms ミリ秒まで許容する。
+    接続はスレッド間で共有せず、呼び出しごとに開閉する。
+
+    Args:
+        path: DBファイルのパス
+        busy_timeout_ms: ロック待ちのタイムアウト（ミリ秒）
+
+    Yields:
+        SQLite接続（autocommitモード、行はsqlite3.Row）
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    conn = sqlite3.connect(path, timeout=busy_timeout_ms / 1000, isolation_level=None)
+    try:
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA busy_timeout={int(busy_timeout_ms)}")
+        yield conn
+    finally:
+        conn.close()
@@ -10,15 +10,29 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from .core.exceptions import AppError
+from .meeting_summarizer.cache import get_summary_cache
 from .routers import (
-    meetings_router,
-    transcripts_router,
-    summaries_router,
     decisions_router,
+    events_router,
+    jobs_router,
+    meetings_router,
     parking_router,
     slack_router,
+    summaries_router,
+    transcripts_router,
 )
+from .services.ai_deviation import ai_deviation_service
+from .services.asr_cache import get_asr_cache
+from .services.deviation import get_deviation_stats
+from .services.deviation_cache import get_deviation_cache
+from .services.deviation_pipeline import register_deviation_jobs
+from .services.job_queue import get_job_queue
+from .services.meeting_scheduler import get_scheduler
+from .services.parking_titles import register_parking_jobs
+from .services.summary_service import register_summary_jobs
+from .services.transcription import register_transcription_jobs
 from .settings import settings
+from .storage import DataStore
 
 logger = logging.getLogger(__name__)
 
@@ -27,8 +41,18 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     """アプリケーションのライフサイクル管理"""
     logger.info("Starting up Facilitation AI PoC API...")
+    job_queue = get_job_queue()
+    register_summary_jobs(job_queue, DataStore(settings.data_dir))
+    register_transcription_jobs(job_queue, DataStore(settings.data_dir))
+    register_deviation_jobs(job_queue, DataStore(settings.data_dir))
+    register_parking_jobs(job_queue, DataStore(settings.data_dir))
+    await job_queue.start()
+    scheduler = get_scheduler()
+    await scheduler.start()
     yield
     logger.info("Shutting down Facilitation AI PoC API...")
+    await scheduler.shutdown()
+    await job_queue.shutdown()
 
 
 # 外部公開のベースパス。環境変数が無ければ /backend-api を既定にする
@@ -87,9 +111,40 @@ app.include_router(summaries_router)
 app.include_router(decisions_router)
 app.include_router(parking_router)
 app.include_router(slack_router)
+app.include_router(jobs_router)
+app.include_router(events_router)
 
 
 @app.get("/health")
 def health():
     """ヘルスチェックエンドポイント"""
     return {"ok": True}
+
+
+@app.get("/metrics/asr-cache")
+def asr_cache_metrics():
+    """ASR結果キャッシュの統計情報（ヒット率など）"""
+    cache = get_asr_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+@app.get("/metrics/summary-cache")
+def summary_cache_metrics():
+    """要約結果キャッシュの統計情報（ヒット率など）"""
+    cache = get_summary_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+@app.get("/metrics/deviation")
+def deviation_metrics():
+    """脱線検知の統計情報（LLM呼び出し回数・ローカル判定で省略した回数・結果キャッシュのヒット率・LLMの使用量）"""
+    return {
+        **get_deviation_stats(),
+        "cache": get_deviation_cache().stats(),
+        "llm_usage": ai_deviation_service.get_usage_stats(),
+        "llm_batch": ai_deviation_service.get_batch_stats(),
+    }
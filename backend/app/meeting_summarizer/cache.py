@@ -0,0 +1,72 @@
+"""要約結果キャッシュ（前処理済みテキストのハッシュをキーにしたディスクキャッシュ）
+
+会議終了時の最終要約ジョブ、要約API（/summary/generate など）、会議中のスケジューラーが
+同じ文字起こしを続けて要約することがあるため、要約結果を保存して再利用する。
+
+- キー: 前処理済みテキストのsha256 + プロンプトのバージョン + デプロイメント + チャンク分割の設定
+  （プロンプトのバージョンはプロンプトとスキーマのハッシュのため、プロンプトを変更すると別のキーになる）
+- 保存先: {summary_cache_dir}/{キー先頭2文字}/{キー}.json（複数のワーカープロセスで共有する）
+- 件数が summary_cache_max_entries を超えたら、最も長く使われていないエントリから削除する
+  （LRU、実装は app/core/disk_cache.py）
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+
+from ..core.disk_cache import DiskLruCache
+from ..settings import settings
+
+
+def make_cache_key(text: str, prompt_version: str, deployment: str) -> str:
+    """キャッシュキーを作成する
+
+    Args:
+        text: 前処理済みのテキスト
+        prompt_version: プロンプトのバージョン
+        deployment: 要約に使うモデルのデプロイメント
+
+    Returns:
+        キャッシュキー（sha256の16進文字列）
+    """
+    text_digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    # チャンク分割・タイムゾーンの設定が変わると要約結果も変わるため、キーに含める
+    material = "|".join([
+        text_digest,
+        prompt_version,
+        deployment,
+        str(settings.summary_chunk_max_tokens),
+        str(settings.summary_chunk_overlap_tokens),
+        settings.summary_tokenizer_encoding,
+        settings.default_timezone,
+    ])
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class SummaryCache(DiskLruCache):
+    """件数上限付きの要約結果キャッシュ"""
+
+    label = "要約キャッシュ"
+
+    def __init__(self, cache_dir: str, max_entries: int):
+        """
+        Args:
+            cache_dir: キャッシュディレクトリ
+            max_entries: キャッシュする要約の最大件数
+        """
+        super().__init__(cache_dir, max_entries=max_entries)
+
+
+# シングルトンインスタンス
+_summary_cache: SummaryCache | None = None
+
+
+def get_summary_cache() -> SummaryCache | None:
+    """要約結果キャッシュのシングルトンインスタンスを取得（無効の場合はNone）"""
+    global _summary_cache
+    if not settings.summary_cache_enabled:
+        return None
+    if _summary_cache is None:
+        cache_dir = settings.summary_cache_dir or os.path.join(settings.data_dir, "summary_cache")
+        _summary_cache = SummaryCache(cache_dir, settings.summary_cache_max_entries)
+    return _summary_cache
@@ -6,6 +6,7 @@
 import re
 from typing import Optional
 
+from .tokenizer import chunk_by_tokens, estimate_token_count  # noqa: F401
 
 # フィラー・ノイズパターン（日本語ASR向け）
 FILLER_PATTERNS = [
@@ -56,90 +57,22 @@ def preprocess_asr_text(asr_text: str, keep_noise: bool = False) -> str:
     return text.strip()
 
 
-def estimate_token_count(text: str) -> int:
-    """テキストのトークン数を概算する
-    
-    正確なトークン数算出にはtiktokenが必要だが、簡易版として
-    日本語では1文字≈1-2トークン、英語では1単語≈1.3トークンと仮定。
-    
-    Args:
-        text: 対象テキスト
-        
-    Returns:
-        概算トークン数
-    """
-    # 日本語文字数（ひらがな・カタカナ・漢字）
-    japanese_chars = len(re.findall(r'[\u3040-\u309F\u30A0-\u30FF\u4E00-\u9FFF]', text))
-    # その他文字数（英数字・記号等）
-    other_chars = len(text) - japanese_chars
-    # 英単語数の概算（スペース区切り）
-    words = len(text.split())
-    
-    # 概算: 日本語1文字≈1.5トークン、英単語≈1.3トークン
-    estimated = int(japanese_chars * 1.5 + max(other_chars, words) * 1.3)
-    return max(estimated, len(text) // 4)  # 最低でも4文字=1トークン
-
-
-def split_text_into_chunks(text: str, max_tokens_per_chunk: int = 8000) -> list[str]:
+def split_text_into_chunks(
+    text: str,
+    max_tokens_per_chunk: int = 8000,
+    overlap_tokens: int = 0,
+) -> list[str]:
     """テキストを指定トークン数以下のチャンクに分割する
     
     段落・改行を優先的に分割点とし、自然な位置で分ける。
+    トークン数は tiktoken で数える（使えない環境では概算）。
     
     Args:
         text: 対象テキスト
         max_tokens_per_chunk: チャンクあたりの最大トークン数
+        overlap_tokens: 前のチャンクの末尾から次のチャンクの先頭に含めるトークン数
         
     Returns:
         分割されたテキストのリスト
     """
-    if estimate_token_count(text) <= max_tokens_per_chunk:
-        return [text]
-    
-    chunks: list[str] = []
-    current_chunk: list[str] = []
-    current_tokens = 0
-    
-    # 段落単位で分割（空行区切り）
-    paragraphs = text.split('\n\n')
-    
-    for para in paragraphs:
-        para_tokens = estimate_token_count(para)
-        
-        # 1段落が最大トークンを超える場合は行単位で分割
-        if para_tokens > max_tokens_per_chunk:
-            if current_chunk:
-                chunks.append('\n\n'.join(current_chunk))
-                current_chunk = []
-                current_tokens = 0
-            
-            # 行単位で分割
-            lines = para.split('\n')
-            for line in lines:
-                line_tokens = estimate_token_count(line)
-                if current_tokens + line_tokens > max_tokens_per_chunk:
-                    if current_chunk:
-                        chunks.append('\n\n'.join(current_chunk))
-                    current_chunk = [line]
-                    current_tokens = line_tokens
-                else:
-                    current_chunk.append(line)
-                    current_tokens += line_tokens
-        else:
-            # 段落を追加できるか確認
-            if current_tokens + para_tokens > max_tokens_per_chunk:
-                # 現在のチャンクを確定
-                if current_chunk:
-                    chunks.append('\n\n'.join(current_chunk))
-                current_chunk = [para]
-                current_tokens = para_tokens
-            else:
-                current_chunk.append(para)
-                current_tokens += para_tokens
-    
-    # 最後のチャンクを追加
-    if current_chunk:
-        chunks.append('\n\n'.join(current_chunk))
-    
-    return chunks
-
-
+    return chunk_by_tokens(text, max_tokens_per_chunk, overlap_tokens)
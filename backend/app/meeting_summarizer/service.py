@@ -1,22 +1,25 @@
 """会議要約サービス
 
 Azure AI Foundry Responses APIを使用してASRテキストから会議要約を生成。
-長文の場合はチャンク分割・統合を実施。
+長文の場合はチャンク分割し、チャンクごとの要約を並列に生成（map）してから階層的に統合（reduce）する。
 """
 
+import hashlib
 import json
 import logging
 import time
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from typing import Optional
 from zoneinfo import ZoneInfo
 
 import httpx
 from pydantic import ValidationError
 
 from ..settings import settings
-from .schema import MeetingSummaryOutput, ActionItem, MEETING_SUMMARY_JSON_SCHEMA
+from .cache import get_summary_cache, make_cache_key
 from .preprocess import preprocess_asr_text, split_text_into_chunks
+from .schema import MEETING_SUMMARY_JSON_SCHEMA, ActionItem, MeetingSummaryOutput
 
 logger = logging.getLogger(__name__)
 
@@ -77,11 +80,41 @@ ASR特有のフィラー（「えー」「あのー」）、言い直し、誤
 - 読み手（会議参加者や関係者）が「次に何をすべきか」を理解できるように記載
 - 主旨を見抜き、核心的な情報を優先的に記載"""
 
+# 部分要約の統合（reduce）用システムプロンプト
+REDUCE_SYSTEM_PROMPT = """あなたは会議メモの要約器です。入力は、長い会議を時系列順に分割して個別に要約した「部分要約」のJSONです。
+
+## タスク
+「【部分要約 n/N】」として与えられる複数の部分要約を、1つの会議要約に統合してください。
+
+## 統合ルール
+- 部分要約の番号順が会議の時系列順です。流れや構成を変えないでください
+- 重複する内容は1つにまとめ、同じ事実を繰り返し記載しないでください
+- 前半で未決だった事項が後半で決定された場合、decisionsに含めてundecidedから除外してください
+- actionsは同じ内容を1つにまとめ、owner/dueが判明している方の値を採用してください
+- 部分要約に書かれていない情報を創作しないでください
+- summaryは標準的なMarkdown形式（「## 会議の主旨」「### 議論の要点」「### 結論」などの見出し、箇条書きは「- 」）で出力してください
+- 相対日付はデフォルトタイムゾーン（{timezone}）でISO-8601形式（YYYY-MM-DD）に変換してください
+
+## 出力形式
+厳格なJSON（余計なテキストやコードフェンス禁止）で summary / decisions / undecided / actions の4要素を返します。
+actionsの各要素は title, owner, due を含み、不明な場合は空文字列""としてください。"""
+
+
+# プロンプトのバージョン（要約結果キャッシュのキーに含め、プロンプト・スキーマの変更時にキャッシュを無効にする）
+PROMPT_VERSION = hashlib.sha256(
+    "\n".join([
+        SYSTEM_PROMPT,
+        REDUCE_SYSTEM_PROMPT,
+        json.dumps(MEETING_SUMMARY_JSON_SCHEMA, ensure_ascii=False, sort_keys=True),
+    ]).encode("utf-8")
+).hexdigest()[:16]
+
 
 def _call_responses_api(
     asr_text: str,
     timeout: int = 120,
-    max_retries: int = 3
+    max_retries: int = 3,
+    system_prompt_template: str = SYSTEM_PROMPT
 ) -> Optional[dict]:
     """Azure AI Foundry Responses APIを呼び出す
     
@@ -89,6 +122,7 @@ def _call_responses_api(
         asr_text: 前処理済みのASRテキスト
         timeout: タイムアウト秒数
         max_retries: 最大リトライ回数
+        system_prompt_template: システムプロンプト（{timezone}を含むテンプレート）
         
     Returns:
         レスポンスJSON（失敗時はNone）
@@ -104,7 +138,7 @@ def _call_responses_api(
         "api-key": settings.azure_openai_api_key
     }
     
-    system_prompt = SYSTEM_PROMPT.format(timezone=settings.default_timezone)
+    system_prompt = system_prompt_template.format(timezone=settings.default_timezone)
     
     payload = {
         "model": settings.azure_openai_deployment,
@@ -152,7 +186,8 @@ def _call_responses_api(
 def _call_chat_completions_fallback(
     asr_text: str,
     timeout: int = 120,
-    max_retries: int = 3
+    max_retries: int = 3,
+    system_prompt_template: str = SYSTEM_PROMPT
 ) -> Optional[dict]:
     """Chat Completions API（Azure OpenAI SDK）へのフォールバック
     
@@ -160,6 +195,7 @@ def _call_chat_completions_fallback(
         asr_text: 前処理済みのASRテキスト
         timeout: タイムアウト秒数
         max_retries: 最大リトライ回数
+        system_prompt_template: システムプロンプト（{timezone}を含むテンプレート）
         
     Returns:
         パース済みのJSON dict（失敗時はNone）
@@ -181,7 +217,7 @@ def _call_chat_completions_fallback(
         timeout=timeout
     )
     
-    system_prompt = SYSTEM_PROMPT.format(timezone=settings.default_timezone)
+    system_prompt = system_prompt_template.format(timezone=settings.default_timezone)
     
     # リトライループ
     for attempt in range(1, max_retries + 1):
@@ -368,24 +404,169 @@ def _merge_summaries(summaries: list[MeetingSummaryOutput]) -> MeetingSummaryOut
     )
 
 
+def _summarize_text(
+    text: str,
+    use_fallback: bool,
+    system_prompt_template: str = SYSTEM_PROMPT
+) -> Optional[MeetingSummaryOutput]:
+    """1回分のLLM呼び出しで要約を生成し、スキーマ検証する
+    
+    Responses APIを呼び出し、失敗時はChat Completionsへフォールバックする。
+    
+    Args:
+        text: 要約対象テキスト
+        use_fallback: Chat Completionsへのフォールバックを許可
+        system_prompt_template: システムプロンプト（{timezone}を含むテンプレート）
+        
+    Returns:
+        検証済みの要約（失敗時はNone）
+    """
+    response_data = _call_responses_api(text, system_prompt_template=system_prompt_template)
+    parsed_json: Optional[dict] = None
+    
+    if response_data:
+        parsed_json = _extract_json_from_response(response_data)
+    
+    # フォールバック: Chat Completions
+    if not parsed_json and use_fallback:
+        logger.info("Chat Completions APIへフォールバック...")
+        parsed_json = _call_chat_completions_fallback(
+            text, system_prompt_template=system_prompt_template
+        )
+    
+    if not parsed_json:
+        return None
+    
+    return _validate_and_parse_summary(parsed_json)
+
+
+def _map_chunks(
+    chunks: list[str],
+    use_fallback: bool,
+    verbose: bool
+) -> list[MeetingSummaryOutput]:
+    """各チャンクの要約を並列に生成する（map）
+    
+    並列数は settings.summary_max_concurrency で制限する。
+    結果はチャンクの順序（会議の時系列順）を保って返す。
+    
+    Args:
+        chunks: 分割済みテキストのリスト
+        use_fallback: Chat Completionsへのフォールバックを許可
+        verbose: 詳細ログを出力
+        
+    Returns:
+        成功したチャンクの要約リスト（時系列順）
+    """
+    total = len(chunks)
+    
+    def _run(index: int, chunk: str) -> Optional[MeetingSummaryOutput]:
+        if verbose:
+            logger.info(f"チャンク {index}/{total} を処理中...")
+        summary = _summarize_text(chunk, use_fallback)
+        if summary is None:
+            logger.error(f"チャンク {index} の要約生成に失敗しました")
+        elif verbose:
+            logger.info(f"チャンク {index} の要約完了")
+        return summary
+    
+    if total == 1:
+        results = [_run(1, chunks[0])]
+    else:
+        max_workers = max(1, min(settings.summary_max_concurrency, total))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(_run, range(1, total + 1), chunks))
+    
+    return [summary for summary in results if summary is not None]
+
+
+def _format_partial_summaries(summaries: list[MeetingSummaryOutput]) -> str:
+    """部分要約をreduce用の入力テキストに整形する
+    
+    Args:
+        summaries: 部分要約のリスト（時系列順）
+        
+    Returns:
+        「【部分要約 n/N】」見出し付きのJSONテキスト
+    """
+    total = len(summaries)
+    return "\n\n".join(
+        f"【部分要約 {i}/{total}】\n{s.model_dump_json()}"
+        for i, s in enumerate(summaries, start=1)
+    )
+
+
+def _reduce_summaries(
+    summaries: list[MeetingSummaryOutput],
+    use_fallback: bool,
+    verbose: bool
+) -> tuple[MeetingSummaryOutput, bool]:
+    """部分要約を階層的に統合する（reduce）
+    
+    settings.summary_reduce_fan_in 個ずつのグループをLLMで統合し、
+    1つになるまで繰り返す。各階層のグループは並列に処理する。
+    LLMでの統合に失敗したグループは _merge_summaries による簡易統合にフォールバックする。
+    
+    Args:
+        summaries: 部分要約のリスト（時系列順）
+        use_fallback: Chat Completionsへのフォールバックを許可
+        verbose: 詳細ログを出力
+        
+    Returns:
+        (統合された要約, 簡易統合にフォールバックしたグループがあったか)
+    """
+    fan_in = max(2, settings.summary_reduce_fan_in)
+    level = 1
+    degraded = False
+    
+    while len(summaries) > 1:
+        groups = [summaries[i:i + fan_in] for i in range(0, len(summaries), fan_in)]
+        if verbose:
+            logger.info(f"統合 階層{level}: {len(summaries)}個 → {len(groups)}個")
+        
+        def _reduce_group(group: list[MeetingSummaryOutput]) -> tuple[MeetingSummaryOutput, bool]:
+            if len(group) == 1:
+                return group[0], False
+            merged = _summarize_text(
+                _format_partial_summaries(group),
+                use_fallback,
+                system_prompt_template=REDUCE_SYSTEM_PROMPT
+            )
+            if merged is None:
+                logger.warning("部分要約のLLM統合に失敗したため、簡易統合にフォールバックします")
+                return _merge_summaries(group), True
+            return merged, False
+        
+        max_workers = max(1, min(settings.summary_max_concurrency, len(groups)))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(_reduce_group, groups))
+        summaries = [summary for summary, _ in results]
+        degraded = degraded or any(fell_back for _, fell_back in results)
+        level += 1
+    
+    return summaries[0], degraded
+
+
 def summarize_meeting(
     asr_text: str,
     keep_noise: bool = False,
     use_fallback: bool = True,
-    verbose: bool = False
+    verbose: bool = False,
+    use_cache: bool = True
 ) -> MeetingSummaryOutput:
     """会議ASRテキストから要約を生成する
     
-    1. ASRテキストの前処理
+    1. ASRテキストの前処理（前処理済みテキストの要約がキャッシュにあればそれを返す）
     2. 長文の場合はチャンク分割
-    3. 各チャンクに対してResponses API呼び出し（失敗時はChat Completionsへフォールバック）
-    4. 結果を統合してスキーマ検証
+    3. 各チャンクに対してResponses APIを並列に呼び出し（失敗時はChat Completionsへフォールバック）
+    4. 部分要約をLLMで階層的に統合
     
     Args:
         asr_text: 音声文字起こしテキスト
         keep_noise: フィラー削除を弱める場合True
         use_fallback: Chat Completionsへのフォールバックを許可
         verbose: 詳細ログを出力
+        use_cache: 要約結果キャッシュを使う場合True
         
     Returns:
         会議要約結果
@@ -407,50 +588,47 @@ def summarize_meeting(
         logger.info("ASRテキストを前処理中...")
     preprocessed = preprocess_asr_text(asr_text, keep_noise=keep_noise)
     
+    # 同じテキストを同じプロンプト・デプロイメントで要約済みであれば、その結果を返す
+    cache = get_summary_cache() if use_cache else None
+    cache_key = make_cache_key(preprocessed, PROMPT_VERSION, settings.azure_openai_deployment)
+    if cache is not None:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            try:
+                result = MeetingSummaryOutput.model_validate(cached)
+            except ValidationError as e:
+                logger.warning("キャッシュされた要約を読み込めないため、再生成します: %s", e)
+            else:
+                if verbose:
+                    logger.info("キャッシュされた要約を使用します（LLM呼び出しなし）")
+                return result
+    
     # チャンク分割
-    chunks = split_text_into_chunks(preprocessed, max_tokens_per_chunk=8000)
+    chunks = split_text_into_chunks(
+        preprocessed,
+        max_tokens_per_chunk=settings.summary_chunk_max_tokens,
+        overlap_tokens=settings.summary_chunk_overlap_tokens,
+    )
     if verbose:
         logger.info(f"テキストを{len(chunks)}個のチャンクに分割しました")
     
-    summaries: list[MeetingSummaryOutput] = []
-    
-    for i, chunk in enumerate(chunks, start=1):
-        if verbose:
-            logger.info(f"チャンク {i}/{len(chunks)} を処理中...")
-        
-        # Responses API呼び出し
-        response_data = _call_responses_api(chunk)
-        parsed_json: Optional[dict] = None
-        
-        if response_data:
-            parsed_json = _extract_json_from_response(response_data)
-        
-        # フォールバック: Chat Completions
-        if not parsed_json and use_fallback:
-            if verbose:
-                logger.info("Chat Completions APIへフォールバック...")
-            parsed_json = _call_chat_completions_fallback(chunk)
-        
-        if not parsed_json:
-            logger.error(f"チャンク {i} の要約生成に失敗しました")
-            continue
-        
-        # スキーマ検証
-        summary = _validate_and_parse_summary(parsed_json)
-        if summary:
-            summaries.append(summary)
-            if verbose:
-                logger.info(f"チャンク {i} の要約完了")
-        else:
-            logger.error(f"チャンク {i} のスキーマ検証に失敗しました")
+    # map: チャンクごとの要約を並列に生成（並列数は設定値で制限）
+    summaries = _map_chunks(chunks, use_fallback=use_fallback, verbose=verbose)
     
     if not summaries:
         raise ValueError("要約生成に失敗しました。APIレスポンスを確認してください。")
     
-    # 統合
-    if verbose:
-        logger.info("要約結果を統合中...")
-    final_summary = _merge_summaries(summaries)
+    # reduce: 部分要約を階層的に統合
+    if verbose and len(summaries) > 1:
+        logger.info(f"{len(summaries)}個の部分要約を統合中...")
+    final_summary, degraded = _reduce_summaries(summaries, use_fallback=use_fallback, verbose=verbose)
+    
+    # 一部のチャンクの要約や統合に失敗した（簡易統合にフォールバックした）結果は、
+    # 再実行で補えるようキャッシュしない
+    if cache is not None and len(summaries) == len(chunks) and not degraded:
+        cache.put(cache_key, final_summary.model_dump())
+    elif cache is not None:
+        logger.info("要約の一部に失敗したため、結果をキャッシュしません")
     
     if verbose:
         logger.info("要約生成完了")
@@ -0,0 +1,217 @@
+"""トークン数の計測とトークン数上限でのチャンク分割
+
+tiktoken のエンコーディング（settings.summary_tokenizer_encoding）をプロセスで1回だけ読み込み、
+正確なトークン数でチャンクに分割する。エンコーディングのファイルを取得できない環境
+（オフラインでキャッシュも無い場合など）では、文字種からの概算（estimate_token_count）を使う。
+
+チャンク分割は、テキストを行に分けて各行のトークン数を1回だけ数え、行を順に詰めていく。
+上限を超える位置の手前に段落の区切り（空行）があればそこで区切り、無ければ行の区切りで区切る。
+1行で上限を超える場合のみ、行の途中をトークン位置で区切る。
+"""
+from __future__ import annotations
+
+import logging
+import math
+import re
+import threading
+from itertools import pairwise
+from typing import Protocol
+
+from ..settings import settings
+
+logger = logging.getLogger(__name__)
+
+# 段落の区切りを優先する範囲（チャンクの後半にある区切りのみ使う）
+PARAGRAPH_BREAK_MIN_RATIO = 0.5
+
+_JAPANESE_CHAR = re.compile(r'[\u3040-\u309F\u30A0-\u30FF\u4E00-\u9FFF]')
+
+
+def estimate_token_count(text: str) -> int:
+    """テキストのトークン数を概算する（tiktoken を使えない環境用）
+
+    日本語では1文字≈1.5トークン、英語では1単語≈1.3トークンと仮定する。
+
+    Args:
+        text: 対象テキスト
+
+    Returns:
+        概算トークン数
+    """
+    return max(int(_estimate_tokens(text)), len(text) // 4)  # 最低でも4文字=1トークン
+
+
+def _estimate_tokens(text: str) -> float:
+    """概算トークン数（切り捨て前）"""
+    # 日本語文字数（ひらがな・カタカナ・漢字）
+    japanese_chars = len(_JAPANESE_CHAR.findall(text))
+    # その他文字数（英数字・記号等）
+    other_chars = len(text) - japanese_chars
+    # 英単語数の概算（スペース区切り）
+    words = len(text.split())
+    return japanese_chars * 1.5 + max(other_chars, words) * 1.3
+
+
+class TextTokenizer(Protocol):
+    """トークン数の計測"""
+
+    name: str
+
+    def count(self, text: str) -> int:
+        """テキストのトークン数を返す"""
+        ...
+
+    def count_many(self, texts: list[str]) -> list[int]:
+        """複数のテキストのトークン数をまとめて返す"""
+        ...
+
+    def split_long(self, text: str, max_tokens: int) -> list[str]:
+        """1行のテキストを max_tokens 以下の断片に分割する"""
+        ...
+
+
+class TiktokenTokenizer:
+    """tiktoken による正確なトークン数"""
+
+    def __init__(self, encoding_name: str):
+        """
+        Args:
+            encoding_name: エンコーディング名（o200k_base など）
+
+        Raises:
+            Exception: エンコーディングを読み込めない場合（ファイルの取得失敗など）
+        """
+        import tiktoken
+
+        self.encoding = tiktoken.get_encoding(encoding_name)
+        self.name = f"tiktoken:{encoding_name}"
+
+    def count(self, text: str) -> int:
+        return len(self.encoding.encode_ordinary(text))
+
+    def count_many(self, texts: list[str]) -> list[int]:
+        return [len(tokens) for tokens in self.encoding.encode_ordinary_batch(texts)]
+
+    def split_long(self, text: str, max_tokens: int) -> list[str]:
+        tokens = self.encoding.encode_ordinary(text)
+        # トークン境界が文字の途中（UTF-8の1文字が複数トークン）の場合はその文字の先頭で区切るため、
+        # 断片が最大3トークン増えても上限に収まるよう間隔を詰める
+        step = max(1, max_tokens - 3)
+        _, offsets = self.encoding.decode_with_offsets(tokens)
+        cuts = [offsets[i] for i in range(step, len(tokens), step)]
+        bounds = [0, *cuts, len(text)]
+        return [text[start:end] for start, end in pairwise(bounds) if end > start]
+
+
+class EstimateTokenizer:
+    """文字種からのトークン数の概算（tiktoken を使えない環境用）"""
+
+    name = "estimate"
+
+    def count(self, text: str) -> int:
+        return estimate_token_count(text)
+
+    def count_many(self, texts: list[str]) -> list[int]:
+        # 行ごとの概算を切り上げ、合計がテキスト全体の概算を下回らないようにする
+        return [max(math.ceil(_estimate_tokens(text)), len(text) // 4) for text in texts]
+
+    def split_long(self, text: str, max_tokens: int) -> list[str]:
+        tokens = max(estimate_token_count(text), 1)
+        step = max(1, len(text) * max_tokens // tokens)
+        return [text[i:i + step] for i in range(0, len(text), step)]
+
+
+_tokenizer: TextTokenizer | None = None
+_tokenizer_lock = threading.Lock()
+
+
+def get_tokenizer() -> TextTokenizer:
+    """トークン数計測のシングルトンインスタンスを取得（初回のみエンコーディングを読み込む）"""
+    global _tokenizer
+    with _tokenizer_lock:
+        if _tokenizer is None:
+            encoding_name = settings.summary_tokenizer_encoding
+            if encoding_name:
+                try:
+                    _tokenizer = TiktokenTokenizer(encoding_name)
+                except Exception as e:
+                    logger.warning("tiktokenのエンコーディングを読み込めないため、概算のトークン数を使用します: %s", e)
+            if _tokenizer is None:
+                _tokenizer = EstimateTokenizer()
+            logger.info("トークン数の計測: %s", _tokenizer.name)
+        return _tokenizer
+
+
+def count_tokens(text: str) -> int:
+    """テキストのトークン数を返す"""
+    return get_tokenizer().count(text)
+
+
+def chunk_by_tokens(
+    text: str,
+    max_tokens: int,
+    overlap_tokens: int = 0,
+    tokenizer: TextTokenizer | None = None,
+) -> list[str]:
+    """テキストを max_tokens 以下のチャンクに分割する
+
+    Args:
+        text: 対象テキスト
+        max_tokens: チャンクあたりの最大トークン数
+        overlap_tokens: 前のチャンクの末尾から次のチャンクの先頭に含めるトークン数（行単位）
+        tokenizer: トークン数の計測（省略時は get_tokenizer()）
+
+    Returns:
+        分割されたテキストのリスト
+    """
+    tokenizer = tokenizer or get_tokenizer()
+    # 重なりだけでチャンクが埋まらないよう、上限の半分までに制限する
+    overlap_tokens = max(0, min(overlap_tokens, max_tokens // 2))
+
+    # 改行を含めて行に分ける（各チャンクは元のテキストの連続した部分になる）
+    lines = text.splitlines(keepends=True)
+    counts = tokenizer.count_many(lines)
+    if sum(counts) <= max_tokens:
+        return [text]
+
+    # 上限を超える行は、行の途中で区切った断片に置き換える
+    pieces: list[str] = []
+    piece_counts: list[int] = []
+    for line, count in zip(lines, counts, strict=True):
+        if count <= max_tokens - overlap_tokens:
+            pieces.append(line)
+            piece_counts.append(count)
+            continue
+        fragments = tokenizer.split_long(line, max_tokens - overlap_tokens)
+        pieces.extend(fragments)
+        piece_counts.extend(tokenizer.count_many(fragments))
+
+    chunks: list[str] = []
+    start = 0  # チャンクの新しい内容の先頭の断片
+    while start < len(pieces):
+        # 前のチャンクの末尾の行を重なりとして含める
+        head = start
+        overlap = 0
+        while head > 0 and chunks and overlap + piece_counts[head - 1] <= overlap_tokens:
+            head -= 1
+            overlap += piece_counts[head]
+
+        budget = max_tokens - overlap
+        end = start
+        used = 0
+        paragraph_end = None
+        while end < len(pieces) and used + piece_counts[end] <= budget:
+            used += piece_counts[end]
+            end += 1
+            if pieces[end - 1].strip() == "" and used >= budget * PARAGRAPH_BREAK_MIN_RATIO:
+                paragraph_end = end
+        if end == start:
+            # 重なりを含めると入らない断片は、重なり無しで1チャンクにする
+            head, end = start, start + 1
+        elif end < len(pieces) and paragraph_end is not None:
+            end = paragraph_end
+
+        chunks.append("".join(pieces[head:end]).strip("\n"))
+        start = end
+
+    return [chunk for chunk in chunks if chunk.strip()]
@@ -1,12 +1,14 @@
 """API Routers"""
 from __future__ import annotations
 
-from .meetings import router as meetings_router
-from .transcripts import router as transcripts_router
-from .summaries import router as summaries_router
 from .decisions import router as decisions_router
+from .events import router as events_router
+from .jobs import router as jobs_router
+from .meetings import router as meetings_router
 from .parking import router as parking_router
 from .slack import router as slack_router
+from .summaries import router as summaries_router
+from .transcripts import router as transcripts_router
 
 __all__ = [
     "meetings_router",
@@ -15,5 +17,7 @@ __all__ = [
     "decisions_router",
     "parking_router",
     "slack_router",
+    "jobs_router",
+    "events_router",
 ]
 
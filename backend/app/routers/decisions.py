@@ -31,14 +31,13 @@ def add_decision(meeting_id: str, decision: Decision) -> dict:
     Raises:
         HTTPException: 会議が見つからない場合
     """
-    meeting = store.load_meeting(meeting_id)
-    if not meeting:
-        raise HTTPException(404, "Meeting not found")
     data = decision.model_dump()
     if not data.get("timestamp"):
         data["timestamp"] = datetime.utcnow().isoformat()
-    meeting["decisions"].append(data)
-    store.save_meeting(meeting_id, meeting)
+    # 同時に行われる他の更新を上書きしないよう、会議のロック内で追加する
+    meeting = store.update_meeting(meeting_id, lambda meeting: meeting["decisions"].append(data))
+    if not meeting:
+        raise HTTPException(404, "Meeting not found")
     return {"ok": True, "count": len(meeting["decisions"])}
 
 
@@ -75,11 +74,10 @@ def add_action(meeting_id: str, action: ActionItem) -> dict:
     Raises:
         HTTPException: 会議が見つからない場合
     """
-    meeting = store.load_meeting(meeting_id)
+    data = action.model_dump()
+    meeting = store.update_meeting(meeting_id, lambda meeting: meeting["actions"].append(data))
     if not meeting:
         raise HTTPException(404, "Meeting not found")
-    meeting["actions"].append(action.model_dump())
-    store.save_meeting(meeting_id, meeting)
     return {"ok": True, "count": len(meeting["actions"])}
 
 
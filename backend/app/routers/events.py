@@ -0,0 +1,111 @@
+"""会議イベントのSSE（Server-Sent Events）エンドポイント"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from collections.abc import AsyncIterator
+
+from fastapi import APIRouter, Header, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+
+from ..services.event_bus import MeetingEvent, event_bus
+from ..settings import settings
+from ..storage import DataStore
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/meetings/{meeting_id}", tags=["events"])
+
+# DataStore
+store = DataStore(settings.data_dir)
+
+
+def _format_sse(event: MeetingEvent) -> str:
+    """イベントをSSEの形式に変換する"""
+    data = json.dumps(event.data, ensure_ascii=False, default=str)
+    return f"id: {event.id}\nevent: {event.type}\ndata: {data}\n\n"
+
+
+def _parse_event_id(value: str | None) -> int | None:
+    if value is None or value == "":
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        logger.warning("Invalid Last-Event-ID: %s", value)
+        return None
+
+
+@router.get("/events")
+async def stream_events(
+    meeting_id: str,
+    request: Request,
+    last_event_id_header: str | None = Header(None, alias="Last-Event-ID"),
+    last_event_id: str | None = Query(None, description="Last-Event-IDヘッダーを送れない場合の代替"),
+) -> StreamingResponse:
+    """会議イベントをSSEで配信する。
+
+    新しい文字起こし（transcript）・要約の更新（summary）・Parking Lotの追加（parking）・
+    脱線検知の結果（deviation）を、発生した時点で配信する。
+    再接続時は Last-Event-ID 以降のイベントを再送する。再送できない場合は resync イベントを送るので、
+    クライアントは各GETエンドポイントで最新状態を取得し直す。
+
+    Args:
+        meeting_id: 会議ID
+        request: リクエスト（切断検知用）
+        last_event_id_header: 最後に受信したイベントID（EventSourceが再接続時に自動で送る）
+        last_event_id: 最後に受信したイベントID（クエリパラメータ）
+
+    Returns:
+        text/event-stream のレスポンス
+
+    Raises:
+        HTTPException: 会議が見つからない場合
+    """
+    meeting = store.load_meeting(meeting_id)
+    if not meeting:
+        raise HTTPException(404, "Meeting not found")
+
+    resume_from = _parse_event_id(last_event_id_header or last_event_id)
+    sub = event_bus.subscribe(meeting_id, resume_from)
+    logger.info(
+        "SSE client connected: meeting_id=%s, last_event_id=%s, subscribers=%d",
+        meeting_id,
+        resume_from,
+        event_bus.subscriber_count(meeting_id),
+    )
+
+    async def event_stream() -> AsyncIterator[str]:
+        try:
+            # 再接続時のリトライ間隔を指定
+            yield f"retry: {settings.sse_retry_ms}\n\n"
+            for event in sub.replay:
+                yield _format_sse(event)
+
+            while True:
+                if sub.overflowed:
+                    # 遅いクライアントは切断し、Last-Event-ID での再接続で追いつかせる
+                    break
+                if await request.is_disconnected():
+                    break
+                try:
+                    event = await asyncio.wait_for(
+                        sub.queue.get(), timeout=settings.sse_keepalive_sec
+                    )
+                except asyncio.TimeoutError:
+                    # 接続維持のためのコメント行
+                    yield ": keepalive\n\n"
+                    continue
+                yield _format_sse(event)
+        finally:
+            event_bus.unsubscribe(sub)
+            logger.info("SSE client disconnected: meeting_id=%s", meeting_id)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        },
+    )
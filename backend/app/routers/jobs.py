@@ -0,0 +1,47 @@
+"""バックグラウンドジョブの状態確認エンドポイント"""
+from __future__ import annotations
+
+from fastapi import APIRouter, HTTPException, Query
+
+from ..schemas.job import Job
+from ..services.job_queue import get_job_queue
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+@router.get("", response_model=list[Job])
+def list_jobs(
+    meeting_id: str | None = None,
+    type: str | None = None,
+    limit: int = Query(50, ge=1, le=500),
+) -> list[Job]:
+    """ジョブ一覧を新しい順に取得する。
+
+    Args:
+        meeting_id: 会議IDで絞り込む
+        type: ジョブ種別で絞り込む（summary / final_summary など）
+        limit: 最大件数
+
+    Returns:
+        ジョブ一覧
+    """
+    return get_job_queue().list_jobs(meeting_id=meeting_id, job_type=type, limit=limit)
+
+
+@router.get("/{job_id}", response_model=Job)
+def get_job(job_id: str) -> Job:
+    """ジョブの状態を取得する。
+
+    Args:
+        job_id: ジョブID
+
+    Returns:
+        ジョブ（status: queued / running / succeeded / failed）
+
+    Raises:
+        HTTPException: ジョブが見つからない場合
+    """
+    job = get_job_queue().get(job_id)
+    if not job:
+        raise HTTPException(404, "Job not found")
+    return job
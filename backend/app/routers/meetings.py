@@ -6,13 +6,18 @@ import logging
 from datetime import datetime, timezone
 from uuid import uuid4
 
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, HTTPException
 
 from ..schemas.meeting import Meeting, MeetingCreate
-from ..storage import DataStore
+from ..services.job_queue import get_job_queue
 from ..services.meeting_scheduler import get_scheduler
-from ..meeting_summarizer.service import summarize_meeting
+from ..services.summary_service import (
+    FINAL_SUMMARY_PRIORITY,
+    JOB_FINAL_SUMMARY,
+    make_checkpoint,
+)
 from ..settings import settings
+from ..storage import DataStore
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/meetings", tags=["meetings"])
@@ -20,6 +25,20 @@ router = APIRouter(prefix="/meetings", tags=["meetings"])
 # DataStore
 store = DataStore(settings.data_dir)
 
+# PUT /meetings/{id} で更新できるフィールド
+UPDATABLE_FIELDS = (
+    "status",
+    "started_at",
+    "ended_at",
+    "summary",
+    "title",
+    "purpose",
+    "deliverable_template",
+    "meetingDate",
+    "participants",
+    "agenda",
+)
+
 
 def _normalize_meeting_dict(meeting_dict: dict) -> dict:
     """会議データを正規化する。
@@ -135,7 +154,8 @@ def create_meeting(payload: dict) -> Meeting:
             "summary": "",
             "decisions": [],
             "undecided": [],
-            "actions": []
+            "actions": [],
+            "checkpoint": make_checkpoint([]),
         })
 
         logger.info("Meeting created successfully: %s", meeting_id)
@@ -182,39 +202,19 @@ def update_meeting(meeting_id: str, payload: dict) -> Meeting:
     Raises:
         HTTPException: 会議が見つからない場合
     """
-    meeting = store.load_meeting(meeting_id)
-    if not meeting:
-        raise HTTPException(404, "Meeting not found")
 
-    # 更新可能なフィールドを更新
-    if "status" in payload:
-        meeting["status"] = payload["status"]
-    if "started_at" in payload:
-        meeting["started_at"] = payload["started_at"]
-    if "ended_at" in payload:
-        meeting["ended_at"] = payload["ended_at"]
-    if "started_at" in payload:
-        meeting["started_at"] = payload["started_at"]
-    if "summary" in payload:
-        meeting["summary"] = payload["summary"]
-    if "title" in payload:
-        meeting["title"] = payload["title"]
-    if "purpose" in payload:
-        meeting["purpose"] = payload["purpose"]
-    if "deliverable_template" in payload:
-        meeting["deliverable_template"] = payload["deliverable_template"]
-    if "meetingDate" in payload:
-        meeting["meetingDate"] = payload["meetingDate"]
-    if "participants" in payload:
-        meeting["participants"] = payload["participants"]
-    if "agenda" in payload:
-        meeting["agenda"] = payload["agenda"]
-
-    # 更新日時を設定
-    meeting["updated_at"] = datetime.now(timezone.utc).isoformat()
+    def apply_payload(meeting: dict) -> None:
+        # 更新可能なフィールドを更新
+        for field in UPDATABLE_FIELDS:
+            if field in payload:
+                meeting[field] = payload[field]
+        # 更新日時を設定
+        meeting["updated_at"] = datetime.now(timezone.utc).isoformat()
 
-    # 保存
-    store.save_meeting(meeting_id, meeting)
+    # 保存（保留事項のタイトル生成など、同時に行われる更新を上書きしないようロック内で更新する）
+    meeting = store.update_meeting(meeting_id, apply_payload)
+    if not meeting:
+        raise HTTPException(404, "Meeting not found")
     return Meeting(**_normalize_meeting_dict(meeting))
 
 
@@ -231,61 +231,34 @@ async def start_meeting(meeting_id: str) -> Meeting:
     Raises:
         HTTPException: 会議が見つからない場合
     """
-    meeting = store.load_meeting(meeting_id)
-    if not meeting:
-        raise HTTPException(404, "Meeting not found")
 
-    # 会議開始時刻を記録
-    meeting["started_at"] = datetime.now(timezone.utc).isoformat()
-    meeting["status"] = "in_progress"
-    meeting["updated_at"] = datetime.now(timezone.utc).isoformat()
+    def mark_started(meeting: dict) -> None:
+        # 会議開始時刻を記録
+        meeting["started_at"] = datetime.now(timezone.utc).isoformat()
+        meeting["status"] = "in_progress"
+        meeting["updated_at"] = datetime.now(timezone.utc).isoformat()
 
     # 保存
-    store.save_meeting(meeting_id, meeting)
+    meeting = await asyncio.to_thread(store.update_meeting, meeting_id, mark_started)
+    if not meeting:
+        raise HTTPException(404, "Meeting not found")
     logger.info("Meeting started: %s", meeting_id)
 
-    # 3分ごとの要約生成スケジューラーを開始
+    # 発話量に応じた要約生成スケジューラーを開始
     scheduler = get_scheduler()
     await scheduler.start_meeting_scheduler(meeting_id)
 
     return Meeting(**_normalize_meeting_dict(meeting))
 
 
-async def _generate_final_summary_background(meeting_id: str):
-    """バックグラウンドで最終要約を生成する"""
-    try:
-        transcripts = store.load_transcripts(meeting_id)
-        if transcripts:
-            all_text = "\n".join([t.get("text", "") for t in transcripts])
-            if all_text.strip():
-                logger.info("Generating final summary for meeting %s", meeting_id)
-
-                # 非同期で要約を生成
-                summary_result = await asyncio.to_thread(
-                    summarize_meeting, all_text, verbose=True
-                )
-
-                summary_data = {
-                    "generated_at": datetime.now(timezone.utc).isoformat(),
-                    "summary": summary_result.summary,
-                    "decisions": summary_result.decisions,
-                    "undecided": summary_result.undecided,
-                    "actions": [action.model_dump() for action in summary_result.actions],
-                }
-
-                store.save_summary(meeting_id, summary_data)
-                logger.info("Final summary saved for meeting %s", meeting_id)
-    except Exception as e:
-        logger.error("Failed to generate final summary: %s", e)
-
-
 @router.post("/{meeting_id}/end", response_model=Meeting)
-async def end_meeting(meeting_id: str, background_tasks: BackgroundTasks) -> Meeting:
+async def end_meeting(meeting_id: str) -> Meeting:
     """会議を終了する。
 
+    最終要約はジョブキューに登録して生成する。進捗は GET /jobs?meeting_id={id} で確認できる。
+
     Args:
         meeting_id: 会議ID
-        background_tasks: FastAPIバックグラウンドタスク
 
     Returns:
         更新された会議情報
@@ -293,25 +266,30 @@ async def end_meeting(meeting_id: str, background_tasks: BackgroundTasks) -> Mee
     Raises:
         HTTPException: 会議が見つからない場合
     """
-    meeting = store.load_meeting(meeting_id)
-    if not meeting:
+    if not await asyncio.to_thread(store.load_meeting, meeting_id):
         raise HTTPException(404, "Meeting not found")
 
-    # 1分ごとの要約生成スケジューラーを停止
+    # 要約生成スケジューラーを停止
     scheduler = get_scheduler()
     scheduler.stop_meeting_scheduler(meeting_id)
 
-    # 会議終了時刻を記録
-    meeting["ended_at"] = datetime.now(timezone.utc).isoformat()
-    meeting["status"] = "completed"
-    meeting["updated_at"] = datetime.now(timezone.utc).isoformat()
+    def mark_ended(meeting: dict) -> None:
+        # 会議終了時刻を記録
+        meeting["ended_at"] = datetime.now(timezone.utc).isoformat()
+        meeting["status"] = "completed"
+        meeting["updated_at"] = datetime.now(timezone.utc).isoformat()
 
     # 保存
-    store.save_meeting(meeting_id, meeting)
+    meeting = await asyncio.to_thread(store.update_meeting, meeting_id, mark_ended)
+    if not meeting:
+        raise HTTPException(404, "Meeting not found")
     logger.info("Meeting ended: %s", meeting_id)
 
-    # 最終要約をバックグラウンドで生成
-    background_tasks.add_task(_generate_final_summary_background, meeting_id)
+    # 最終要約をジョブキューで生成
+    job = await asyncio.to_thread(
+        get_job_queue().enqueue, JOB_FINAL_SUMMARY, meeting_id, priority=FINAL_SUMMARY_PRIORITY
+    )
+    logger.info("Final summary job queued: meeting_id=%s, job_id=%s", meeting_id, job.id)
 
     return Meeting(**_normalize_meeting_dict(meeting))
 
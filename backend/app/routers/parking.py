@@ -1,14 +1,17 @@
 """Parking Lotエンドポイント"""
 from __future__ import annotations
 
+import asyncio
 import logging
 
 from fastapi import APIRouter, HTTPException
 
 from ..schemas.parking import ParkingItem
-from ..services.ai_deviation import ai_deviation_service
-from ..storage import DataStore
+from ..services.event_bus import EVENT_PARKING, event_bus
+from ..services.job_queue import get_job_queue
+from ..services.parking_titles import enqueue_parking_titles, provisional_title
 from ..settings import settings
+from ..storage import DataStore
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/meetings/{meeting_id}", tags=["parking"])
@@ -26,38 +29,32 @@ async def add_parking(meeting_id: str, item: ParkingItem) -> dict:
         item: Parking Lotアイテム
 
     Returns:
-        追加結果
+        追加結果（追加したアイテムを含む。タイトルは生成後に EVENT_PARKING で配信する）
 
     Raises:
         HTTPException: 会議が見つからない場合
     """
-    meeting = store.load_meeting(meeting_id)
+    # タイトルはバックグラウンドでAIにより生成し、それまでは内容の先頭を仮のタイトルにする
+    if item.content:
+        item.title = provisional_title(item.content)
+        item.title_pending = True
+    new_item = item.model_dump()
+
+    def append_item(meeting: dict) -> None:
+        # 既存のparkingフィールドを保護（最新データに会議ごとのロック内で追加し、他の更新との競合を防ぐ）
+        meeting["parking"] = (meeting.get("parking") or []) + [new_item]
+
+    meeting = await asyncio.to_thread(store.update_meeting, meeting_id, append_item)
     if not meeting:
         raise HTTPException(404, "Meeting not found")
-    
-    # 既存のparkingフィールドを保護（他のリクエストとの競合を防ぐため、最新データを再読み込み）
-    # parkingフィールドが存在しない場合は初期化
-    if "parking" not in meeting:
-        meeting["parking"] = []
-    
-    # 既存のparkingアイテムを取得（念のため最新の会議データから再確認）
-    existing_parking = meeting.get("parking", []).copy()
-    
-    # タイトルをAIで自動生成（contentから生成）
-    if item.content:
-        logger.info(f"🔍 タイトルをAIで自動生成します。content: {item.content[:100]}...")
-        title = await ai_deviation_service.generate_parking_title(item.content)
-        logger.info(f"🤖 AI生成されたtitle: {title}")
-        item.title = title
-    
-    # 既存のparkingアイテムに新しいアイテムを追加
-    new_parking = existing_parking + [item.model_dump()]
-    meeting["parking"] = new_parking
-    
-    logger.info(f"📝 保留事項追加: 既存={len(existing_parking)}件, 追加後={len(new_parking)}件")
-    
-    store.save_meeting(meeting_id, meeting)
-    return {"ok": True, "count": len(new_parking)}
+    count = len(meeting["parking"])
+    logger.info(f"📝 保留事項追加: 既存={count - 1}件, 追加後={count}件")
+
+    event_bus.publish(meeting_id, EVENT_PARKING, new_item)
+    if item.title_pending:
+        job = await asyncio.to_thread(enqueue_parking_titles, get_job_queue(), meeting_id)
+        logger.info("📝 保留事項のタイトル生成を登録: job_id=%s", job.id)
+    return {"ok": True, "count": count, "item": new_item}
 
 
 @router.get("/parking")
@@ -2,21 +2,39 @@
 from __future__ import annotations
 
 import logging
-from datetime import datetime, timezone, timedelta
+from datetime import datetime, timezone
 
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Query
 
+from ..meeting_summarizer.service import summarize_meeting
 from ..schemas.summary import MiniSummary
-from ..storage import DataStore
+from ..services.deviation import check_deviation
+from ..services.deviation_cache import latest_transcript_id
+from ..services.deviation_pipeline import (
+    evaluate_deviation,
+    meeting_agenda_items,
+    publish_deviation,
+)
+from ..services.embedding_index import suggest_agenda
+from ..services.job_queue import get_job_queue
 from ..services.llm import (
-    generate_mini_summary,
     extract_unresolved,
+    generate_mini_summary,
     generate_proposals,
     render_final_markdown,
 )
-from ..services.deviation import check_deviation, check_realtime_deviation
-from ..meeting_summarizer.service import summarize_meeting
+from ..services.summary_service import (
+    JOB_SUMMARY,
+    SUMMARY_PRIORITY,
+    build_summary_data,
+    compose_window_input,
+    make_checkpoint,
+    save_summary,
+)
+from ..services.summary_window import select_summary_window
+from ..services.transcript_index import get_transcript_index
 from ..settings import settings
+from ..storage import DataStore
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/meetings/{meeting_id}", tags=["summaries"])
@@ -42,21 +60,16 @@ def generate_summary(meeting_id: str, window_min: int = 3) -> MiniSummary:
     meeting = store.load_meeting(meeting_id)
     if not meeting:
         raise HTTPException(404, "Meeting not found")
-    now_end = max([t.get("end_sec", 0) for t in meeting.get("transcripts", [])] + [0])
-    window_start = max(0, now_end - window_min * 60)
+    # 直近 window_min 分（音声時刻）の文字起こしをインデックスから抽出
     recent_texts = [
-        t["text"]
-        for t in meeting.get("transcripts", [])
-        if t.get("start_sec", 0) >= window_start
+        t.get("text", "")
+        for t in get_transcript_index(store, meeting_id).latest(window_min * 60)
     ]
     text = "\n".join(recent_texts)
     summary = generate_mini_summary(text)
     # Persist last summary snapshot (optional)
-    # 注意: parkingフィールドなどの既存データを保護するため、保存前に最新データを再読み込み
-    meeting_to_update = store.load_meeting(meeting_id)
-    if meeting_to_update:
-        meeting_to_update["last_summary"] = summary
-        store.save_meeting(meeting_id, meeting_to_update)
+    # 注意: parkingフィールドなどの既存データを保護するため、最新データを会議のロック内で更新する
+    store.update_meeting(meeting_id, lambda meeting: meeting.update(last_summary=summary))
     return summary
 
 
@@ -104,6 +117,9 @@ def api_generate_proposals(meeting_id: str) -> dict:
 async def check_meeting_deviation(meeting_id: str) -> dict:
     """会議の脱線検知を実行する（AIベース）。
 
+    文字起こしの記録ごとにバックグラウンドで判定しているため、通常はその結果
+    （脱線検知結果キャッシュ）を返す。未判定の場合のみここで判定する。
+
     Args:
         meeting_id: 会議ID
 
@@ -119,23 +135,10 @@ async def check_meeting_deviation(meeting_id: str) -> dict:
             raise HTTPException(404, "Meeting not found")
 
         # アジェンダ項目を取得（タイトル、期待成果物を含む）
-        agenda_items = []
-        if "agenda" in meeting and meeting["agenda"]:
-            agenda_items = [
-                {
-                    "title": item.get("title", ""),
-                    "expectedOutcome": item.get("expectedOutcome", ""),
-                    "duration": item.get("duration", 0),
-                }
-                for item in meeting["agenda"]
-                if item.get("title")
-            ]
+        agenda_items = meeting_agenda_items(meeting)
 
         logger.info("🔍 脱線検知開始: meeting_id=%s", meeting_id)
         logger.info("📋 アジェンダ項目数: %d", len(agenda_items))
-        for idx, item in enumerate(agenda_items, 1):
-            logger.info("  アジェンダ%d: タイトル=%s, 期待成果物=%s, 所要時間=%d分",
-                       idx, item.get("title", ""), item.get("expectedOutcome", ""), item.get("duration", 0))
 
         if not agenda_items:
             return {
@@ -150,11 +153,9 @@ async def check_meeting_deviation(meeting_id: str) -> dict:
                 "timestamp": datetime.now(timezone.utc).isoformat()
             }
 
-        # 直近の文字起こし結果を取得（transcripts.jsonから読み込む）
-        transcripts = store.load_transcripts(meeting_id)
-        logger.info("📝 文字起こしデータ件数: %d", len(transcripts))
-        
-        if not transcripts:
+        # 最新の文字起こしが前回の判定から変わっていなければ、キャッシュした結果を返す
+        latest_id = latest_transcript_id(store, meeting_id)
+        if latest_id is None:
             logger.warning("⚠️ 文字起こしデータがありません")
             return {
                 "is_deviation": False,
@@ -168,30 +169,13 @@ async def check_meeting_deviation(meeting_id: str) -> dict:
                 "timestamp": datetime.now(timezone.utc).isoformat()
             }
 
-        # 直近3件の文字起こし内容をログ出力（デバッグ用）
-        recent_count = min(3, len(transcripts))
-        logger.info("📄 直近%d件の文字起こし内容:", recent_count)
-        for i, t in enumerate(transcripts[-recent_count:], 1):
-            text_preview = t.get("text", "")[:100]  # 最初の100文字
-            logger.info("  [%d] %s... (text length: %d)", i, text_preview, len(t.get("text", "")))
-
-        # AIベースの脱線検知を実行（アジェンダ項目全体を渡す）
-        logger.info("🤖 AI脱線検知を実行中...")
-        deviation_result = await check_realtime_deviation(
-            recent_transcripts=transcripts,
-            agenda_items=agenda_items,
-            threshold=0.3,
-            consecutive_chunks=3,
-        )
+        deviation_result, cached = await evaluate_deviation(store, meeting_id, latest_id, agenda_items)
+        if cached:
+            logger.info("♻️ 脱線検知結果をキャッシュから返却: meeting_id=%s, transcript_id=%s", meeting_id, latest_id)
+            return deviation_result
 
         logger.info("✅ 脱線検知完了: meeting_id=%s", meeting_id)
-        logger.info("📊 判定結果: is_deviation=%s, similarity_score=%.3f, confidence=%.3f",
-                   deviation_result.get("is_deviation"), 
-                   deviation_result.get("similarity_score", 0.0),
-                   deviation_result.get("confidence", 0.0))
-        logger.info("📌 最適アジェンダ: %s", deviation_result.get("best_agenda", ""))
-        logger.info("💬 メッセージ: %s", deviation_result.get("message", ""))
-        logger.info("🔍 判定理由: %s", deviation_result.get("reasoning", "")[:200])  # 最初の200文字
+        publish_deviation(meeting_id, deviation_result)
         return deviation_result
 
     except HTTPException:
@@ -201,6 +185,68 @@ async def check_meeting_deviation(meeting_id: str) -> dict:
         raise HTTPException(500, f"脱線検知に失敗しました: {str(e)}")
 
 
+@router.get("/deviations")
+def list_deviations(
+    meeting_id: str,
+    since: int | None = Query(None, ge=0, description="取得済みの件数（この位置以降の判定結果のみ返す）"),
+) -> list:
+    """脱線検知の履歴（チャンクごとの判定結果のタイムライン）を取得する。
+
+    Args:
+        meeting_id: 会議ID
+        since: 取得済みの件数
+
+    Returns:
+        判定結果の一覧（判定順）
+
+    Raises:
+        HTTPException: 会議が見つからない場合
+    """
+    meeting = store.load_meeting(meeting_id)
+    if not meeting:
+        raise HTTPException(404, "Meeting not found")
+
+    deviations = store.load_deviations(meeting_id)
+    if since is not None:
+        return deviations[since:]
+    return deviations
+
+
+@router.get("/agenda/suggestions")
+def suggest_agenda_for_latest(
+    meeting_id: str,
+    k: int = Query(3, ge=1, le=20, description="返す候補の件数"),
+) -> dict:
+    """最新の発話に近いアジェンダ項目を返す（ローカルの埋め込みベクトルで計算し、LLMは呼ばない）。
+
+    Args:
+        meeting_id: 会議ID
+        k: 返す候補の件数
+
+    Returns:
+        最新の文字起こしIDと、類似度の高い順のアジェンダ候補
+
+    Raises:
+        HTTPException: 会議が見つからない場合
+    """
+    meeting = store.load_meeting(meeting_id)
+    if not meeting:
+        raise HTTPException(404, "Meeting not found")
+
+    transcripts = store.load_transcripts(meeting_id)
+    if not transcripts:
+        return {"transcript_id": None, "suggestions": []}
+
+    latest = transcripts[-1]
+    suggestions = suggest_agenda(
+        latest.get("text", ""), meeting_agenda_items(meeting), k=k, transcript_id=latest.get("id")
+    )
+    return {
+        "transcript_id": latest.get("id"),
+        "suggestions": [{"title": title, "score": round(score, 3)} for score, title in suggestions],
+    }
+
+
 @router.post("/summary/final")
 def final_summary(meeting_id: str) -> dict:
     """最終サマリを生成する。
@@ -269,146 +315,34 @@ def generate_meeting_summary(meeting_id: str) -> dict:
         if not meeting:
             raise HTTPException(404, "Meeting not found")
 
-        # 文字起こしデータを読み込む
-        transcripts = store.load_transcripts(meeting_id)
-        if not transcripts:
+        # 前回の要約生成時点の3分前以降の文字起こしを抽出（前回の要約が無い場合は全件）
+        window = select_summary_window(store, meeting_id)
+        if not window.index.transcripts:
             raise HTTPException(400, "文字起こしデータが見つかりません。会議中に音声を録音してください。")
 
-        # 前回の要約を取得（存在する場合）
-        previous_summary = store.load_summary(meeting_id)
-        previous_generated_at = None
-        if previous_summary and "generated_at" in previous_summary:
-            try:
-                previous_generated_at = datetime.fromisoformat(
-                    previous_summary["generated_at"].replace("Z", "+00:00")
-                )
-                logger.info(
-                    "Previous summary found: generated_at=%s",
-                    previous_summary["generated_at"]
-                )
-            except (ValueError, AttributeError) as e:
-                logger.warning(
-                    "Failed to parse previous summary generated_at: %s", e
-                )
-
-        # 前回の要約生成時点前後を含む文字起こしを抽出（文脈の継続性を保つため）
-        # 前回生成時点の3分前から、現在までの文字起こしを含める
-        CONTEXT_BUFFER_MINUTES = 3
-        new_transcripts = []
-        if previous_generated_at:
-            # 前回生成時点の3分前を起点とする（文脈の継続性のため）
-            context_start = previous_generated_at - timedelta(minutes=CONTEXT_BUFFER_MINUTES)
-            logger.info(
-                "Extracting transcripts from %s (3 minutes before previous summary) to now",
-                context_start.isoformat()
-            )
-            # 前回生成時点の3分前以降の文字起こしを取得
-            for t in transcripts:
-                transcript_timestamp_str = t.get("timestamp")
-                if transcript_timestamp_str:
-                    try:
-                        transcript_timestamp = datetime.fromisoformat(
-                            transcript_timestamp_str.replace("Z", "+00:00")
-                        )
-                        if transcript_timestamp >= context_start:
-                            new_transcripts.append(t)
-                    except (ValueError, AttributeError):
-                        # タイムスタンプが不正な場合は含める（安全のため）
-                        logger.warning(
-                            "Invalid transcript timestamp: %s", transcript_timestamp_str
-                        )
-                        new_transcripts.append(t)
-                else:
-                    # タイムスタンプがない場合は含める（後方互換性）
-                    new_transcripts.append(t)
-        else:
-            # 前回の要約がない場合は全文字起こしを使用
-            new_transcripts = transcripts
-
-        # 新しい文字起こしテキストを結合
-        all_text_full = "\n".join([t.get("text", "") for t in new_transcripts])
-
-        if not all_text_full.strip():
-            if previous_generated_at:
+        if not window.text.strip():
+            if window.has_previous:
                 logger.info("No new transcripts since previous summary.")
                 # 前回の要約を返す（新しい要約がない場合）
-                return previous_summary
+                return window.previous_summary
             raise HTTPException(400, "文字起こしテキストが空です。会議中に音声を録音してください。")
 
-        # 入力サイズ制限：30,000文字を超えた場合のみ直近30,000文字に制限
-        # 30,000文字以下の場合は全体を使用（文脈の完全性を保つため）
-        MAX_CHARS = 30000
-        use_previous_summary = False
-        
-        if len(all_text_full) > MAX_CHARS:
-            # 30,000文字を超える場合のみ、直近30,000文字 + 前回の要約を使用
-            all_text = all_text_full[-MAX_CHARS:]
-            use_previous_summary = True
-            logger.info(
-                "New transcripts exceed %d chars (%d). Using recent %d chars + previous summary.",
-                MAX_CHARS, len(all_text_full), MAX_CHARS
-            )
-        else:
-            # 30,000文字以下の場合は全体を使用（前回の要約は使わない）
-            all_text = all_text_full
-            use_previous_summary = False
-            logger.info(
-                "Using all new transcripts (total chars: %d, within limit). Previous summary not used.",
-                len(all_text_full)
-            )
-
-        # 30,000文字超過の場合のみ、前回の要約をコンテキストとして準備
-        previous_summary_context = None
-        if use_previous_summary and previous_summary:
-            # 前回の要約の主要情報をコンテキストとして抽出
-            prev_summary_text = previous_summary.get("summary", "")
-            prev_decisions = previous_summary.get("decisions", [])
-            prev_undecided = previous_summary.get("undecided", [])
-            
-            context_parts = []
-            if prev_summary_text:
-                context_parts.append(f"【前回の要約】\n{prev_summary_text}")
-            if prev_decisions:
-                context_parts.append(f"【前回の決定事項】\n" + "\n".join(f"- {d}" for d in prev_decisions))
-            if prev_undecided:
-                context_parts.append(f"【前回の未決事項】\n" + "\n".join(f"- {u}" for u in prev_undecided))
-            
-            if context_parts:
-                previous_summary_context = "\n\n".join(context_parts)
-                logger.info(
-                    "Previous summary context prepared (length=%d) - will be combined with truncated transcripts",
-                    len(previous_summary_context)
-                )
-
+        input_text, truncated = compose_window_input(window)
         logger.info(
-            "Generating summary for meeting %s (input_chars=%d, truncated=%s, using_previous=%s)", 
-            meeting_id, len(all_text), len(all_text_full) > MAX_CHARS, use_previous_summary
+            "Generating summary for meeting %s (window_entries=%d, input_chars=%d, truncated=%s)",
+            meeting_id, len(window.transcripts), len(input_text), truncated
         )
-
-        # 30,000文字超過の場合のみ、前回の要約コンテキストと新しい文字起こしを組み合わせて要約生成
-        if previous_summary_context:
-            # 前回の要約 + 新しい文字起こし（直近30,000文字）を結合
-            combined_text = f"{previous_summary_context}\n\n【新しい会話内容】\n{all_text}"
-            logger.info(
-                "Using combined text (previous context + recent %d chars): total_chars=%d",
-                MAX_CHARS, len(combined_text)
-            )
-            summary_result = summarize_meeting(combined_text, verbose=True)
-        else:
-            # 30,000文字以下の場合は、新しい文字起こしのみを使用
-            summary_result = summarize_meeting(all_text, verbose=True)
+        summary_result = summarize_meeting(input_text, verbose=True)
 
         # 要約データを作成
-        summary_data = {
-            "generated_at": datetime.now(timezone.utc).isoformat(),
-            "summary": summary_result.summary,
-            "decisions": summary_result.decisions,
-            "undecided": summary_result.undecided,
-            "actions": [action.model_dump() for action in summary_result.actions],
-        }
+        summary_data = build_summary_data(
+            summary_result,
+            checkpoint=make_checkpoint(window.index.transcripts),
+            audio_end_sec=window.index.end_sec,
+        )
 
-        # 要約データを保存
-        store.save_summary(meeting_id, summary_data)
+        # 要約データを保存（購読中のクライアントにも配信）
+        save_summary(store, meeting_id, summary_data)
 
         logger.info("Summary generated and saved for meeting %s", meeting_id)
 
@@ -422,18 +356,18 @@ def generate_meeting_summary(meeting_id: str) -> dict:
 
 
 @router.post("/summary/generate_async")
-def generate_meeting_summary_async(meeting_id: str, background: BackgroundTasks) -> dict:
+def generate_meeting_summary_async(meeting_id: str) -> dict:
     """会議要約を非同期に生成する。
 
-    - 直ちに 202 相当のレスポンスを返し、バックグラウンドで要約を生成して保存する
-    - 完了確認は GET /meetings/{id}/summary（存在すれば200、なければ404）
+    - 直ちに 202 相当のレスポンスを返し、ジョブキューで要約を生成して保存する
+    - 完了確認は GET /jobs/{job_id}（status が succeeded になれば GET /meetings/{id}/summary で取得）
     - 前回の要約生成時点以降の文字起こしのみを使用し、前回の要約をコンテキストとして活用
 
     Args:
         meeting_id: 会議ID
 
     Returns:
-        受け付け結果（accepted: true）
+        受け付け結果（accepted: true, job_id: 要約ジョブのID）
 
     Raises:
         HTTPException: 会議が見つからない場合、文字起こしが皆無の場合
@@ -442,153 +376,39 @@ def generate_meeting_summary_async(meeting_id: str, background: BackgroundTasks)
     if not meeting:
         raise HTTPException(404, "Meeting not found")
 
-    transcripts = store.load_transcripts(meeting_id)
-    if not transcripts:
+    # 前回の要約生成時点の3分前以降の文字起こしを抽出（前回の要約が無い場合は全件）
+    window = select_summary_window(store, meeting_id)
+    if not window.index.transcripts:
         raise HTTPException(400, "文字起こしデータが見つかりません。会議中に音声を録音してください。")
 
-    # 前回の要約を取得（存在する場合）
-    previous_summary = store.load_summary(meeting_id)
-    previous_generated_at = None
-    if previous_summary and "generated_at" in previous_summary:
-        try:
-            previous_generated_at = datetime.fromisoformat(
-                previous_summary["generated_at"].replace("Z", "+00:00")
-            )
-            logger.info(
-                "[ASYNC] Previous summary found: generated_at=%s",
-                previous_summary["generated_at"]
-            )
-        except (ValueError, AttributeError) as e:
-            logger.warning(
-                "[ASYNC] Failed to parse previous summary generated_at: %s", e
-            )
-
-    # 前回の要約生成時点前後を含む文字起こしを抽出（文脈の継続性を保つため）
-    # 前回生成時点の3分前から、現在までの文字起こしを含める
-    CONTEXT_BUFFER_MINUTES = 3
-    new_transcripts = []
-    if previous_generated_at:
-        # 前回生成時点の3分前を起点とする（文脈の継続性のため）
-        context_start = previous_generated_at - timedelta(minutes=CONTEXT_BUFFER_MINUTES)
-        logger.info(
-            "[ASYNC] Extracting transcripts from %s (3 minutes before previous summary) to now",
-            context_start.isoformat()
-        )
-        # 前回生成時点の3分前以降の文字起こしを取得
-        for t in transcripts:
-            transcript_timestamp_str = t.get("timestamp")
-            if transcript_timestamp_str:
-                try:
-                    transcript_timestamp = datetime.fromisoformat(
-                        transcript_timestamp_str.replace("Z", "+00:00")
-                    )
-                    if transcript_timestamp >= context_start:
-                        new_transcripts.append(t)
-                except (ValueError, AttributeError):
-                    # タイムスタンプが不正な場合は含める（安全のため）
-                    logger.warning(
-                        "[ASYNC] Invalid transcript timestamp: %s", transcript_timestamp_str
-                    )
-                    new_transcripts.append(t)
-            else:
-                # タイムスタンプがない場合は含める（後方互換性）
-                new_transcripts.append(t)
-    else:
-        # 前回の要約がない場合は全文字起こしを使用
-        new_transcripts = transcripts
-
-    # 新しい文字起こしテキストを結合
-    all_text_full = "\n".join([t.get("text", "") for t in new_transcripts])
-
-    if not all_text_full.strip():
-        if previous_generated_at:
+    if not window.text.strip():
+        if window.has_previous:
             logger.info(
                 "[ASYNC] No new transcripts since previous summary. Skipping generation."
             )
             return {"accepted": True, "skipped": True, "reason": "no_new_transcripts"}
         raise HTTPException(400, "文字起こしテキストが空です。会議中に音声を録音してください。")
 
-    # 入力サイズ制限：30,000文字を超えた場合のみ直近30,000文字に制限
-    # 30,000文字以下の場合は全体を使用（文脈の完全性を保つため）
-    MAX_CHARS = 30000
-    use_previous_summary = False
-    
-    if len(all_text_full) > MAX_CHARS:
-        # 30,000文字を超える場合のみ、直近30,000文字 + 前回の要約を使用
-        all_text = all_text_full[-MAX_CHARS:]
-        use_previous_summary = True
-        logger.info(
-            "[ASYNC] New transcripts exceed %d chars (%d). Using recent %d chars + previous summary.",
-            MAX_CHARS, len(all_text_full), MAX_CHARS
-        )
-    else:
-        # 30,000文字以下の場合は全体を使用（前回の要約は使わない）
-        all_text = all_text_full
-        use_previous_summary = False
-        logger.info(
-            "[ASYNC] Using all new transcripts (total chars: %d, within limit). Previous summary not used.",
-            len(all_text_full)
-        )
-
-    # 30,000文字超過の場合のみ、前回の要約をコンテキストとして準備
-    previous_summary_context = None
-    if use_previous_summary and previous_summary:
-        # 前回の要約の主要情報をコンテキストとして抽出
-        prev_summary_text = previous_summary.get("summary", "")
-        prev_decisions = previous_summary.get("decisions", [])
-        prev_undecided = previous_summary.get("undecided", [])
-        
-        context_parts = []
-        if prev_summary_text:
-            context_parts.append(f"【前回の要約】\n{prev_summary_text}")
-        if prev_decisions:
-            context_parts.append(f"【前回の決定事項】\n" + "\n".join(f"- {d}" for d in prev_decisions))
-        if prev_undecided:
-            context_parts.append(f"【前回の未決事項】\n" + "\n".join(f"- {u}" for u in prev_undecided))
-        
-        if context_parts:
-            previous_summary_context = "\n\n".join(context_parts)
-            logger.info(
-                "[ASYNC] Previous summary context prepared (length=%d) - will be combined with truncated transcripts",
-                len(previous_summary_context)
-            )
-
-    def _run():
-        try:
-            logger.info(
-                "[ASYNC] Summary generation started: meeting_id=%s, "
-                "input_chars=%d, truncated=%s, using_previous=%s",
-                meeting_id,
-                len(all_text),
-                len(all_text_full) > MAX_CHARS,
-                use_previous_summary,
-            )
-            
-            # 30,000文字超過の場合のみ、前回の要約コンテキストと新しい文字起こしを組み合わせて要約生成
-            if previous_summary_context:
-                # 前回の要約 + 新しい文字起こし（直近30,000文字）を結合
-                combined_text = f"{previous_summary_context}\n\n【新しい会話内容】\n{all_text}"
-                logger.info(
-                    "[ASYNC] Using combined text (previous context + recent %d chars): total_chars=%d",
-                    MAX_CHARS, len(combined_text)
-                )
-                result = summarize_meeting(combined_text, verbose=True)
-            else:
-                # 30,000文字以下の場合は、新しい文字起こしのみを使用
-                result = summarize_meeting(all_text, verbose=True)
-            
-            summary_data = {
-                "generated_at": datetime.now(timezone.utc).isoformat(),
-                "summary": result.summary,
-                "decisions": result.decisions,
-                "undecided": result.undecided,
-                "actions": [action.model_dump() for action in result.actions],
-            }
-            store.save_summary(meeting_id, summary_data)
-            logger.info("[ASYNC] Summary generated and saved: meeting_id=%s", meeting_id)
-        except Exception as exc:  # 失敗時もログのみ（APIは既に返却済み）
-            logger.error("[ASYNC] Summary generation failed: meeting_id=%s, error=%s", meeting_id, exc, exc_info=True)
-
-    background.add_task(_run)
-    # 受け付けたことだけ返却（FastAPI は200を返すが、クライアント側はacceptedを見て判断）
-    return {"accepted": True}
+    input_text, truncated = compose_window_input(window)
+
+    # ジョブキューに登録（同じ会議の待機中ジョブがあれば入力を最新に置き換える）
+    job = get_job_queue().enqueue(
+        JOB_SUMMARY,
+        meeting_id,
+        payload={
+            "text": input_text,
+            "checkpoint": make_checkpoint(window.index.transcripts),
+            "audio_end_sec": window.index.end_sec,
+        },
+        priority=SUMMARY_PRIORITY,
+    )
+    logger.info(
+        "[ASYNC] Summary job queued: meeting_id=%s, job_id=%s, window_entries=%d, input_chars=%d, truncated=%s",
+        meeting_id,
+        job.id,
+        len(window.transcripts),
+        len(input_text),
+        truncated,
+    )
+    # 受け付けたことだけ返却（進捗は GET /jobs/{job_id} で確認する）
+    return {"accepted": True, "job_id": job.id, "status": job.status}
@@ -1,19 +1,38 @@
 """文字起こしエンドポイント"""
 from __future__ import annotations
 
+import asyncio
 import logging
 import os
-import tempfile
 from datetime import datetime, timezone
 from uuid import uuid4
 
-from fastapi import APIRouter, HTTPException, UploadFile, File, Query
+from fastapi import (
+    APIRouter,
+    File,
+    Form,
+    Header,
+    HTTPException,
+    Query,
+    Response,
+    UploadFile,
+    WebSocket,
+    WebSocketDisconnect,
+)
 from fastapi.responses import FileResponse, StreamingResponse
 
 from ..schemas.transcript import TranscriptChunk
-from ..storage import DataStore
-from ..services.asr import transcribe_audio_file, convert_webm_to_format, combine_webm_chunks
+from ..services.asr import combine_webm_chunks, convert_webm_to_format
+from ..services.audio_stream import AudioStreamSession
+from ..services.job_queue import get_job_queue
+from ..services.transcription import (
+    calculate_elapsed_time,
+    enqueue_chunk_transcription,
+    record_transcript,
+    transcribe_chunk,
+)
 from ..settings import settings
+from ..storage import DataStore
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/meetings/{meeting_id}", tags=["transcripts"])
@@ -22,39 +41,6 @@ router = APIRouter(prefix="/meetings/{meeting_id}", tags=["transcripts"])
 store = DataStore(settings.data_dir)
 
 
-def _calculate_elapsed_time(meeting_start_iso: str | None, current_iso: str) -> str:
-    """会議開始時刻からの経過時間を計算してHH:MM:SS形式で返す
-
-    Args:
-        meeting_start_iso: 会議開始時刻（ISO 8601形式）、Noneの場合は空文字列を返す
-        current_iso: 現在のタイムスタンプ（ISO 8601形式）
-
-    Returns:
-        HH:MM:SS形式の経過時間
-    """
-    if not meeting_start_iso:
-        return "00:00:00"
-
-    try:
-        start_time = datetime.fromisoformat(meeting_start_iso.replace("Z", "+00:00"))
-        current_time = datetime.fromisoformat(current_iso.replace("Z", "+00:00"))
-        elapsed_ms = (current_time - start_time).total_seconds() * 1000
-
-        # 負の値の場合は00:00:00を返す
-        if elapsed_ms < 0:
-            return "00:00:00"
-
-        total_seconds = int(elapsed_ms / 1000)
-        hours = total_seconds // 3600
-        minutes = (total_seconds % 3600) // 60
-        seconds = total_seconds % 60
-
-        return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
-    except (ValueError, AttributeError) as e:
-        logger.warning("Failed to calculate elapsed time: %s", e)
-        return "00:00:00"
-
-
 @router.post("/transcripts")
 def add_transcript(meeting_id: str, chunk: TranscriptChunk) -> dict:
     """文字起こしチャンクを追加する。
@@ -76,16 +62,18 @@ def add_transcript(meeting_id: str, chunk: TranscriptChunk) -> dict:
     # 文字起こしデータを準備
     chunk_data = chunk.model_dump()
     
+    chunk_data["id"] = str(uuid4())
+
     # タイムスタンプを追加（絶対時刻）
     current_timestamp = datetime.now(timezone.utc).isoformat()
     chunk_data["timestamp"] = current_timestamp
     
     # 経過時間を計算して追加（会議開始時刻が確定している場合）
     meeting_start_iso = meeting.get("started_at")
-    chunk_data["elapsed_time"] = _calculate_elapsed_time(meeting_start_iso, current_timestamp)
+    chunk_data["elapsed_time"] = calculate_elapsed_time(meeting_start_iso, current_timestamp)
 
     # 新しいストレージ構造: transcripts.jsonに追記
-    store.append_transcript(meeting_id, chunk_data)
+    record_transcript(store, meeting_id, chunk_data)
 
     # 追加後のカウントを取得
     transcripts = store.load_transcripts(meeting_id)
@@ -93,11 +81,18 @@ def add_transcript(meeting_id: str, chunk: TranscriptChunk) -> dict:
 
 
 @router.get("/transcripts")
-def list_transcripts(meeting_id: str) -> list:
+def list_transcripts(
+    meeting_id: str,
+    since: int | None = Query(None, ge=0, description="取得済みの件数（この位置以降の文字起こしのみ返す）"),
+) -> list:
     """文字起こし一覧を取得する。
 
+    transcripts.json は追記のみで更新されるため、取得済みの件数を since に指定すると
+    それ以降に追加された文字起こしだけを取得できる（非同期アップロードの結果のポーリング用）。
+
     Args:
         meeting_id: 会議ID
+        since: 取得済みの件数
 
     Returns:
         文字起こし一覧
@@ -110,25 +105,108 @@ def list_transcripts(meeting_id: str) -> list:
         raise HTTPException(404, "Meeting not found")
 
     # 新しいストレージ構造: transcripts.jsonから読み込む
-    return store.load_transcripts(meeting_id)
+    transcripts = store.load_transcripts(meeting_id)
+    if since is not None:
+        return transcripts[since:]
+    return transcripts
+
+
+def _accepted(response: Response, chunk: dict) -> dict:
+    """非同期で受け付けたチャンクの応答（202）を返す"""
+    response.status_code = 202
+    return {
+        "accepted": True,
+        "chunk_id": chunk["chunk_id"],
+        "job_id": chunk.get("job_id"),
+        "status": chunk.get("status"),
+    }
+
+
+def _replay_chunk(chunk: dict, response: Response) -> dict | None:
+    """冪等キーが一致した既存チャンクの結果を返す
+
+    Returns:
+        保存済みの文字起こし結果、または受付済みの応答（失敗・放置されていて再実行する場合はNone）
+
+    Raises:
+        HTTPException: 同じキーのリクエストを同期で処理中の場合
+    """
+    status = chunk.get("status")
+    if status == "done":
+        response.headers["Idempotent-Replayed"] = "true"
+        return chunk.get("result")
+    if store.is_audio_chunk_claimable(chunk, settings.asr_idempotency_lease_sec):
+        # 失敗したチャンク、または処理中のまま応答が無いチャンクは再実行する
+        return None
+    if chunk.get("job_id"):
+        # 非同期で受け付け済み（文字起こしジョブの待機中・実行中）
+        response.headers["Idempotent-Replayed"] = "true"
+        return _accepted(response, chunk)
+    raise HTTPException(409, "同じ冪等キーのリクエストを処理中です")
+
+
+def _idempotency_key(
+    idempotency_key: str | None, seq: int | None, session_id: str | None
+) -> str | None:
+    """チャンクの冪等キーを決める
+
+    seq はクライアントの録音セッションごとの連番のため、session_id と組み合わせた場合のみ
+    キーにする（別の録音・別のクライアントの同じ seq を再送とみなさない）。
+
+    Returns:
+        冪等キー（指定が無い場合はNone）
+    """
+    if idempotency_key:
+        return f"{session_id}:{idempotency_key}" if session_id else idempotency_key
+    if seq is None:
+        return None
+    if not session_id:
+        logger.warning("seq was given without session_id; skipping idempotency check (seq=%s)", seq)
+        return None
+    return f"seq:{session_id}:{seq}"
 
 
 @router.post("/transcribe")
 async def transcribe_audio_upload(
-    meeting_id: str, file: UploadFile = File(...)
+    meeting_id: str,
+    response: Response,
+    file: UploadFile = File(...),
+    seq: int | None = Form(None),
+    session_id: str | None = Form(None),
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key"),
+    async_mode: bool | None = Query(
+        None, alias="async", description="音声を保存した時点で応答する（省略時は settings.asr_async_upload）"
+    ),
 ) -> dict:
     """会議音声を文字起こしする。
 
+    Idempotency-Key ヘッダー、または session_id と seq（録音セッションごとのチャンク連番）を
+    指定すると、チャンクのマニフェストに記録する。同じキーの再送（タイムアウト後のリトライなど）には
+    変換・文字起こしを再実行せず、保存済みの結果を返す（Idempotent-Replayed ヘッダー付き）。
+    処理中のまま asr_idempotency_lease_sec 秒を過ぎたキー（処理中にプロセスが停止したもの）は、
+    再送で処理を引き継ぐ。
+
+    非同期モードでは、音声をチャンクとして保存した時点で 202 とチャンクIDを返し、
+    文字起こしは専用ワーカーのジョブで実行する。結果は SSE（transcript イベント）または
+    GET /transcripts?since= で取得する。
+
     Args:
         meeting_id: 会議ID
+        response: レスポンス（再送時のヘッダー設定用）
         file: アップロードされた音声ファイル
+        seq: クライアントが付与したチャンクの連番
+        session_id: クライアントの録音セッションID（冪等キーの範囲を分ける）
+        idempotency_key: 冪等キー（Idempotency-Key ヘッダー）
+        async_mode: 非同期モードで受け付けるか
 
     Returns:
-        文字起こし結果
+        文字起こし結果（非同期モードでは受付結果: accepted, chunk_id, job_id, status）
 
     Raises:
-        HTTPException: 会議が見つからない場合、音声処理エラー
+        HTTPException: 会議が見つからない場合、同じキーのリクエストが処理中の場合、音声処理エラー
     """
+    run_async = settings.asr_async_upload if async_mode is None else async_mode
+    chunk = None
     try:
         logger.info("Received transcription request for meeting %s", meeting_id)
 
@@ -138,6 +216,15 @@ async def transcribe_audio_upload(
             logger.error("Meeting not found: %s", meeting_id)
             raise HTTPException(404, "Meeting not found")
 
+        key = _idempotency_key(idempotency_key, seq, session_id)
+        if key:
+            existing = store.find_audio_chunk(meeting_id, key)
+            if existing is not None:
+                replayed = _replay_chunk(existing, response)
+                if replayed is not None:
+                    logger.info("Replaying transcription for meeting %s: key=%s", meeting_id, key)
+                    return replayed
+
         # ファイルの詳細ログ
         logger.info(
             "Audio file: %s, content_type: %s, size: %s",
@@ -159,59 +246,114 @@ async def transcribe_audio_upload(
         content = await file.read()
         logger.info("Audio file content size: %s bytes", len(content))
 
-        # 一時ファイルに保存
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".webm") as temp_file:
-            temp_file.write(content)
-            temp_file_path = temp_file.name
-
-        try:
-            # 音声文字起こし実行
-            result = await transcribe_audio_file(temp_file_path)
-
-            # 文字起こし結果にIDとタイムスタンプを追加
-            current_timestamp = datetime.now(timezone.utc).isoformat()
-            transcript_entry = {
-                "id": str(uuid4()),
-                "timestamp": current_timestamp,
-                "text": result.get("text", ""),
-                "language": result.get("language", "ja"),
-            }
-
-            # 経過時間を計算して追加（会議開始時刻が確定している場合）
-            meeting_start_iso = meeting.get("started_at")
-            transcript_entry["elapsed_time"] = _calculate_elapsed_time(
-                meeting_start_iso, current_timestamp
+        # 音声データをチャンクファイルとして保存（文字起こしに失敗しても音声は残す）
+        # 非同期モードではジョブの登録まで pending、同期モードでは文字起こしの完了まで processing
+        initial_status = "pending" if run_async else "processing"
+        if key:
+            # 新規のチャンク、または失敗・放置されたチャンクの再実行の場合のみ取得できる
+            chunk, claimed = store.claim_audio_chunk(
+                meeting_id,
+                content,
+                key,
+                status=initial_status,
+                seq=seq,
+                session_id=session_id,
+                lease_sec=settings.asr_idempotency_lease_sec,
             )
+            if not claimed:
+                # 同時に届いた再送（他のリクエストが処理を引き継いだ場合を含む）
+                replayed = _replay_chunk(chunk, response)
+                if replayed is None:
+                    raise HTTPException(409, "同じ冪等キーのリクエストを処理中です")
+                return replayed
+        else:
+            chunk = store.append_audio_chunk(meeting_id, content)
 
-            # 新しいストレージ構造: transcripts.jsonに追記
-            store.append_transcript(meeting_id, transcript_entry)
-
-            # 音声データを録音ファイルに追記（1つのファイルにまとめる）
-            store.append_audio_chunk(meeting_id, content)
-
-            # 会議メタデータの更新日時を更新
-            # 注意: parkingフィールドなどの既存データを保護するため、保存前に最新データを再読み込み
-            meeting_to_update = store.load_meeting(meeting_id)
-            if meeting_to_update:
-                meeting_to_update["updated_at"] = datetime.now(timezone.utc).isoformat()
-                store.save_meeting(meeting_id, meeting_to_update)
-
-            logger.info("Transcription completed successfully for meeting %s", meeting_id)
-            return transcript_entry
+        if run_async:
+            job = await asyncio.to_thread(
+                enqueue_chunk_transcription, get_job_queue(), meeting_id, chunk["chunk_id"]
+            )
+            # ワーカーが先に処理を始めていれば、そのステータス（processing / done）を上書きしない
+            chunk = store.mark_audio_chunk_queued(meeting_id, chunk["chunk_id"], job.id)
+            logger.info(
+                "Transcription queued for meeting %s: chunk_id=%s, job_id=%s",
+                meeting_id, chunk["chunk_id"], job.id,
+            )
+            return _accepted(response, chunk)
 
-        finally:
-            # 一時ファイルを削除
-            if os.path.exists(temp_file_path):
-                os.unlink(temp_file_path)
+        transcript_entry = await transcribe_chunk(store, meeting_id, meeting, chunk)
+        logger.info("Transcription completed successfully for meeting %s", meeting_id)
+        return transcript_entry
 
     except HTTPException:
         # HTTPExceptionはそのまま再発生
         raise
     except Exception as e:
         logger.error("Transcription failed for meeting %s: %s", meeting_id, e, exc_info=True)
+        if chunk is not None:
+            # 同じキーの再送で再実行できるよう失敗を記録する
+            store.update_audio_chunk(meeting_id, chunk["chunk_id"], status="failed", error=str(e))
         raise HTTPException(500, f"Transcription failed: {str(e)}")
 
 
+@router.websocket("/audio/ws")
+async def audio_stream_ws(websocket: WebSocket, meeting_id: str) -> None:
+    """会議音声をWebSocketで連続受信して文字起こしする。
+
+    クライアントは MediaRecorder の WebM/Opus ストリームをバイナリメッセージで順に送信する
+    （最初のメッセージはWebMヘッダーを含むこと）。サーバー側で無音区間を検出して発話単位に分割し、
+    文字起こし結果を {"type": "transcript", "transcript": {...}} として返す。
+    テキストメッセージ "stop" を送ると、残りの音声を文字起こしして {"type": "done"} を返し切断する。
+
+    Args:
+        websocket: WebSocket接続
+        meeting_id: 会議ID
+    """
+    meeting = store.load_meeting(meeting_id)
+    if not meeting:
+        await websocket.close(code=1008, reason="Meeting not found")
+        return
+
+    await websocket.accept()
+
+    async def send_transcript(entry: dict) -> None:
+        await websocket.send_json({"type": "transcript", "transcript": entry})
+
+    session = AudioStreamSession(store, meeting_id, meeting, on_transcript=send_transcript)
+    try:
+        await session.start()
+    except RuntimeError as e:
+        logger.error("Failed to start audio stream for meeting %s: %s", meeting_id, e)
+        await websocket.close(code=1011, reason="Audio decoder unavailable")
+        return
+
+    connected = True
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                connected = False
+                break
+            if message.get("bytes"):
+                await session.feed(message["bytes"])
+            elif message.get("text") == "stop":
+                break
+    except WebSocketDisconnect:
+        connected = False
+    except Exception as e:
+        logger.error("Audio stream failed for meeting %s: %s", meeting_id, e, exc_info=True)
+        await session.abort()
+        if connected:
+            await websocket.close(code=1011, reason="Audio stream failed")
+        return
+
+    # 切断された場合も、受信済みの音声は最後まで文字起こしする
+    await session.finish()
+    if connected:
+        await websocket.send_json({"type": "done", "segments": session.segments_transcribed})
+        await websocket.close()
+
+
 @router.get("/audio/download")
 def download_audio(
     meeting_id: str,
@@ -0,0 +1,28 @@
+"""バックグラウンドジョブ関連のスキーマ定義"""
+from __future__ import annotations
+
+from typing import Any
+
+from pydantic import BaseModel, ConfigDict
+
+
+class Job(BaseModel):
+    """バックグラウンドジョブ"""
+
+    model_config = ConfigDict(
+        from_attributes=True,
+        extra="ignore",
+    )
+
+    id: str
+    type: str
+    meeting_id: str | None = None
+    status: str  # queued / running / succeeded / failed
+    priority: int
+    attempts: int
+    max_attempts: int
+    payload: dict[str, Any] = {}
+    result: dict[str, Any] | None = None
+    error: str | None = None
+    created_at: str
+    updated_at: str
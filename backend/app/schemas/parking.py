@@ -14,5 +14,6 @@ class ParkingItem(BaseModel):
     title: str = ""
     content: str = ""
     addToNextAgenda: bool = False
+    title_pending: bool = False  # AIによるタイトル生成待ち（titleは仮のタイトル）
     created_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
 
@@ -6,11 +6,13 @@ Azure OpenAI APIを使用して、より高精度な脱線検知を実装
 
 from __future__ import annotations
 
-import json
+import asyncio
 import logging
 import re
+import time
 from datetime import datetime, timezone
-from typing import List, Dict, Any
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
 
 import httpx
 from pydantic import BaseModel
@@ -20,6 +22,189 @@ from ..settings import settings
 logger = logging.getLogger(__name__)
 
 
+# 脱線検知以外（タイトル生成など）で使うシステムプロンプト
+DEFAULT_SYSTEM_PROMPT = "あなたは会議ファシリテーションの専門家です。必ずJSON形式のみで回答してください。JSON以外のテキストは一切出力しないでください。"
+
+# 脱線検知の指示（全会議で共通）
+# Azure OpenAI のプロンプトキャッシュはプロンプトの先頭が一致する部分に効くため、
+# 共通の指示 → 会議ごとのアジェンダ → 呼び出しごとの発話 の順に並べ、可変部分を最後に置く。
+DEVIATION_INSTRUCTIONS = """あなたは会議ファシリテーションの専門家です。会議の**最新の発話内容**が、設定されたアジェンダ（議題と期待成果物）から脱線しているかを厳密に分析してください。
+必ずJSON形式のみで回答してください。JSON以外のテキストは一切出力しないでください。
+
+## 入力
+ユーザーメッセージで次の内容が与えられます。
+- 過去の発話（コンテキスト参考用、無い場合もある）: 文脈の理解のためだけに使い、判定対象にはしない
+- 分析対象の発話: これが判定対象
+
+## 関連度計算（合計0.0-1.0）
+1. 意味的関連性: 0.0-0.6（議題・期待成果物との合致度）
+2. キーワード: 0.0-0.2（重要語の一致）
+3. 文脈整合性: 0.0-0.2（会議目的との整合）
+
+## 出力（JSONのみ）
+{
+    "is_deviation": true/false,
+    "confidence": 0.0-1.0,
+    "similarity_score": 0.0-1.0,
+    "best_agenda": "議題タイトル",
+    "reasoning": "簡潔に（3行程度）：各要素のスコアと根拠（分析対象の発話を判定した理由）",
+    "suggested_agenda": ["議題1", "議題2"]
+}
+
+**判定は分析対象の発話のみを対象**にしてください。過去のコンテキストは文脈理解のためだけです。
+期待成果物も考慮してください。JSONのみ出力。
+"""
+
+
+# まとめた判定（複数会議の判定を1回のAPI呼び出しで行う）用の指示
+DEVIATION_BATCH_INSTRUCTIONS = DEVIATION_INSTRUCTIONS + """
+## 複数の項目をまとめて判定する場合
+ユーザーメッセージに「# 項目 id=N」で区切られた複数の項目が与えられます。項目ごとに、その項目の
+判定しきい値とアジェンダに対して独立に判定し、次の形式で全項目の結果を出力してください。
+{
+    "results": [
+        {"id": 0, "is_deviation": true/false, "confidence": 0.0-1.0, "similarity_score": 0.0-1.0, "best_agenda": "議題タイトル", "reasoning": "簡潔に", "suggested_agenda": ["議題1", "議題2"]}
+    ]
+}
+"""
+
+
+def _format_agenda(agenda: Tuple[Tuple[str, str, int], ...]) -> str:
+    """アジェンダ項目を詳細に記述（タイトル + 期待成果物 + 所要時間）"""
+    agenda_list = []
+    for idx, (title, expected_outcome, duration) in enumerate(agenda, 1):
+        agenda_str = f"{idx}. 【議題】{title}"
+        if expected_outcome:
+            agenda_str += f"\n    【期待成果物】{expected_outcome}"
+        if duration:
+            agenda_str += f"\n    【所要時間】{duration}分"
+        agenda_list.append(agenda_str)
+    return "\n\n".join(agenda_list)
+
+
+@lru_cache(maxsize=128)
+def _deviation_system_prompt(agenda: Tuple[Tuple[str, str, int], ...], threshold: float) -> str:
+    """アジェンダ・しきい値ごとのシステムプロンプト（アジェンダが変わるまで同じ文字列を再利用）"""
+    return f"""{DEVIATION_INSTRUCTIONS}
+## 判定
+- 関連度 < {threshold} → 脱線
+- 関連度 >= {threshold} → アジェンダに沿っている
+
+## アジェンダ（議題と期待成果物）
+{_format_agenda(agenda)}
+"""
+
+
+def build_deviation_system_prompt(agenda_items: List[Dict[str, Any]], threshold: float) -> str:
+    """脱線検知用のシステムプロンプト（呼び出し間で共通の部分）を取得
+
+    Args:
+        agenda_items: アジェンダ項目のリスト（タイトル、期待成果物、所要時間を含む）
+        threshold: 脱線判定のしきい値
+
+    Returns:
+        共通の指示 + アジェンダのプロンプト
+    """
+    agenda = tuple(
+        (item.get("title", ""), item.get("expectedOutcome", "") or "", item.get("duration", 0) or 0)
+        for item in agenda_items
+    )
+    return _deviation_system_prompt(agenda, threshold)
+
+
+class DeviationResponse(BaseModel):
+    """LLMの判定結果（レスポンスのJSON）"""
+    is_deviation: bool
+    confidence: float
+    similarity_score: float
+    best_agenda: str
+    reasoning: str
+    suggested_agenda: List[str]
+
+
+class DeviationBatchItem(DeviationResponse):
+    """まとめた判定のレスポンスの1項目"""
+    id: int
+
+
+class DeviationBatchResponse(BaseModel):
+    """まとめた判定のレスポンス"""
+    results: List[DeviationBatchItem]
+
+
+class DeviationParseError(ValueError):
+    """LLMのレスポンスを判定結果としてパースできない"""
+
+
+_DEVIATION_RESPONSE_PROPERTIES: Dict[str, Any] = {
+    "is_deviation": {"type": "boolean"},
+    "confidence": {"type": "number"},
+    "similarity_score": {"type": "number"},
+    "best_agenda": {"type": "string"},
+    "reasoning": {"type": "string"},
+    "suggested_agenda": {"type": "array", "items": {"type": "string"}},
+}
+
+# 判定結果のJSONスキーマ（Structured Outputs の strict モード: 全項目必須、追加の項目なし）
+DEVIATION_RESPONSE_FORMAT: Dict[str, Any] = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "deviation_analysis",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": _DEVIATION_RESPONSE_PROPERTIES,
+            "required": list(_DEVIATION_RESPONSE_PROPERTIES),
+            "additionalProperties": False,
+        },
+    },
+}
+
+DEVIATION_BATCH_RESPONSE_FORMAT: Dict[str, Any] = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "deviation_analysis_batch",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "results": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {"id": {"type": "integer"}, **_DEVIATION_RESPONSE_PROPERTIES},
+                        "required": ["id", *_DEVIATION_RESPONSE_PROPERTIES],
+                        "additionalProperties": False,
+                    },
+                },
+            },
+            "required": ["results"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+
+class ParkingTitlesResponse(BaseModel):
+    """保留事項タイトルのまとめた生成のレスポンス"""
+    titles: List[str]
+
+
+PARKING_TITLES_RESPONSE_FORMAT: Dict[str, Any] = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "parking_titles",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {"titles": {"type": "array", "items": {"type": "string"}}},
+            "required": ["titles"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+
 class DeviationAnalysis(BaseModel):
     """脱線検知分析結果"""
     is_deviation: bool
@@ -44,6 +229,44 @@ class AIDeviationService:
         
         if not self.azure_endpoint or not self.api_key:
             logger.error("⚠️ Azure OpenAI設定が不完全です。endpoint と api_key を設定してください。")
+
+        # API使用量の累計（プロンプトキャッシュの効果の確認用）
+        self._usage = {
+            "calls": 0,
+            "prompt_tokens": 0,
+            "cached_tokens": 0,
+            "completion_tokens": 0,
+            "latency_sec": 0.0,
+            "parse_failures": 0,
+            "parse_retries": 0,
+        }
+
+        # 脱線検知のマイクロバッチ（判定待ちの項目と、その結果を受け取るFuture）
+        self._batch_pending: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._batch_timer: asyncio.TimerHandle | None = None
+        self._batch_tasks: set[asyncio.Task] = set()
+        self._batch_stats = {"batches": 0, "batched_items": 0, "fallback_items": 0}
+
+    def _record_usage(self, usage: Dict[str, Any], cached_tokens: int, latency_sec: float) -> None:
+        """API使用量を累計に加算する"""
+        self._usage["calls"] += 1
+        self._usage["prompt_tokens"] += usage.get("prompt_tokens", 0) or 0
+        self._usage["cached_tokens"] += cached_tokens or 0
+        self._usage["completion_tokens"] += usage.get("completion_tokens", 0) or 0
+        self._usage["latency_sec"] += latency_sec
+
+    def get_usage_stats(self) -> Dict[str, Any]:
+        """API使用量の累計（キャッシュされた入力トークンの割合、平均応答時間を含む）を返す"""
+        stats = dict(self._usage)
+        calls = stats.pop("calls")
+        latency_sec = stats.pop("latency_sec")
+        prompt_tokens = stats["prompt_tokens"]
+        return {
+            "calls": calls,
+            **stats,
+            "cached_token_rate": stats["cached_tokens"] / prompt_tokens if prompt_tokens else 0.0,
+            "avg_latency_sec": latency_sec / calls if calls else 0.0,
+        }
     
     async def check_deviation(
         self,
@@ -105,6 +328,10 @@ class AIDeviationService:
             
         Returns:
             脱線検知分析結果（最新チャンクについての判定）
+
+        Raises:
+            Exception: API呼び出しに失敗した場合、またはレスポンスを判定結果としてパースできなかった場合
+                （呼び出し元で従来手法にフォールバックする）
         """
         try:
             # 最新チャンクのテキストを取得
@@ -125,6 +352,9 @@ class AIDeviationService:
                        len(latest_text), len(context_text))
             
             # Azure OpenAI APIでAI脱線検知を実行（最新チャンク + コンテキスト）
+            if settings.deviation_batch_enabled:
+                # 他の会議の判定とまとめて1回のAPI呼び出しで判定する
+                return await self._submit_to_batch(latest_text, context_text, agenda_items, threshold)
             return await self._check_deviation_ai_with_context(
                 latest_text=latest_text,
                 context_text=context_text,
@@ -133,8 +363,9 @@ class AIDeviationService:
             )
             
         except Exception as e:
-            logger.error(f"脱線検知エラー: {e}", exc_info=True)
-            return self._create_error_result(str(e))
+            # スタックトレースは呼び出し元（フォールバックする側）で出力する
+            logger.error(f"脱線検知エラー: {e}")
+            raise
     
     async def _check_deviation_ai(
         self,
@@ -150,20 +381,17 @@ class AIDeviationService:
         logger.info("   アジェンダ項目数: %d, しきい値: %.2f", len(agenda_items), threshold)
         
         # プロンプトを構築
-        prompt = self._build_deviation_prompt(recent_text, agenda_items, threshold)
-        logger.info("📝 プロンプト長: %d文字", len(prompt))
+        system_prompt = build_deviation_system_prompt(agenda_items, threshold)
+        prompt = self._build_deviation_prompt(recent_text)
+        logger.info("📝 プロンプト長: 固定部分=%d文字, 可変部分=%d文字", len(system_prompt), len(prompt))
         logger.debug("   プロンプト（最初の300文字）: %s", prompt[:300])
         
         try:
             # Azure OpenAI APIを呼び出し
             logger.info("🌐 Azure OpenAI API呼び出し開始...")
-            response = await self._call_azure_openai(prompt)
+            response = await self._request_deviation(prompt, system_prompt, DEVIATION_RESPONSE_FORMAT, DeviationResponse)
             logger.info("✅ Azure OpenAI API呼び出し成功")
-            logger.debug("   AIレスポンス（最初の300文字）: %s", response[:300])
-            
-            # レスポンスをパース
-            logger.info("📖 AIレスポンスをパース中...")
-            analysis = self._parse_ai_response(response, recent_text, agenda_items)
+            analysis = self._analysis_from_response(response, recent_text)
             
             logger.info("✅ AI脱線検知完了: is_deviation=%s, similarity_score=%.3f, confidence=%.3f",
                        analysis.is_deviation, analysis.similarity_score, analysis.confidence)
@@ -192,20 +420,17 @@ class AIDeviationService:
         logger.info("   アジェンダ項目数: %d, しきい値: %.2f", len(agenda_items), threshold)
         
         # プロンプトを構築（最新チャンク + コンテキスト）
-        prompt = self._build_deviation_prompt_with_context(latest_text, context_text, agenda_items, threshold)
-        logger.info("📝 プロンプト長: %d文字", len(prompt))
+        system_prompt = build_deviation_system_prompt(agenda_items, threshold)
+        prompt = self._build_deviation_prompt_with_context(latest_text, context_text)
+        logger.info("📝 プロンプト長: 固定部分=%d文字, 可変部分=%d文字", len(system_prompt), len(prompt))
         logger.debug("   プロンプト（最初の300文字）: %s", prompt[:300])
         
         try:
             # Azure OpenAI APIを呼び出し
             logger.info("🌐 Azure OpenAI API呼び出し開始...")
-            response = await self._call_azure_openai(prompt)
+            response = await self._request_deviation(prompt, system_prompt, DEVIATION_RESPONSE_FORMAT, DeviationResponse)
             logger.info("✅ Azure OpenAI API呼び出し成功")
-            logger.debug("   AIレスポンス（最初の300文字）: %s", response[:300])
-            
-            # レスポンスをパース
-            logger.info("📖 AIレスポンスをパース中...")
-            analysis = self._parse_ai_response(response, latest_text, agenda_items)
+            analysis = self._analysis_from_response(response, latest_text)
             
             logger.info("✅ AI脱線検知完了: is_deviation=%s, similarity_score=%.3f, confidence=%.3f",
                        analysis.is_deviation, analysis.similarity_score, analysis.confidence)
@@ -218,131 +443,199 @@ class AIDeviationService:
             logger.error(f"Azure OpenAI API呼び出しエラー: {e}")
             raise  # エラーを上位に伝播
     
-    def _build_deviation_prompt(self, recent_text: str, agenda_items: List[Dict[str, Any]], threshold: float) -> str:
-        """脱線検知用のプロンプトを構築"""
-        
-        # アジェンダ項目を詳細に記述（タイトル + 期待成果物）
-        agenda_list = []
-        for idx, item in enumerate(agenda_items, 1):
-            title = item.get("title", "")
-            expected_outcome = item.get("expectedOutcome", "")
-            duration = item.get("duration", 0)
-            
-            agenda_str = f"{idx}. 【議題】{title}"
-            if expected_outcome:
-                agenda_str += f"\n    【期待成果物】{expected_outcome}"
-            if duration:
-                agenda_str += f"\n    【所要時間】{duration}分"
-            
-            agenda_list.append(agenda_str)
-        
-        agenda_text = "\n\n".join(agenda_list)
-        
-        prompt = f"""
-あなたは会議ファシリテーションの専門家です。以下の会議の発話内容が、設定されたアジェンダ（議題と期待成果物）から脱線しているかを厳密に分析してください。
+    async def _submit_to_batch(
+        self,
+        latest_text: str,
+        context_text: str,
+        agenda_items: List[Dict[str, Any]],
+        threshold: float,
+    ) -> DeviationAnalysis:
+        """判定をマイクロバッチに追加し、結果を待つ
 
-## アジェンダ（議題と期待成果物）
-{agenda_text}
+        最初の項目の追加から deviation_batch_window_ms 経過するか、項目数が deviation_batch_max_size に
+        達した時点で、溜まった項目をまとめて判定する。
+        """
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future = loop.create_future()
+        item = {
+            "latest_text": latest_text,
+            "context_text": context_text,
+            "agenda_items": agenda_items,
+            "threshold": threshold,
+        }
+        self._batch_pending.append((item, future))
 
-## 分析対象の発話
-{recent_text}
+        if len(self._batch_pending) >= settings.deviation_batch_max_size:
+            self._flush_batch()
+        elif self._batch_timer is None:
+            self._batch_timer = loop.call_later(settings.deviation_batch_window_ms / 1000, self._flush_batch)
+        return await future
 
-## 関連度計算（合計0.0-1.0）
-1. 意味的関連性: 0.0-0.6（議題・期待成果物との合致度）
-2. キーワード: 0.0-0.2（重要語の一致）
-3. 文脈整合性: 0.0-0.2（会議目的との整合）
+    def _flush_batch(self) -> None:
+        """溜まった項目を取り出し、まとめて判定するタスクを開始する"""
+        if self._batch_timer is not None:
+            self._batch_timer.cancel()
+            self._batch_timer = None
+        batch, self._batch_pending = self._batch_pending, []
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._run_batch(batch))
+            # 実行中のタスクがガベージコレクションされないよう参照を保持する
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def _run_batch(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]) -> None:
+        """まとめた項目を判定し、結果をそれぞれの呼び出し元に返す
+
+        1件のみの場合は通常の判定を行う。まとめた判定のレスポンスをパースできない項目は、
+        その項目だけ個別に判定し直す。
+        """
+        items = [item for item, _ in batch]
+        if len(batch) == 1:
+            results: List[DeviationAnalysis | BaseException | None] = [None]
+        else:
+            try:
+                results = await self._check_deviation_ai_batch(items)
+            except Exception as e:
+                # API呼び出し自体の失敗は個別に呼び直しても同じ結果になりやすいため、そのまま返す
+                logger.error(f"脱線検知のまとめた判定でエラー: {e}")
+                results = [e] * len(batch)
+
+        retry = [i for i, result in enumerate(results) if result is None]
+        if len(batch) > 1 and retry:
+            logger.warning("⚠️ まとめた判定の結果を取得できなかった %d件 を個別に判定します", len(retry))
+            self._batch_stats["fallback_items"] += len(retry)
+        retried = await asyncio.gather(
+            *(
+                self._check_deviation_ai_with_context(
+                    latest_text=items[i]["latest_text"],
+                    context_text=items[i]["context_text"],
+                    agenda_items=items[i]["agenda_items"],
+                    threshold=items[i]["threshold"],
+                )
+                for i in retry
+            ),
+            return_exceptions=True,
+        )
+        for i, result in zip(retry, retried, strict=True):
+            results[i] = result
+
+        for (_, future), result in zip(batch, results, strict=True):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def _check_deviation_ai_batch(
+        self, items: List[Dict[str, Any]]
+    ) -> List[DeviationAnalysis | None]:
+        """複数の判定を1回のAPI呼び出しで行う（Azure OpenAI使用）
+
+        Args:
+            items: 判定項目（latest_text, context_text, agenda_items, threshold）のリスト
+
+        Returns:
+            項目の順に並んだ判定結果（レスポンスに含まれない・パースできない項目はNone）
+        """
+        logger.info("🤖 _check_deviation_ai_batch: %d件をまとめて判定", len(items))
+        prompt = self._build_deviation_batch_prompt(items)
+        logger.info("📝 プロンプト長: 固定部分=%d文字, 可変部分=%d文字", len(DEVIATION_BATCH_INSTRUCTIONS), len(prompt))
+
+        self._batch_stats["batches"] += 1
+        self._batch_stats["batched_items"] += len(items)
+
+        results: List[DeviationAnalysis | None] = [None] * len(items)
+        try:
+            response = await self._request_deviation(
+                prompt,
+                DEVIATION_BATCH_INSTRUCTIONS,
+                DEVIATION_BATCH_RESPONSE_FORMAT,
+                DeviationBatchResponse,
+                max_completion_tokens=min(
+                    settings.deviation_max_completion_tokens * len(items),
+                    settings.deviation_batch_max_completion_tokens,
+                ),
+                retries=0,  # 失敗した場合は項目ごとの呼び出しで判定し直す
+            )
+        except DeviationParseError:
+            return results
+
+        for entry in response.results:
+            if 0 <= entry.id < len(items) and results[entry.id] is None:
+                results[entry.id] = self._analysis_from_response(entry, items[entry.id]["latest_text"])
+        return results
+
+    def _build_deviation_batch_prompt(self, items: List[Dict[str, Any]]) -> str:
+        """まとめた判定用のユーザープロンプトを構築（項目ごとにアジェンダ・しきい値・発話を記述）"""
+        sections = []
+        for index, item in enumerate(items):
+            threshold = item["threshold"]
+            agenda = tuple(
+                (a.get("title", ""), a.get("expectedOutcome", "") or "", a.get("duration", 0) or 0)
+                for a in item["agenda_items"]
+            )
+            sections.append(f"""# 項目 id={index}
 
 ## 判定
 - 関連度 < {threshold} → 脱線
 - 関連度 >= {threshold} → アジェンダに沿っている
 
-## 出力（JSONのみ）
-{{
-    "is_deviation": true/false,
-    "confidence": 0.0-1.0,
-    "similarity_score": 0.0-1.0,
-    "best_agenda": "議題タイトル",
-    "reasoning": "簡潔に（3行程度）：各要素のスコアと根拠",
-    "suggested_agenda": ["議題1", "議題2"]
-}}
+## アジェンダ（議題と期待成果物）
+{_format_agenda(agenda)}
 
-期待成果物も考慮してください。JSONのみ出力。
+{self._build_deviation_prompt_with_context(item["latest_text"], item["context_text"])}""")
+        return f"以下の{len(items)}件をそれぞれ判定してください。\n\n" + "\n\n".join(sections)
+
+    def get_batch_stats(self) -> Dict[str, Any]:
+        """マイクロバッチの統計（まとめた呼び出し回数・項目数・個別に判定し直した項目数）を返す"""
+        stats = dict(self._batch_stats)
+        stats["avg_batch_size"] = stats["batched_items"] / stats["batches"] if stats["batches"] else 0.0
+        return stats
+
+    def _build_deviation_prompt(self, recent_text: str) -> str:
+        """脱線検知用のユーザープロンプト（可変部分）を構築"""
+        return f"""## 分析対象の発話
+{recent_text}
 """
-        return prompt
-    
-    def _build_deviation_prompt_with_context(
-        self,
-        latest_text: str,
-        context_text: str,
-        agenda_items: List[Dict[str, Any]],
-        threshold: float
-    ) -> str:
-        """脱線検知用のプロンプトを構築（最新チャンク + 過去コンテキスト方式）"""
-        
-        # アジェンダ項目を詳細に記述（タイトル + 期待成果物）
-        agenda_list = []
-        for idx, item in enumerate(agenda_items, 1):
-            title = item.get("title", "")
-            expected_outcome = item.get("expectedOutcome", "")
-            duration = item.get("duration", 0)
-            
-            agenda_str = f"{idx}. 【議題】{title}"
-            if expected_outcome:
-                agenda_str += f"\n    【期待成果物】{expected_outcome}"
-            if duration:
-                agenda_str += f"\n    【所要時間】{duration}分"
-            
-            agenda_list.append(agenda_str)
-        
-        agenda_text = "\n\n".join(agenda_list)
+
+    def _build_deviation_prompt_with_context(self, latest_text: str, context_text: str) -> str:
+        """脱線検知用のユーザープロンプト（可変部分）を構築（最新チャンク + 過去コンテキスト方式）"""
         
         # コンテキスト部分の記述
         context_section = ""
         if context_text:
-            context_section = f"""
-## 過去の発話（コンテキスト参考用）
+            context_section = f"""## 過去の発話（コンテキスト参考用）
 以下の発話は過去90秒の内容です。参考情報として使用してください。判定対象ではありません。
 
 {context_text}
+
 """
         
-        prompt = f"""
-あなたは会議ファシリテーションの専門家です。以下の会議の**最新の発話内容**が、設定されたアジェンダ（議題と期待成果物）から脱線しているかを厳密に分析してください。
-
-## アジェンダ（議題と期待成果物）
-{agenda_text}
-{context_section}
-## 分析対象の発話（最新30秒）
+        return f"""{context_section}## 分析対象の発話（最新30秒）
 **重要**: 以下が判定対象です。過去のコンテキストは参考情報としてのみ使用してください。
 
 {latest_text}
-
-## 関連度計算（合計0.0-1.0）
-1. 意味的関連性: 0.0-0.6（議題・期待成果物との合致度）
-2. キーワード: 0.0-0.2（重要語の一致）
-3. 文脈整合性: 0.0-0.2（会議目的との整合）
-
-## 判定
-- 関連度 < {threshold} → 脱線
-- 関連度 >= {threshold} → アジェンダに沿っている
-
-## 出力（JSONのみ）
-{{
-    "is_deviation": true/false,
-    "confidence": 0.0-1.0,
-    "similarity_score": 0.0-1.0,
-    "best_agenda": "議題タイトル",
-    "reasoning": "簡潔に（3行程度）：各要素のスコアと根拠（最新チャンクを判定した理由）",
-    "suggested_agenda": ["議題1", "議題2"]
-}}
-
-**判定は最新30秒の発話のみを対象**にしてください。過去のコンテキストは文脈理解のためだけです。
-期待成果物も考慮してください。JSONのみ出力。
 """
-        return prompt
     
-    async def _call_azure_openai(self, prompt: str) -> str:
-        """Azure OpenAI APIを呼び出し"""
+    async def _call_azure_openai(
+        self,
+        prompt: str,
+        system_prompt: str = DEFAULT_SYSTEM_PROMPT,
+        max_completion_tokens: int = 2000,
+        response_format: Dict[str, Any] | None = None,
+    ) -> str:
+        """Azure OpenAI APIを呼び出し
+
+        Args:
+            prompt: ユーザープロンプト（呼び出しごとに変わる部分）
+            system_prompt: システムプロンプト（呼び出し間で共通の部分。プロンプトキャッシュの対象）
+            max_completion_tokens: 出力トークン数の上限（reasoningモデルでは推論トークンを含む）
+            response_format: レスポンス形式（省略時はJSONオブジェクト）
+
+        Returns:
+            レスポンスのテキスト
+        """
         
         url = f"{self.azure_endpoint}/openai/deployments/{self.deployment}/chat/completions"
         headers = {
@@ -354,22 +647,26 @@ class AIDeviationService:
             "messages": [
                 {
                     "role": "system",
-                    "content": "あなたは会議ファシリテーションの専門家です。必ずJSON形式のみで回答してください。JSON以外のテキストは一切出力しないでください。"
+                    "content": system_prompt
                 },
                 {
                     "role": "user",
                     "content": prompt
                 }
             ],
-            "max_completion_tokens": 2000,  # reasoningモデル用に増加（1000→2000）
-            "response_format": {"type": "json_object"}  # JSON出力を強制
+            "max_completion_tokens": max_completion_tokens,
+            "response_format": response_format or {"type": "json_object"}  # JSON出力を強制
         }
+        if settings.deviation_reasoning_effort and response_format is not None:
+            # 判定（構造化出力）の呼び出しでは推論の量を抑え、出力トークンと応答時間を減らす
+            payload["reasoning_effort"] = settings.deviation_reasoning_effort
         
         logger.info(f"🌐 Azure OpenAI API呼び出し: {url}")
         logger.info(f"   APIバージョン: {self.api_version}")
         logger.info(f"   デプロイメント: {self.deployment}")
         logger.info(f"   プロンプトトークン数（推定）: {len(prompt.split())}")
         
+        started = time.perf_counter()
         async with httpx.AsyncClient(timeout=30.0) as client:
             response = await client.post(
                 url,
@@ -383,9 +680,12 @@ class AIDeviationService:
             
             # レスポンスの詳細をログ出力
             usage = result.get("usage", {})
+            cached_tokens = (usage.get("prompt_tokens_details") or {}).get("cached_tokens", 0)
             logger.info(f"📊 API使用量: prompt_tokens={usage.get('prompt_tokens', 0)}, "
+                       f"cached_tokens={cached_tokens}, "
                        f"completion_tokens={usage.get('completion_tokens', 0)}, "
                        f"total_tokens={usage.get('total_tokens', 0)}")
+            self._record_usage(usage, cached_tokens, time.perf_counter() - started)
             
             if "completion_tokens_details" in usage:
                 reasoning_tokens = usage.get("completion_tokens_details", {}).get("reasoning_tokens", 0)
@@ -406,65 +706,74 @@ class AIDeviationService:
             
             return content
     
-    def _parse_ai_response(
+    async def _request_deviation(
         self,
-        response: str,
-        recent_text: str,
-        agenda_items: List[Dict[str, Any]]
-    ) -> DeviationAnalysis:
-        """AIレスポンスをパースしてDeviationAnalysisオブジェクトを作成"""
+        prompt: str,
+        system_prompt: str,
+        response_format: Dict[str, Any],
+        model: type[BaseModel],
+        max_completion_tokens: int | None = None,
+        retries: int | None = None,
+    ) -> Any:
+        """判定用にAPIを呼び出し、レスポンスをJSONスキーマに沿って検証する
+
+        空のレスポンス（出力トークンの上限に達した場合など）や検証に失敗したレスポンスは、
+        出力トークンの上限を2倍にして再度呼び出す（共通部分はプロンプトキャッシュが効くため安価）。
+
+        Args:
+            prompt: ユーザープロンプト
+            system_prompt: システムプロンプト
+            response_format: レスポンス形式（JSONスキーマ）
+            model: レスポンスを検証するモデル
+            max_completion_tokens: 出力トークン数の上限（省略時は settings.deviation_max_completion_tokens）
+            retries: 再試行の回数（省略時は settings.deviation_parse_retries）
+
+        Returns:
+            検証済みのレスポンス（model のインスタンス）
+
+        Raises:
+            DeviationParseError: 再試行してもパースできなかった場合
+        """
+        budget = max_completion_tokens or settings.deviation_max_completion_tokens
+        retries = settings.deviation_parse_retries if retries is None else retries
+        error: Exception | None = None
+        for attempt in range(retries + 1):
+            if attempt:
+                self._usage["parse_retries"] += 1
+                budget *= 2
+            try:
+                content = await self._call_azure_openai(
+                    prompt,
+                    system_prompt=system_prompt,
+                    max_completion_tokens=budget,
+                    response_format=response_format,
+                )
+                return model.model_validate_json(content)
+            except ValueError as e:  # 空のレスポンス・JSONの構文エラー・スキーマ違反（ValidationError）
+                self._usage["parse_failures"] += 1
+                logger.error(f"❌ AIレスポンスのパースエラー（試行{attempt + 1}/{retries + 1}）: {e}")
+                error = e
+        raise DeviationParseError(f"AIレスポンスをパースできません: {error}")
+
+    def _analysis_from_response(self, response: DeviationResponse, recent_text: str) -> DeviationAnalysis:
+        """検証済みのAIの判定結果からDeviationAnalysisオブジェクトを作成"""
+        # メッセージを生成
+        if response.is_deviation:
+            message = f"直近の発話がアジェンダ「{response.best_agenda}」から脱線している可能性があります（関連度: {response.similarity_score:.2f}）"
+        else:
+            message = f"アジェンダ「{response.best_agenda}」に沿った発話です（関連度: {response.similarity_score:.2f}）"
         
-        try:
-            # JSONを抽出（```json```で囲まれている場合がある）
-            if "```json" in response:
-                json_start = response.find("```json") + 7
-                json_end = response.find("```", json_start)
-                json_str = response[json_start:json_end].strip()
-            else:
-                json_str = response.strip()
-            
-            # JSONをパース
-            data = json.loads(json_str)
-            
-            # アジェンダタイトルリストを作成（フォールバック用）
-            agenda_titles = [item.get("title", "") for item in agenda_items if item.get("title")]
-            
-            # メッセージを生成
-            if data.get("is_deviation", False):
-                message = f"直近の発話がアジェンダ「{data.get('best_agenda', '')}」から脱線している可能性があります（関連度: {data.get('similarity_score', 0):.2f}）"
-            else:
-                message = f"アジェンダ「{data.get('best_agenda', '')}」に沿った発話です（関連度: {data.get('similarity_score', 0):.2f}）"
-            
-            return DeviationAnalysis(
-                is_deviation=data.get("is_deviation", False),
-                confidence=data.get("confidence", 0.0),
-                similarity_score=data.get("similarity_score", 0.0),
-                best_agenda=data.get("best_agenda", ""),
-                message=message,
-                suggested_agenda=data.get("suggested_agenda", []),
-                recent_text=recent_text,
-                reasoning=data.get("reasoning", ""),
-                timestamp=datetime.now(timezone.utc).isoformat()
-            )
-            
-        except (json.JSONDecodeError, KeyError) as e:
-            logger.error(f"❌ AIレスポンスのパースエラー: {e}")
-            logger.error(f"   レスポンス内容（最初の500文字）: {response[:500] if response else '(空)'}")
-            logger.error(f"   レスポンス長: {len(response) if response else 0}")
-            logger.error(f"   エラー詳細: {type(e).__name__}")
-            # フォールバック: デフォルト値を返す
-            agenda_titles = [item.get("title", "") for item in agenda_items if item.get("title")]
-            return DeviationAnalysis(
-                is_deviation=False,
-                confidence=0.0,
-                similarity_score=0.0,
-                best_agenda=agenda_titles[0] if agenda_titles else "",
-                message="AI分析に失敗しました",
-                suggested_agenda=agenda_titles[:2] if agenda_titles else [],
-                recent_text=recent_text,
-                reasoning=f"AIレスポンスのパースに失敗: {str(e)}",
-                timestamp=datetime.now(timezone.utc).isoformat()
-            )
+        return DeviationAnalysis(
+            is_deviation=response.is_deviation,
+            confidence=response.confidence,
+            similarity_score=response.similarity_score,
+            best_agenda=response.best_agenda,
+            message=message,
+            suggested_agenda=response.suggested_agenda,
+            recent_text=recent_text,
+            reasoning=response.reasoning,
+            timestamp=datetime.now(timezone.utc).isoformat()
+        )
     
     def _create_no_data_result(self) -> DeviationAnalysis:
         """データ不足時の結果"""
@@ -531,6 +840,62 @@ class AIDeviationService:
             logger.warning(f"⚠️ エラー発生のためフォールバック: {fallback_title}")
             return fallback_title
     
+    async def generate_parking_titles(self, deviation_texts: List[str]) -> List[str | None]:
+        """
+        複数の脱線内容から保留事項のタイトルをまとめて生成（1回のAPI呼び出し）
+
+        まとめた生成に失敗した場合は1件ずつ生成し直す。
+
+        Args:
+            deviation_texts: 脱線検知された発話内容のリスト
+
+        Returns:
+            生成されたタイトルのリスト（生成に失敗した項目はNone）
+        """
+        if len(deviation_texts) > 1:
+            try:
+                return await self._generate_titles_ai(deviation_texts)
+            except Exception as e:
+                logger.error(f"❌ タイトルのまとめた生成に失敗したため、1件ずつ生成します: {e}")
+
+        titles: List[str | None] = []
+        for text in deviation_texts:
+            try:
+                titles.append(await self._generate_title_ai(text))
+            except Exception as e:
+                logger.error(f"❌ タイトル生成エラー: {e}")
+                titles.append(None)
+        return titles
+
+    async def _generate_titles_ai(self, deviation_texts: List[str]) -> List[str]:
+        """Azure OpenAI APIを使用して複数のタイトルをまとめて生成"""
+        items = "\n\n".join(f"### {i + 1}\n{text}" for i, text in enumerate(deviation_texts))
+        prompt = f"""
+以下の会議中の{len(deviation_texts)}件の発話内容から、それぞれ簡潔で分かりやすい保留事項のタイトルを生成してください。
+
+## 発話内容
+{items}
+
+## 要件
+- タイトルは30文字以内で簡潔に
+- 発話内容の本質を捉えた表現
+- 日本語で自然な表現
+- 箇条書きや記号は使用しない
+
+## 出力形式
+発話内容の順に、titles にタイトルを{len(deviation_texts)}件並べてください。
+例: {{"titles": ["PowerPoint出力時のフォントずれ対策"]}}
+"""
+        response = await self._call_azure_openai(
+            prompt,
+            max_completion_tokens=settings.deviation_max_completion_tokens * len(deviation_texts),
+            response_format=PARKING_TITLES_RESPONSE_FORMAT,
+        )
+        titles = ParkingTitlesResponse.model_validate_json(response).titles
+        if len(titles) != len(deviation_texts):
+            raise ValueError(f"タイトルの件数が一致しません: {len(titles)} != {len(deviation_texts)}")
+        return [title.strip()[:30] for title in titles]
+
     async def _generate_title_ai(self, deviation_text: str) -> str:
         """Azure OpenAI APIを使用してタイトルを生成"""
         
@@ -4,14 +4,19 @@ ASR (Automatic Speech Recognition) サービス
 無料の音声認識機能の実装
 """
 
+import asyncio
+import logging
 import os
-import re
 import subprocess
 import tempfile
-from typing import List, Dict, Any, Tuple
-import logging
-import numpy as np
 import wave
+from collections.abc import Awaitable, Callable
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from .asr_cache import get_asr_cache, make_cache_key, pcm_digest_from_wav
+from .hallucination_filter import get_hallucination_filter
 
 logger = logging.getLogger(__name__)
 
@@ -92,34 +97,7 @@ def _filter_hallucination_text(text: str, is_weakly_silence: bool = False) -> st
     Returns:
         フィルタリング後のテキスト（幻聴と判定された場合は空文字列）
     """
-    if not text:
-        return ""
-    
-    # 日本語文字（ひらがな、カタカナ、漢字）の割合をチェック
-    japanese_chars = re.findall(r'[\u3040-\u309F\u30A0-\u30FF\u4E00-\u9FAF]', text)
-    total_chars = len(re.findall(r'[^\s]', text))  # 空白以外の文字数
-    japanese_ratio = len(japanese_chars) / total_chars if total_chars > 0 else 0
-    
-    # 日本語の割合が20%未満の場合は除外（明らかに日本語ではない）
-    if total_chars > 5 and japanese_ratio < 0.2:
-        logger.info(f">>> 日本語の割合が低すぎます（{japanese_ratio:.2%} < 20%）、無視します")
-        return ""
-    
-    # 明らかに不正なパターンのみ検出（最小限）
-    hallucination_patterns = [
-        r'ご視聴.*?ありがとう',
-        r'Thanks?\s+for\s+watching',
-        r'让我们来看看',
-        r'視聴.*?感謝',
-        r'ご.*?視聴.*?ございました',
-    ]
-    
-    for pattern in hallucination_patterns:
-        if re.search(pattern, text, re.IGNORECASE):
-            logger.info(f">>> 幻聴パターンを検出 ({pattern}), 無視します: {text[:100]}")
-            return ""
-    
-    return text
+    return get_hallucination_filter().filter(text)
 
 
 def combine_webm_chunks(chunk_files: list[str], output_path: str) -> str:
@@ -142,9 +120,9 @@ def combine_webm_chunks(chunk_files: list[str], output_path: str) -> str:
         RuntimeError: 結合に失敗した場合
     """
     import logging
+    import shutil
     import subprocess
     import tempfile
-    import shutil
     
     logger = logging.getLogger(__name__)
     
@@ -572,15 +550,18 @@ async def transcribe_with_python_whisper(audio_file_path: str) -> Dict[str, Any]
             return {
                 "text": "",
                 "language": "ja",
+                "duration": audio_info["duration"],
+                "segments": [],
             }
 
         # キャッシュされたモデルを取得
         model = _get_whisper_model()
 
         # WAVファイルを直接NumPy配列として読み込み
-        import numpy as np
         import wave
 
+        import numpy as np
+
         with wave.open(audio_file_path, 'rb') as wav_file:
             sample_rate = wav_file.getframerate()
             n_frames = wav_file.getnframes()
@@ -599,6 +580,11 @@ async def transcribe_with_python_whisper(audio_file_path: str) -> Dict[str, Any]
             raise
 
         text = result["text"].strip()
+        # 発話区間（音声内の秒数）。文字起こしエントリの音声時刻の算出に使用
+        segments = [
+            {"start": seg["start"], "end": seg["end"], "text": seg["text"]}
+            for seg in result.get("segments", [])
+        ]
         
         # テキストの幻聴フィルタリング
         # 緩やかな無音判定（bytes/秒またはRMSが低めの場合）
@@ -625,6 +611,8 @@ async def transcribe_with_python_whisper(audio_file_path: str) -> Dict[str, Any]
         return {
             "text": filtered_text,
             "language": "ja",
+            "duration": audio_info["duration"],
+            "segments": segments,
         }
 
     except ImportError as e:
@@ -635,12 +623,61 @@ async def transcribe_with_python_whisper(audio_file_path: str) -> Dict[str, Any]
         raise
 
 
-async def transcribe_audio_file(audio_file_path: str) -> Dict[str, Any]:
+def _convert_webm_file_to_wav(webm_path: str) -> bytes:
+    """WebMファイルを読み込んでWAVデータに変換する"""
+    with open(webm_path, 'rb') as f:
+        webm_data = f.read()
+    return convert_webm_to_wav(webm_data)
+
+
+async def _transcribe_with_cache(
+    provider: str,
+    wav_path: str,
+    transcribe: Callable[[str], Awaitable[Dict[str, Any]]],
+    use_cache: bool = True,
+) -> Dict[str, Any]:
+    """ASRキャッシュを確認し、無ければASRを呼び出して結果をキャッシュする
+
+    Args:
+        provider: ASRプロバイダー（モデル/デプロイメントを含む、キャッシュキーに使用）
+        wav_path: WAVファイルのパス
+        transcribe: ASR呼び出し関数
+        use_cache: キャッシュを使うか（Falseの場合は確認も保存もしない）
+
+    Returns:
+        文字起こし結果
+    """
+    from ..settings import settings
+
+    # 初回はキャッシュディレクトリを走査してインデックスを作るため、スレッドで取得する
+    cache = await asyncio.to_thread(get_asr_cache) if use_cache else None
+    if cache is None:
+        return await transcribe(wav_path)
+
+    # WAVの読み込み・ハッシュ計算とキャッシュファイルの読み書きはイベントループを止めないようスレッドで行う
+    pcm_digest = await asyncio.to_thread(pcm_digest_from_wav, wav_path)
+    key = make_cache_key(pcm_digest, provider, settings.asr_language, settings.asr_temperature)
+    cached = await asyncio.to_thread(cache.get, key)
+    if cached is not None:
+        stats = cache.stats()
+        logger.info(
+            ">>> ASRキャッシュにヒット（ASR呼び出しをスキップ）: hit_rate=%.1f%% (%d/%d)",
+            stats["hit_rate"] * 100, stats["hits"], stats["hits"] + stats["misses"],
+        )
+        return cached
+
+    result = await transcribe(wav_path)
+    await asyncio.to_thread(cache.put, key, result)
+    return result
+
+
+async def transcribe_audio_file(audio_file_path: str, use_cache: bool = True) -> Dict[str, Any]:
     """
     音声ファイルを文字起こしする（Python版Whisper使用）
     
     Args:
         audio_file_path: 音声ファイルのパス
+        use_cache: ASRキャッシュを使うか（一度きりの音声（暫定文字起こしの窓など）ではFalse）
         
     Returns:
         文字起こし結果（テキスト、信頼度等）
@@ -664,10 +701,8 @@ async def transcribe_audio_file(audio_file_path: str) -> Dict[str, Any]:
                 temp_wav_path = None
 
                 if audio_file_path.lower().endswith('.webm'):
-                    with open(audio_file_path, 'rb') as f:
-                        webm_data = f.read()
-
-                    wav_data = convert_webm_to_wav(webm_data)
+                    # FFmpegでの変換はイベントループを止めないようスレッドで行う
+                    wav_data = await asyncio.to_thread(_convert_webm_file_to_wav, audio_file_path)
 
                     # 一時WAVファイルとして保存
                     with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_wav:
@@ -676,7 +711,7 @@ async def transcribe_audio_file(audio_file_path: str) -> Dict[str, Any]:
                         processed_audio_path = temp_wav_path
 
                 # 音声品質チェック（無音判定）
-                is_valid, audio_info = _check_audio_quality(processed_audio_path)
+                is_valid, audio_info = await asyncio.to_thread(_check_audio_quality, processed_audio_path)
                 
                 if not is_valid:
                     logger.info(">>> 音声データが無音と判定されました（Azure Whisperに送信せずスキップ）")
@@ -689,10 +724,17 @@ async def transcribe_audio_file(audio_file_path: str) -> Dict[str, Any]:
                     return {
                         "text": "",
                         "language": "ja",
+                        "duration": audio_info["duration"],
+                        "segments": [],
                     }
 
-                # Azure Whisperで文字起こし実行
-                result = await transcribe_with_azure_whisper(processed_audio_path)
+                # Azure Whisperで文字起こし実行（同じ音声はキャッシュから返す）
+                result = await _transcribe_with_cache(
+                    f"azure_whisper:{settings.azure_whisper_deployment}",
+                    processed_audio_path,
+                    transcribe_with_azure_whisper,
+                    use_cache=use_cache,
+                )
                 
                 # テキストの幻聴フィルタリング
                 # 緩やかな無音判定（bytes/秒またはRMSが低めの場合）
@@ -739,10 +781,8 @@ async def transcribe_audio_file(audio_file_path: str) -> Dict[str, Any]:
                 temp_wav_path = None
 
                 if audio_file_path.lower().endswith('.webm'):
-                    with open(audio_file_path, 'rb') as f:
-                        webm_data = f.read()
-
-                    wav_data = convert_webm_to_wav(webm_data)
+                    # FFmpegでの変換はイベントループを止めないようスレッドで行う
+                    wav_data = await asyncio.to_thread(_convert_webm_file_to_wav, audio_file_path)
 
                     # 一時WAVファイルとして保存
                     with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_wav:
@@ -751,7 +791,12 @@ async def transcribe_audio_file(audio_file_path: str) -> Dict[str, Any]:
                         processed_audio_path = temp_wav_path
 
                 # Python Whisperで文字起こし実行（Azure Whisperと同じロジック）
-                result = await transcribe_with_python_whisper(processed_audio_path)
+                result = await _transcribe_with_cache(
+                    "whisper_python:tiny",
+                    processed_audio_path,
+                    transcribe_with_python_whisper,
+                    use_cache=use_cache,
+                )
 
                 # 一時ファイルをクリーンアップ
                 if temp_wav_path and os.path.exists(temp_wav_path):
@@ -0,0 +1,94 @@
+"""ASR結果キャッシュ（音声内容のハッシュをキーにしたディスクキャッシュ）
+
+同じ音声（クライアントのリトライ、通信断後の再アップロード、ジョブの再実行など）を
+再度ASRに送らないよう、文字起こし結果をディスクに保存して再利用する。
+
+- キー: PCMデータのsha256 + ASRプロバイダー（モデル/デプロイメント）+ 言語 + temperature
+  （WebMのコンテナ情報は送信ごとに変わりうるため、デコード後のPCMでハッシュを取る）
+- 保存先: {asr_cache_dir}/{キー先頭2文字}/{キー}.json
+- 合計サイズが asr_cache_max_mb を超えたら、最も長く使われていないエントリから削除する
+  （LRU、実装は app/core/disk_cache.py）
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import wave
+
+from ..core.disk_cache import DiskLruCache
+from ..settings import settings
+
+
+def pcm_digest_from_wav(wav_path: str) -> str:
+    """WAVファイルのPCMデータ（ヘッダーを除く）のsha256を返す
+
+    WAVとして読めない場合はファイル全体のsha256を返す。
+
+    Args:
+        wav_path: WAVファイルのパス
+
+    Returns:
+        sha256の16進文字列
+    """
+    digest = hashlib.sha256()
+    try:
+        with wave.open(wav_path, "rb") as wav_file:
+            digest.update(
+                f"{wav_file.getnchannels()}:{wav_file.getsampwidth()}:{wav_file.getframerate()}:".encode()
+            )
+            while True:
+                frames = wav_file.readframes(65536)
+                if not frames:
+                    break
+                digest.update(frames)
+    except (wave.Error, EOFError):
+        digest = hashlib.sha256()
+        with open(wav_path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def make_cache_key(pcm_digest: str, provider: str, language: str, temperature: float) -> str:
+    """キャッシュキーを作成する
+
+    Args:
+        pcm_digest: PCMデータのsha256
+        provider: ASRプロバイダー（モデル/デプロイメントを含む）
+        language: 言語
+        temperature: temperature
+
+    Returns:
+        キャッシュキー（sha256の16進文字列）
+    """
+    material = f"{pcm_digest}|{provider}|{language}|{temperature:g}"
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class AsrCache(DiskLruCache):
+    """サイズ上限付きのASR結果キャッシュ"""
+
+    label = "ASRキャッシュ"
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        """
+        Args:
+            cache_dir: キャッシュディレクトリ
+            max_bytes: キャッシュ全体の最大サイズ（バイト）
+        """
+        super().__init__(cache_dir, max_bytes=max_bytes)
+
+
+# シングルトンインスタンス
+_asr_cache: AsrCache | None = None
+
+
+def get_asr_cache() -> AsrCache | None:
+    """ASRキャッシュのシングルトンインスタンスを取得（無効の場合はNone）"""
+    global _asr_cache
+    if not settings.asr_cache_enabled:
+        return None
+    if _asr_cache is None:
+        cache_dir = settings.asr_cache_dir or os.path.join(settings.data_dir, "asr_cache")
+        _asr_cache = AsrCache(cache_dir, settings.asr_cache_max_mb * 1024 * 1024)
+    return _asr_cache
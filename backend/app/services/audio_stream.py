@@ -0,0 +1,495 @@
+"""WebSocket音声ストリームの受信・分割・文字起こしサービス
+
+クライアント（MediaRecorder）から連続して届く WebM/Opus ストリームを処理する。
+
+1. 受信したバイト列をそのまま audio_chunks のチャンクファイルに追記する（録音の保存）
+2. 1本の ffmpeg プロセスで 16kHz モノラル PCM に逐次デコードする
+   （セグメントごとに一時ファイル・ffmpeg起動を行わない）
+3. 音量ベースのVADで無音区間を検出し、発話の切れ目でセグメントに分割する
+4. 発話中は直近の窓を一定間隔で文字起こしし、暫定テキストを配信する（streaming_asr）
+5. セグメントを順番に文字起こしし、結果を transcripts.json に記録する
+"""
+from __future__ import annotations
+
+import asyncio
+import io
+import logging
+import os
+import subprocess
+import tempfile
+import threading
+import wave
+from collections import deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any
+from uuid import uuid4
+
+import numpy as np
+
+from ..settings import settings
+from ..storage import DataStore
+from .asr import transcribe_audio_file
+from .streaming_asr import PartialTranscriber, strip_overlap
+from .transcription import build_transcript_entry, elapsed_seconds, record_transcript
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+BYTES_PER_SAMPLE = 2  # s16le
+
+
+@dataclass
+class AudioSegment:
+    """VADで切り出した発話セグメント"""
+
+    pcm: bytes  # 16kHz モノラル s16le
+    start_sec: float  # ストリーム先頭からの開始位置（秒）
+    end_sec: float  # ストリーム先頭からの終了位置（秒）
+    # 前のセグメントと重ねている先頭部分の長さ（無音を待たずに区切った場合のみ）
+    overlap_sec: float = 0.0
+
+
+def pcm_to_wav_bytes(pcm: bytes, sample_rate: int = SAMPLE_RATE) -> bytes:
+    """PCM（モノラル s16le）をWAV形式に変換する
+
+    Args:
+        pcm: PCMデータ
+        sample_rate: サンプリングレート
+
+    Returns:
+        WAVデータ
+    """
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(BYTES_PER_SAMPLE)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(pcm)
+    return buffer.getvalue()
+
+
+class VadSegmenter:
+    """音量（RMS）ベースのVADでPCMストリームを発話セグメントに分割する
+
+    - 発話開始前の無音は pre_roll 分だけ残して捨てる
+    - 発話後の無音が silence_ms 続き、セグメントが min_segment_sec 以上なら区切る
+    - 無音が silence_ms の3倍続いた場合は、短いセグメントでも区切る（話し終わり）
+    - max_segment_sec に達したら無音を待たずに区切る。発話の途中で切れるため、
+      次のセグメントの先頭に末尾 overlap_sec 分を重ね、つなぎ目の語を取りこぼさないようにする
+    - 発話フレームが min_speech_ms 未満のセグメントは雑音として捨てる
+    """
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE):
+        """
+        Args:
+            sample_rate: サンプリングレート
+        """
+        self.sample_rate = sample_rate
+        self.frame_ms = settings.vad_frame_ms
+        self.frame_samples = sample_rate * self.frame_ms // 1000
+        self.frame_bytes = self.frame_samples * BYTES_PER_SAMPLE
+        self.rms_threshold = settings.vad_rms_threshold
+
+        self.silence_frames = max(1, settings.vad_silence_ms // self.frame_ms)
+        self.min_segment_frames = int(settings.vad_min_segment_sec * 1000 // self.frame_ms)
+        self.max_segment_frames = int(settings.vad_max_segment_sec * 1000 // self.frame_ms)
+        self.min_speech_frames = max(1, settings.vad_min_speech_ms // self.frame_ms)
+        self.overlap_frames = int(settings.asr_stream_overlap_sec * 1000 // self.frame_ms)
+
+        self._pending = bytearray()
+        self._pre_roll: deque[bytes] = deque(maxlen=max(0, settings.vad_pre_roll_ms // self.frame_ms))
+        self._frames: list[bytes] = []
+        self._segment_start_frame = 0
+        self._frame_index = 0
+        self._speech_frames = 0
+        self._silence_run = 0
+        self._overlap_frames = 0
+
+    @property
+    def active(self) -> bool:
+        """発話中のセグメントがあるか"""
+        return bool(self._frames)
+
+    @property
+    def active_start_sec(self) -> float:
+        """発話中のセグメントの開始位置（秒）"""
+        return self._segment_start_frame * self.frame_ms / 1000
+
+    @property
+    def active_end_sec(self) -> float:
+        """発話中のセグメントの現在の終了位置（秒）"""
+        return (self._segment_start_frame + len(self._frames)) * self.frame_ms / 1000
+
+    def active_pcm(self, last_sec: float) -> bytes:
+        """発話中のセグメントの直近 last_sec 秒のPCMを返す"""
+        frame_count = max(1, int(last_sec * 1000 // self.frame_ms))
+        return b"".join(self._frames[-frame_count:])
+
+    def push(self, pcm: bytes) -> list[AudioSegment]:
+        """PCMを追加し、区切りが確定したセグメントを返す
+
+        Args:
+            pcm: PCMデータ（モノラル s16le、任意の長さ）
+
+        Returns:
+            確定したセグメントのリスト
+        """
+        self._pending.extend(pcm)
+        frame_count = len(self._pending) // self.frame_bytes
+        if frame_count == 0:
+            return []
+
+        data = bytes(self._pending[: frame_count * self.frame_bytes])
+        del self._pending[: frame_count * self.frame_bytes]
+
+        # フレームごとのRMSをまとめて計算
+        samples = np.frombuffer(data, dtype=np.int16).astype(np.float32) / 32768.0
+        rms = np.sqrt(np.mean(samples.reshape(frame_count, self.frame_samples) ** 2, axis=1))
+
+        segments = []
+        for i in range(frame_count):
+            frame = data[i * self.frame_bytes : (i + 1) * self.frame_bytes]
+            segment = self._process_frame(frame, bool(rms[i] >= self.rms_threshold))
+            if segment is not None:
+                segments.append(segment)
+        return segments
+
+    def _process_frame(self, frame: bytes, is_speech: bool) -> AudioSegment | None:
+        segment = None
+        if not self._frames:
+            if is_speech:
+                # 発話開始: 直前の無音（pre_roll）を含めてセグメントを開始
+                self._segment_start_frame = self._frame_index - len(self._pre_roll)
+                self._frames = list(self._pre_roll) + [frame]
+                self._pre_roll.clear()
+                self._speech_frames = 1
+                self._silence_run = 0
+            else:
+                self._pre_roll.append(frame)
+        else:
+            self._frames.append(frame)
+            if is_speech:
+                self._speech_frames += 1
+                self._silence_run = 0
+            else:
+                self._silence_run += 1
+
+            length = len(self._frames)
+            if (
+                (self._silence_run >= self.silence_frames and length >= self.min_segment_frames)
+                or self._silence_run >= self.silence_frames * 3
+            ):
+                segment = self._emit()
+            elif length >= self.max_segment_frames:
+                segment = self._emit(carry_overlap=True)
+
+        self._frame_index += 1
+        return segment
+
+    def _emit(self, carry_overlap: bool = False) -> AudioSegment | None:
+        frames = self._frames
+        speech_frames = self._speech_frames
+        start_frame = self._segment_start_frame
+        overlap_frames = self._overlap_frames
+        self._frames = []
+        self._speech_frames = 0
+        self._silence_run = 0
+        self._overlap_frames = 0
+
+        if carry_overlap and self.overlap_frames > 0:
+            # 発話の途中で区切ったため、末尾を次のセグメントの先頭に重ねる
+            self._frames = frames[-self.overlap_frames:]
+            self._segment_start_frame = start_frame + len(frames) - len(self._frames)
+            self._overlap_frames = len(self._frames)
+
+        if speech_frames < self.min_speech_frames:
+            return None
+        frame_sec = self.frame_ms / 1000
+        return AudioSegment(
+            pcm=b"".join(frames),
+            start_sec=start_frame * frame_sec,
+            end_sec=(start_frame + len(frames)) * frame_sec,
+            overlap_sec=overlap_frames * frame_sec,
+        )
+
+    def flush(self) -> AudioSegment | None:
+        """ストリーム終了時に、区切られていない残りのセグメントを返す"""
+        if not self._frames:
+            return None
+        return self._emit()
+
+
+class StreamDecoder:
+    """WebM/Opus ストリームを ffmpeg で PCM に逐次デコードする
+
+    ffmpeg の標準入力にストリームを書き込み、標準出力の PCM を pcm_queue に入れる。
+    デコードが終了すると pcm_queue に None を入れる。
+    """
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE):
+        """
+        Args:
+            sample_rate: 出力するPCMのサンプリングレート
+        """
+        self.sample_rate = sample_rate
+        self.pcm_queue: asyncio.Queue[bytes | None] = asyncio.Queue()
+        self._proc: subprocess.Popen | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._reader: threading.Thread | None = None
+
+    def start(self) -> None:
+        """ffmpeg プロセスを起動する（イベントループ上で呼ぶ）
+
+        Raises:
+            RuntimeError: ffmpeg が見つからない場合
+        """
+        self._loop = asyncio.get_running_loop()
+        cmd = [
+            "ffmpeg",
+            "-loglevel", "error",
+            # ストリームの先頭だけで形式を判定し、デコード開始を早める
+            "-probesize", "32768",
+            "-analyzeduration", "0",
+            "-i", "pipe:0",
+            "-f", "s16le",
+            "-ac", "1",
+            "-ar", str(self.sample_rate),
+            "pipe:1",
+        ]
+        try:
+            self._proc = subprocess.Popen(
+                cmd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        except FileNotFoundError as e:
+            logger.error("ffmpegが見つかりません。ffmpegのインストールが必要です")
+            raise RuntimeError(
+                "ffmpeg is required for audio streaming. Please install ffmpeg."
+            ) from e
+
+        self._reader = threading.Thread(target=self._read_stdout, daemon=True)
+        self._reader.start()
+
+    def _read_stdout(self) -> None:
+        assert self._proc is not None and self._proc.stdout is not None
+        try:
+            while True:
+                data = self._proc.stdout.read1(65536)
+                if not data:
+                    break
+                self._put(data)
+        except Exception as e:
+            logger.warning("ffmpeg出力の読み込みエラー: %s", e)
+        finally:
+            self._put(None)
+
+    def _put(self, data: bytes | None) -> None:
+        assert self._loop is not None
+        try:
+            self._loop.call_soon_threadsafe(self.pcm_queue.put_nowait, data)
+        except RuntimeError:
+            # イベントループが既に終了している
+            pass
+
+    def _write(self, data: bytes) -> None:
+        assert self._proc is not None and self._proc.stdin is not None
+        self._proc.stdin.write(data)
+        self._proc.stdin.flush()
+
+    async def feed(self, data: bytes) -> None:
+        """ストリームのデータを ffmpeg に渡す
+
+        Raises:
+            RuntimeError: ffmpeg が終了している場合
+        """
+        try:
+            await asyncio.to_thread(self._write, data)
+        except (BrokenPipeError, ValueError) as e:
+            raise RuntimeError(f"ffmpeg decoder is not running: {e}") from e
+
+    def _close_stdin(self) -> None:
+        if self._proc is not None and self._proc.stdin is not None and not self._proc.stdin.closed:
+            try:
+                self._proc.stdin.close()
+            except BrokenPipeError:
+                pass
+
+    async def close(self, timeout: float = 10.0) -> None:
+        """入力を閉じ、残りのデコード完了を待つ"""
+        if self._proc is None:
+            return
+        await asyncio.to_thread(self._close_stdin)
+        try:
+            await asyncio.to_thread(self._proc.wait, timeout)
+        except subprocess.TimeoutExpired:
+            logger.warning("ffmpegの終了待ちがタイムアウトしました。強制終了します")
+            self.kill()
+
+    def kill(self) -> None:
+        """ffmpeg プロセスを強制終了する"""
+        if self._proc is not None and self._proc.poll() is None:
+            self._proc.kill()
+
+
+class AudioStreamSession:
+    """1本の音声ストリーム（WebSocket接続）の処理"""
+
+    def __init__(
+        self,
+        store: DataStore,
+        meeting_id: str,
+        meeting: dict[str, Any],
+        on_transcript: Callable[[dict[str, Any]], Awaitable[None]] | None = None,
+    ):
+        """
+        Args:
+            store: データストア
+            meeting_id: 会議ID
+            meeting: 会議メタデータ（音声時刻・経過時間の計算に使用）
+            on_transcript: 文字起こし結果を記録した後に呼ばれるコールバック
+        """
+        self.store = store
+        self.meeting_id = meeting_id
+        self.meeting = meeting
+        self.on_transcript = on_transcript
+        self.stream_id = uuid4().hex[:8]
+        # ストリームの開始位置（会議開始からの秒数）。セグメントの音声時刻の起点
+        self.offset_sec = elapsed_seconds(
+            meeting.get("started_at"), datetime.now(timezone.utc).isoformat()
+        ) or 0.0
+        self.bytes_received = 0
+        self.segments_transcribed = 0
+
+        self.decoder = StreamDecoder()
+        self.segmenter = VadSegmenter()
+        self.partial = PartialTranscriber(meeting_id, self.stream_id)
+        self._last_final_text = ""
+        self._segments: asyncio.Queue[AudioSegment | None] = asyncio.Queue()
+        self._pump_task: asyncio.Task | None = None
+        self._transcribe_task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        """デコードと文字起こしを開始する
+
+        Raises:
+            RuntimeError: ffmpeg が見つからない場合
+        """
+        self.decoder.start()
+        self._pump_task = asyncio.create_task(self._pump_pcm())
+        self._transcribe_task = asyncio.create_task(self._transcribe_segments())
+        logger.info("Audio stream started: meeting_id=%s, stream_id=%s", self.meeting_id, self.stream_id)
+
+    async def feed(self, data: bytes) -> None:
+        """受信した音声データを保存し、デコーダーに渡す"""
+        self.bytes_received += len(data)
+        await asyncio.to_thread(
+            self.store.append_audio_stream, self.meeting_id, self.stream_id, data, self.offset_sec
+        )
+        await self.decoder.feed(data)
+
+    async def finish(self) -> None:
+        """ストリームを終了し、残りのセグメントの文字起こし完了を待つ"""
+        await self.decoder.close()
+        if self._pump_task is not None:
+            await self._pump_task
+        if self._transcribe_task is not None:
+            await self._transcribe_task
+        logger.info(
+            "Audio stream finished: meeting_id=%s, stream_id=%s, bytes=%d, segments=%d",
+            self.meeting_id,
+            self.stream_id,
+            self.bytes_received,
+            self.segments_transcribed,
+        )
+
+    async def abort(self) -> None:
+        """ストリームを中断する（未処理のセグメントは破棄する）"""
+        self.decoder.kill()
+        await self.partial.close()
+        for task in (self._pump_task, self._transcribe_task):
+            if task is not None:
+                task.cancel()
+        await asyncio.gather(
+            *(t for t in (self._pump_task, self._transcribe_task) if t is not None),
+            return_exceptions=True,
+        )
+
+    async def _pump_pcm(self) -> None:
+        """デコード済みPCMをVADに通し、確定したセグメントを文字起こしキューに入れる"""
+        while True:
+            pcm = await self.decoder.pcm_queue.get()
+            if pcm is None:
+                break
+            for segment in self.segmenter.push(pcm):
+                self._segments.put_nowait(segment)
+            if self.segmenter.active:
+                self.partial.maybe_transcribe(
+                    self._segment_id(self.segmenter.active_start_sec),
+                    self.segmenter.active_end_sec,
+                    lambda: pcm_to_wav_bytes(self.segmenter.active_pcm(self.partial.window_sec)),
+                )
+
+        await self.partial.close()
+        last = self.segmenter.flush()
+        if last is not None:
+            self._segments.put_nowait(last)
+        self._segments.put_nowait(None)
+
+    def _segment_id(self, start_sec: float) -> str:
+        return f"{self.stream_id}-{int(round(start_sec * 1000))}"
+
+    async def _transcribe_segments(self) -> None:
+        """セグメントを順番に文字起こしして記録する"""
+        while True:
+            segment = await self._segments.get()
+            if segment is None:
+                break
+            try:
+                await self._transcribe_segment(segment)
+            except Exception as e:
+                logger.error(
+                    "Segment transcription failed: meeting_id=%s, stream_id=%s, %.1f-%.1fs: %s",
+                    self.meeting_id, self.stream_id, segment.start_sec, segment.end_sec, e,
+                    exc_info=True,
+                )
+
+    async def _transcribe_segment(self, segment: AudioSegment) -> None:
+        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_wav:
+            temp_wav.write(pcm_to_wav_bytes(segment.pcm))
+            temp_wav_path = temp_wav.name
+
+        try:
+            result = await transcribe_audio_file(temp_wav_path)
+        finally:
+            if os.path.exists(temp_wav_path):
+                os.unlink(temp_wav_path)
+
+        text = result.get("text", "")
+        if segment.overlap_sec > 0:
+            # 前のセグメントと重ねた先頭部分の重複テキストを除去する
+            text = strip_overlap(self._last_final_text, text)
+        self.partial.finalize(self._segment_id(segment.start_sec), text)
+        if not text.strip():
+            return
+        self._last_final_text = text
+
+        entry = build_transcript_entry(
+            self.meeting,
+            text,
+            result.get("language", "ja"),
+            # 重ねた先頭部分のテキストは除去済みのため、重なりの後ろを開始位置とする
+            start_sec=self.offset_sec + segment.start_sec + segment.overlap_sec,
+            end_sec=self.offset_sec + segment.end_sec,
+        )
+        await asyncio.to_thread(record_transcript, self.store, self.meeting_id, entry)
+        self.segments_transcribed += 1
+
+        if self.on_transcript is not None:
+            try:
+                await self.on_transcript(entry)
+            except Exception as e:
+                logger.warning("Failed to deliver transcript to stream client: %s", e)
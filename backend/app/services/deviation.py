@@ -1,37 +1,271 @@
-from typing import List, Tuple, Dict, Any
-from datetime import datetime, timezone
+import asyncio
 import logging
+import math
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
+
+from ..settings import settings
 from .ai_deviation import ai_deviation_service
+from .embedding_index import char_ngrams, suggest_agenda
 
 logger = logging.getLogger(__name__)
 
+# LLM呼び出しの統計（ローカル判定で省略した回数など）
+_stats_lock = threading.Lock()
+_deviation_stats = {
+    "checks": 0,
+    "llm_calls": 0,
+    "llm_skipped_on_track": 0,
+    "llm_skipped_off_track": 0,
+}
+
+
+def _count_stat(name: str) -> None:
+    with _stats_lock:
+        _deviation_stats[name] += 1
+
+
+def get_deviation_stats() -> Dict[str, Any]:
+    """脱線検知の統計（LLM呼び出し回数・ローカル判定で省略した回数）を返す"""
+    with _stats_lock:
+        stats = dict(_deviation_stats)
+    skipped = stats["llm_skipped_on_track"] + stats["llm_skipped_off_track"]
+    stats["llm_skipped"] = skipped
+    stats["skip_rate"] = skipped / stats["checks"] if stats["checks"] else 0.0
+    return stats
+
+
+class AgendaScorer:
+    """アジェンダ項目（タイトル + 期待成果物）との文字n-gram TF-IDF コサイン類似度を計算する
+
+    アジェンダ側のベクトルとIDFは生成時に一度だけ計算し、発話ごとには発話側のベクトルのみを作る。
+    """
+
+    def __init__(self, agenda: Tuple[Tuple[str, str], ...]):
+        """
+        Args:
+            agenda: (タイトル, 期待成果物) のタプル
+        """
+        self.titles = [title for title, _ in agenda]
+        docs = [char_ngrams(f"{title} {outcome}") for title, outcome in agenda]
+        doc_freq: Counter = Counter(gram for doc in docs for gram in doc)
+        n_docs = len(docs)
+        # 平滑化したIDF（アジェンダに無いn-gramは最大値）
+        self._idf = {gram: math.log((n_docs + 1) / (df + 1)) + 1 for gram, df in doc_freq.items()}
+        self._max_idf = math.log(n_docs + 1) + 1
+        self._docs = [self._weigh(doc) for doc in docs]
+
+    def _weigh(self, grams: Counter) -> Tuple[Dict[str, float], float]:
+        """TF-IDFの重み（TFは対数スケール）とノルムを計算する"""
+        weights = {
+            gram: (1 + math.log(count)) * self._idf.get(gram, self._max_idf)
+            for gram, count in grams.items()
+        }
+        norm = math.sqrt(sum(w * w for w in weights.values()))
+        return weights, norm
+
+    def score(self, text: str) -> List[Tuple[float, str]]:
+        """各アジェンダ項目との類似度を高い順に返す
+
+        Args:
+            text: 発話テキスト
+
+        Returns:
+            (類似度, アジェンダタイトル) のリスト（類似度の高い順）
+        """
+        query, query_norm = self._weigh(char_ngrams(text))
+        scored = []
+        for (doc, doc_norm), title in zip(self._docs, self.titles, strict=True):
+            if not query_norm or not doc_norm:
+                scored.append((0.0, title))
+                continue
+            dot = sum(w * doc[gram] for gram, w in query.items() if gram in doc)
+            scored.append((dot / (query_norm * doc_norm), title))
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return scored
+
+
+@lru_cache(maxsize=128)
+def _get_agenda_scorer(agenda: Tuple[Tuple[str, str], ...]) -> AgendaScorer:
+    """アジェンダごとのスコアラーを取得（アジェンダの内容が同じ間は再利用）"""
+    return AgendaScorer(agenda)
+
+
+def _local_deviation_check(
+    latest_text: str,
+    context_text: str,
+    agenda_items: List[Dict[str, Any]],
+    transcript_id: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
+    """文字n-gram TF-IDF と埋め込みベクトルでローカルに判定できる場合は判定結果を返す
+
+    - 最新チャンクの TF-IDF 類似度が deviation_local_on_track_score 以上、または
+      埋め込みベクトルの類似度が deviation_local_embedding_on_track_score 以上 → アジェンダに沿っている
+    - 最新チャンク + コンテキストの TF-IDF 類似度が deviation_local_off_track_score 以下、かつ
+      埋め込みベクトルの類似度が deviation_local_embedding_off_track_score 以下で、
+      最新チャンクが deviation_local_min_chars 文字以上 → 脱線
+    - それ以外（判定が難しい範囲）は None を返し、LLMで判定する
+
+    埋め込み（ONNXモデルの推論を含む）はCPU処理のため、イベントループからは asyncio.to_thread で呼ぶ。
+
+    Args:
+        latest_text: 最新チャンクのテキスト
+        context_text: 過去のコンテキストのテキスト
+        agenda_items: アジェンダ項目のリスト
+        transcript_id: 最新チャンクの文字起こしID（埋め込みベクトルのキャッシュキー）
+
+    Returns:
+        脱線検知結果の辞書（LLMで判定する場合はNone）
+    """
+    agenda = tuple(
+        (item.get("title", ""), item.get("expectedOutcome", "") or "")
+        for item in agenda_items
+        if item.get("title")
+    )
+    if not agenda or not latest_text.strip():
+        return None
+
+    scorer = _get_agenda_scorer(agenda)
+    scored = scorer.score(latest_text)
+    best_score, best_agenda = scored[0]
+    embedded = suggest_agenda(latest_text, agenda_items, k=2, transcript_id=transcript_id)
+    embedding_score, embedding_agenda = embedded[0] if embedded else (0.0, best_agenda)
+    suggested = [title for _, title in embedded]
+
+    on_track_score = settings.deviation_local_on_track_score
+    off_track_score = settings.deviation_local_off_track_score
+    embedding_on_track_score = settings.deviation_local_embedding_on_track_score
+    embedding_off_track_score = settings.deviation_local_embedding_off_track_score
+    on_track_by_tfidf = best_score >= on_track_score
+    if on_track_by_tfidf or embedding_score >= embedding_on_track_score:
+        _count_stat("llm_skipped_on_track")
+        if on_track_by_tfidf:
+            score, threshold, agenda_title, method = best_score, on_track_score, best_agenda, "文字n-gram TF-IDF"
+        else:
+            score, threshold, agenda_title, method = (
+                embedding_score, embedding_on_track_score, embedding_agenda, "埋め込みベクトル"
+            )
+        # 判定の確信度: しきい値から離れるほど高い（0.5-1.0）
+        confidence = 0.5 + 0.5 * (score - threshold) / max(1e-6, 1 - threshold)
+        return {
+            "is_deviation": False,
+            "confidence": round(min(1.0, confidence), 3),
+            "similarity_score": round(score, 3),
+            "best_agenda": agenda_title,
+            "message": f"アジェンダ「{agenda_title}」に沿った発話です（関連度: {score:.2f}）",
+            "suggested_agenda": suggested,
+            "recent_text": latest_text,
+            "reasoning": f"{method}のローカル判定（関連度が高いためLLM判定を省略）",
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "method": "local",
+        }
+
+    if len("".join(latest_text.split())) < settings.deviation_local_min_chars:
+        return None
+
+    # 脱線はコンテキストを含めても、どちらの類似度でも関連が見つからない場合のみローカルで判定する
+    combined_score = scorer.score(f"{context_text} {latest_text}")[0][0] if context_text else best_score
+    if max(best_score, combined_score) <= off_track_score and embedding_score <= embedding_off_track_score:
+        _count_stat("llm_skipped_off_track")
+        confidence = 0.5 + 0.5 * (off_track_score - best_score) / max(1e-6, off_track_score)
+        return {
+            "is_deviation": True,
+            "confidence": round(min(1.0, confidence), 3),
+            "similarity_score": round(best_score, 3),
+            "best_agenda": best_agenda,
+            "message": f"直近の発話がアジェンダ「{best_agenda}」から脱線している可能性があります（関連度: {best_score:.2f}）",
+            "suggested_agenda": suggested,
+            "recent_text": latest_text,
+            "reasoning": "文字n-gram TF-IDFと埋め込みベクトルのローカル判定（どのアジェンダとも関連が見られないためLLM判定を省略）",
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "method": "local",
+        }
+
+    return None
+
 # 脱線検知のための類似度計算（従来の手法、フォールバック用）
 def similarity(a: str, b: str) -> float:
-    """2つのテキストの類似度を計算（Jaccard係数ベース）"""
-    a_words = set(w for w in a.lower().split() if len(w) > 1)
-    b_words = set(w for w in b.lower().split() if len(w) > 1)
-    if not a_words or not b_words:
+    """2つのテキストの類似度を計算（文字n-gram集合の重なり係数）
+
+    日本語の文字起こしには空白が無いため、単語ではなく文字2-gram・3-gramの集合で比較する。
+    発話は長くアジェンダのタイトルは短いため、Jaccard係数（和集合で割る）ではなく
+    小さい方の集合の大きさで割る重なり係数を使う。
+    """
+    a_grams = set(char_ngrams(a))
+    b_grams = set(char_ngrams(b))
+    if not a_grams or not b_grams:
         return 0.0
-    inter = len(a_words & b_words)
-    union = len(a_words | b_words)
-    return inter / union if union else 0.0
+    return len(a_grams & b_grams) / min(len(a_grams), len(b_grams))
+
+
+class AgendaNgramIndex:
+    """アジェンダタイトルの文字n-gram集合を行列にまとめ、全タイトルとの類似度を一括で計算する
+
+    タイトル × n-gram の0/1行列を生成時に一度だけ作り、発話ごとには発話に含まれる
+    n-gramの列を足し合わせるだけで全タイトルとの共通n-gram数が求まる。
+    """
+
+    def __init__(self, titles: Tuple[str, ...]):
+        """
+        Args:
+            titles: アジェンダタイトル
+        """
+        self.titles = list(titles)
+        self._vocab: Dict[str, int] = {}
+        rows = [
+            [self._vocab.setdefault(gram, len(self._vocab)) for gram in char_ngrams(title)]
+            for title in titles
+        ]
+        self._matrix = np.zeros((len(rows), len(self._vocab)), dtype=np.float32)
+        for i, columns in enumerate(rows):
+            self._matrix[i, columns] = 1.0
+        self._sizes = self._matrix.sum(axis=1)
+
+    def similarities(self, text: str) -> np.ndarray:
+        """各タイトルとの類似度（similarity() と同じ重なり係数）を返す
+
+        Args:
+            text: 発話テキスト
+
+        Returns:
+            タイトルの順に並んだ類似度の配列
+        """
+        grams = char_ngrams(text)
+        scores = np.zeros(len(self.titles), dtype=np.float32)
+        if not grams or not self.titles:
+            return scores
+        columns = [self._vocab[gram] for gram in grams if gram in self._vocab]
+        if not columns:
+            return scores
+        intersection = self._matrix[:, columns].sum(axis=1)
+        denominator = np.minimum(self._sizes, len(grams))
+        np.divide(intersection, denominator, out=scores, where=denominator > 0)
+        return scores
+
+    def rank(self, text: str) -> List[Tuple[float, str]]:
+        """(類似度, タイトル) のリストを類似度の高い順に返す（同点はアジェンダの順）"""
+        scores = self.similarities(text)
+        order = np.argsort(-scores, kind="stable")
+        return [(float(scores[i]), self.titles[i]) for i in order]
+
+
+@lru_cache(maxsize=128)
+def _get_agenda_ngram_index(titles: Tuple[str, ...]) -> AgendaNgramIndex:
+    """アジェンダごとのn-gramインデックスを取得（アジェンダの内容が同じ間は再利用）"""
+    return AgendaNgramIndex(titles)
 
 
 def check_deviation(text: str, agenda_titles: List[str], threshold: float = 0.3) -> Tuple[float, str, List[str]]:
     """単一テキストの脱線検知（従来の手法）"""
-    best = 0.0
-    best_titles: List[str] = []
-    for t in agenda_titles:
-        s = similarity(text, t)
-        if s > best:
-            best = s
-            best_titles = [t]
-        elif s == best and s > 0:
-            best_titles.append(t)
+    scored = _get_agenda_ngram_index(tuple(agenda_titles)).rank(text)
+    best = scored[0][0] if scored else 0.0
     label = "on_track" if best >= threshold else "possible_deviation"
     # If deviation, suggest top 2 agenda to return to
-    scored = sorted([(similarity(text, t), t) for t in agenda_titles], reverse=True)
     targets = [t for _, t in scored[:2]]
     return best, label, targets
 
@@ -87,7 +321,21 @@ async def check_realtime_deviation(
             context_text = " ".join([c.get("text", "") for c in context_chunks])
             logger.info("   コンテキストテキスト（最初の200文字）: %s", context_text[:200])
         
+        _count_stat("checks")
+        if settings.deviation_local_enabled:
+            context_text = " ".join(c.get("text", "") for c in context_chunks)
+            # TF-IDFと埋め込み（ONNXモデルの推論）はCPU処理のため、イベントループを止めないようスレッドで実行する
+            local_result = await asyncio.to_thread(
+                _local_deviation_check,
+                latest_chunk.get("text", ""), context_text, agenda_items, latest_chunk.get("id"),
+            )
+            if local_result is not None:
+                logger.info("✅ ローカル脱線判定（LLM呼び出しを省略）: is_deviation=%s, similarity_score=%.3f",
+                           local_result["is_deviation"], local_result["similarity_score"])
+                return local_result
+
         # AIベースの脱線検知を実行（最新チャンク + コンテキスト）
+        _count_stat("llm_calls")
         analysis = await ai_deviation_service.check_deviation_with_context(
             latest_chunk=latest_chunk,
             context_chunks=context_chunks,
@@ -98,6 +346,13 @@ async def check_realtime_deviation(
         logger.info("✅ AI脱線検知完了: is_deviation=%s, similarity_score=%.3f, confidence=%.3f",
                    analysis.is_deviation, analysis.similarity_score, analysis.confidence)
         
+        # LLMが候補を返さなかった場合は、埋め込みベクトルで近いアジェンダを候補にする
+        suggested_agenda = analysis.suggested_agenda or [
+            title for _, title in await asyncio.to_thread(
+                suggest_agenda, latest_chunk.get("text", ""), agenda_items, 2, latest_chunk.get("id")
+            )
+        ]
+
         # DeviationAnalysisを辞書形式に変換
         # recent_textは最新チャンクのみ（判定対象）を返す
         result = {
@@ -106,10 +361,11 @@ async def check_realtime_deviation(
             "similarity_score": analysis.similarity_score,
             "best_agenda": analysis.best_agenda,
             "message": analysis.message,
-            "suggested_agenda": analysis.suggested_agenda,
+            "suggested_agenda": suggested_agenda,
             "recent_text": latest_chunk.get("text", ""),  # 最新チャンクのみ（コンテキストは含めない）
             "reasoning": analysis.reasoning,
-            "timestamp": analysis.timestamp
+            "timestamp": analysis.timestamp,
+            "method": "llm",
         }
         
         logger.info("📤 返却データ: %s", {
@@ -157,7 +413,8 @@ def _check_deviation_fallback(
             "suggested_agenda": [],
             "recent_text": "",
             "reasoning": "文字起こしデータが不足（フォールバック）",
-            "timestamp": datetime.now(timezone.utc).isoformat()
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "method": "fallback",
         }
     
     # 直近の文字起こし結果を結合
@@ -173,17 +430,14 @@ def _check_deviation_fallback(
             "suggested_agenda": [],
             "recent_text": "",
             "reasoning": "文字起こしテキストが空（フォールバック）",
-            "timestamp": datetime.now(timezone.utc).isoformat()
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "method": "fallback",
         }
     
-    # 各アジェンダとの類似度を計算
-    similarities = []
-    for agenda in agenda_titles:
-        sim = similarity(recent_text, agenda)
-        similarities.append((sim, agenda))
+    # 各アジェンダとの類似度を計算（高い順）
+    similarities = _get_agenda_ngram_index(tuple(agenda_titles)).rank(recent_text)
     
     # 最高類似度を取得
-    similarities.sort(reverse=True)
     best_similarity, best_agenda = similarities[0] if similarities else (0.0, "")
     
     # 脱線判定
@@ -208,6 +462,7 @@ def _check_deviation_fallback(
         "message": message,
         "suggested_agenda": suggested_topics,
         "recent_text": recent_text,
-        "reasoning": "従来のJaccard係数ベースの分析（フォールバック）",
-        "timestamp": datetime.now(timezone.utc).isoformat()
+        "reasoning": "文字n-gramの重なり係数による分析（フォールバック）",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "method": "fallback",
     }
@@ -0,0 +1,161 @@
+"""脱線検知結果のキャッシュ（会議ごとの最新チャンク単位）
+
+脱線検知は最新の文字起こしチャンクを判定対象とするため、新しいチャンクが届くまでは
+何度呼び出しても同じ結果になる。複数のタブやポーリングから同じチャンクについて
+呼び出された場合にLLMを重複して呼ばないよう、次の2つを行う。
+
+- 結果のキャッシュ: (会議ID, 最新の文字起こしID, アジェンダのハッシュ, しきい値, コンテキスト数) をキーに
+  判定結果を保存し、件数が上限を超えたら最も長く使われていないものから削除する（LRU）
+- 実行中の判定の共有: 同じキーの判定が実行中の場合は新たに判定せず、その結果を待つ
+
+LLMエラー時のフォールバック結果（method == "fallback"）は、復旧後に再判定できるようキャッシュしない。
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from ..settings import settings
+from ..storage import DataStore
+
+# 会議ID → (transcripts.json のバージョン, 最新の文字起こしID)
+_latest_ids: dict[str, tuple[tuple, str]] = {}
+_latest_ids_lock = threading.Lock()
+
+
+def latest_transcript_id(store: DataStore, meeting_id: str) -> str | None:
+    """最後に追記された文字起こしのIDを返す（transcripts.json が更新されていなければ再読み込みしない）
+
+    Args:
+        store: データストア
+        meeting_id: 会議ID
+
+    Returns:
+        文字起こしID（文字起こしが無い場合はNone）
+    """
+    version = store.transcripts_version(meeting_id)
+    if version is None:
+        return None
+
+    with _latest_ids_lock:
+        cached = _latest_ids.get(meeting_id)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+    transcripts = store.load_transcripts(meeting_id)
+    if not transcripts:
+        return None
+    # IDを持たない旧データは件数で代用する
+    latest_id = transcripts[-1].get("id") or f"#{len(transcripts)}"
+    with _latest_ids_lock:
+        _latest_ids[meeting_id] = (version, latest_id)
+    return latest_id
+
+
+def agenda_hash(agenda_items: list[dict[str, Any]]) -> str:
+    """アジェンダ項目のハッシュ（アジェンダの変更を検知するため）"""
+    material = json.dumps(agenda_items, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def make_cache_key(
+    meeting_id: str,
+    latest_id: str,
+    agenda_items: list[dict[str, Any]],
+    threshold: float,
+    consecutive_chunks: int,
+) -> tuple:
+    """キャッシュキーを作成する"""
+    return (meeting_id, latest_id, agenda_hash(agenda_items), threshold, consecutive_chunks)
+
+
+class DeviationResultCache:
+    """件数上限付きのLRUキャッシュと、実行中の判定の共有"""
+
+    def __init__(self, max_entries: int):
+        """
+        Args:
+            max_entries: キャッシュする結果の最大件数
+        """
+        self.max_entries = max_entries
+        self._results: OrderedDict[tuple, dict[str, Any]] = OrderedDict()
+        self._inflight: dict[tuple, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.joined = 0
+
+    async def get_or_compute(
+        self,
+        key: tuple,
+        compute: Callable[[], Awaitable[dict[str, Any]]],
+    ) -> tuple[dict[str, Any], bool]:
+        """キャッシュされた結果を返す。無ければ判定を実行する（実行中なら完了を待つ）
+
+        Args:
+            key: キャッシュキー
+            compute: 判定を実行するコルーチン関数
+
+        Returns:
+            (判定結果, 今回の呼び出しで判定を実行しなかったか)
+        """
+        result = self._results.get(key)
+        if result is not None:
+            self._results.move_to_end(key)
+            self.hits += 1
+            return result, True
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.joined += 1
+            # 待っている側がキャンセルされても、実行中の判定はキャンセルしない
+            return await asyncio.shield(inflight), True
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await compute()
+        except BaseException as e:
+            future.set_exception(e)
+            # 待っている呼び出しが無い場合に「未取得の例外」の警告を出さないようにする
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+        future.set_result(result)
+        if result.get("method") != "fallback":
+            self._results[key] = result
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+        return result, False
+
+    def stats(self) -> dict[str, Any]:
+        """キャッシュの統計情報（ヒット率など）を返す"""
+        lookups = self.hits + self.joined + self.misses
+        return {
+            "entries": len(self._results),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "joined": self.joined,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.joined) / lookups if lookups else 0.0,
+            "inflight": len(self._inflight),
+        }
+
+
+# シングルトンインスタンス
+_deviation_cache: DeviationResultCache | None = None
+
+
+def get_deviation_cache() -> DeviationResultCache:
+    """脱線検知結果キャッシュのシングルトンインスタンスを取得"""
+    global _deviation_cache
+    if _deviation_cache is None:
+        _deviation_cache = DeviationResultCache(settings.deviation_cache_max_entries)
+    return _deviation_cache
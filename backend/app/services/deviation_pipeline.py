@@ -0,0 +1,174 @@
+"""脱線検知パイプライン（文字起こしの記録ごとにバックグラウンドで脱線検知を実行）
+
+文字起こしを記録するたびに JOB_DEVIATION をジョブキューに登録し、そのチャンクを判定対象として
+脱線検知を実行する。判定結果は次のように扱う。
+
+- 履歴: 会議ディレクトリの deviations.jsonl に1チャンク1行で追記する（会議後の分析用）
+- 通知: イベントバスに EVENT_DEVIATION を配信し、脱線時は要約スケジューラーに話題の転換を通知する
+
+ジョブはチャンクごとに1つ（重複排除キーにチャンクの文字起こしIDを含める）で、履歴に記録済みの
+チャンクは再判定しない。判定結果は脱線検知結果キャッシュを通すため、同じチャンクについて
+POST /deviation/check が呼ばれてもLLMの呼び出しは1回で済む。
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from functools import partial
+from typing import Any
+
+from ..schemas.job import Job
+from ..storage import DataStore
+from .deviation import check_realtime_deviation
+from .deviation_cache import get_deviation_cache, make_cache_key
+from .event_bus import EVENT_DEVIATION, event_bus
+from .job_queue import JobQueue
+from .meeting_scheduler import get_scheduler
+
+logger = logging.getLogger(__name__)
+
+JOB_DEVIATION = "deviation"  # 記録した文字起こしチャンクの脱線検知
+
+# 文字起こし（20）より後、要約（50）より先に実行する
+DEVIATION_PRIORITY = 30
+
+# 脱線検知のパラメータ（POST /deviation/check と共通）
+DEVIATION_THRESHOLD = 0.3
+DEVIATION_CONTEXT_CHUNKS = 3
+
+
+def meeting_agenda_items(meeting: dict[str, Any]) -> list[dict[str, Any]]:
+    """会議メタデータから脱線検知に使うアジェンダ項目（タイトル、期待成果物、所要時間）を取り出す"""
+    return [
+        {
+            "title": item.get("title", ""),
+            "expectedOutcome": item.get("expectedOutcome", ""),
+            "duration": item.get("duration", 0),
+        }
+        for item in meeting.get("agenda") or []
+        if item.get("title")
+    ]
+
+
+def _transcripts_until(transcripts: list[dict[str, Any]], transcript_id: str) -> list[dict[str, Any]]:
+    """追記順で transcript_id のエントリまでの文字起こしを返す（見つからない場合は空）"""
+    for i in range(len(transcripts) - 1, -1, -1):
+        if transcripts[i].get("id") == transcript_id:
+            return transcripts[:i + 1]
+    return []
+
+
+async def evaluate_deviation(
+    store: DataStore,
+    meeting_id: str,
+    transcript_id: str,
+    agenda_items: list[dict[str, Any]],
+) -> tuple[dict[str, Any], bool]:
+    """transcript_id のチャンクを判定対象として脱線検知を実行する（結果キャッシュを通す）
+
+    Args:
+        store: データストア
+        meeting_id: 会議ID
+        transcript_id: 判定対象の文字起こしID
+        agenda_items: アジェンダ項目
+
+    Returns:
+        (脱線検知結果, キャッシュした結果か（または実行中の判定の結果を待ったか）)
+    """
+
+    async def compute() -> dict[str, Any]:
+        transcripts = await asyncio.to_thread(store.load_transcripts, meeting_id)
+        recent = _transcripts_until(transcripts, transcript_id)
+        logger.info("🤖 AI脱線検知を実行中: meeting_id=%s, transcript_id=%s, 文字起こし件数=%d",
+                    meeting_id, transcript_id, len(recent))
+        result = await check_realtime_deviation(
+            recent_transcripts=recent,
+            agenda_items=agenda_items,
+            threshold=DEVIATION_THRESHOLD,
+            consecutive_chunks=DEVIATION_CONTEXT_CHUNKS,
+        )
+        logger.info("📊 判定結果: is_deviation=%s, similarity_score=%.3f, method=%s, best_agenda=%s",
+                    result.get("is_deviation"), result.get("similarity_score", 0.0),
+                    result.get("method"), result.get("best_agenda", ""))
+        return result
+
+    key = make_cache_key(
+        meeting_id, transcript_id, agenda_items, DEVIATION_THRESHOLD, DEVIATION_CONTEXT_CHUNKS
+    )
+    return await get_deviation_cache().get_or_compute(key, compute)
+
+
+def publish_deviation(meeting_id: str, result: dict[str, Any]) -> None:
+    """脱線検知結果を購読者に配信し、脱線時は要約スケジューラーに話題の転換を通知する"""
+    if result.get("is_deviation"):
+        get_scheduler().notify_topic_shift(meeting_id)
+    event_bus.publish(meeting_id, EVENT_DEVIATION, result)
+
+
+def enqueue_deviation_check(queue: JobQueue, meeting_id: str, transcript_id: str) -> Job:
+    """記録した文字起こしチャンクの脱線検知ジョブを登録する
+
+    Args:
+        queue: ジョブキュー
+        meeting_id: 会議ID
+        transcript_id: 判定対象の文字起こしID
+
+    Returns:
+        登録したジョブ
+    """
+    return queue.enqueue(
+        JOB_DEVIATION,
+        meeting_id,
+        payload={"transcript_id": transcript_id},
+        priority=DEVIATION_PRIORITY,
+        # チャンクごとに1ジョブ（会議単位でまとめない）
+        dedup_key=f"{meeting_id}:{JOB_DEVIATION}:{transcript_id}",
+    )
+
+
+async def _run_deviation_job(store: DataStore, job: Job) -> dict[str, Any]:
+    """JOB_DEVIATION のハンドラ"""
+    meeting_id = job.meeting_id
+    transcript_id = job.payload["transcript_id"]
+
+    meeting = await asyncio.to_thread(store.load_meeting, meeting_id)
+    if not meeting:
+        return {"skipped": True}
+    agenda_items = meeting_agenda_items(meeting)
+    if not agenda_items:
+        return {"skipped": True, "reason": "no_agenda"}
+
+    history = await asyncio.to_thread(store.load_deviations, meeting_id)
+    if any(record.get("transcript_id") == transcript_id for record in history):
+        return {"skipped": True, "reason": "already_evaluated"}
+
+    transcripts = await asyncio.to_thread(store.load_transcripts, meeting_id)
+    entry = next((t for t in reversed(transcripts) if t.get("id") == transcript_id), None)
+    if entry is None:
+        logger.warning("Transcript to check not found: meeting_id=%s, transcript_id=%s", meeting_id, transcript_id)
+        return {"skipped": True}
+
+    result, cached = await evaluate_deviation(store, meeting_id, transcript_id, agenda_items)
+    record = {
+        "transcript_id": transcript_id,
+        "start_sec": entry.get("start_sec"),
+        "end_sec": entry.get("end_sec"),
+        "elapsed_time": entry.get("elapsed_time"),
+        **result,
+    }
+    await asyncio.to_thread(store.append_deviation, meeting_id, record)
+
+    # POST /deviation/check で判定済みの結果は、その時点で配信済み
+    if not cached:
+        publish_deviation(meeting_id, result)
+    return {"transcript_id": transcript_id, "is_deviation": result.get("is_deviation"), "method": result.get("method")}
+
+
+def register_deviation_jobs(queue: JobQueue, store: DataStore) -> None:
+    """脱線検知ジョブのハンドラをジョブキューに登録する
+
+    Args:
+        queue: ジョブキュー
+        store: データストア
+    """
+    queue.register(JOB_DEVIATION, partial(_run_deviation_job, store))
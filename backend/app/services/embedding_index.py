@@ -0,0 +1,262 @@
+"""ローカルの埋め込みベクトルによるアジェンダ照合
+
+アジェンダ項目と文字起こしチャンクを埋め込みベクトルに変換し、コサイン類似度の高いアジェンダを
+LLMを呼ばずに即座に求める（議題の候補の提示、ローカルの脱線判定、将来の検索に使う）。
+
+埋め込みエンジン:
+- ONNXモデル（settings.embedding_model_dir に model.onnx と tokenizer.json を置いた文埋め込みモデル）。
+  onnxruntime と tokenizers が必要（任意の依存パッケージ）
+- ハッシュベクトル（モデルが無い環境用）: 文字n-gramをハッシュで固定次元に割り当てる
+
+アジェンダのベクトル行列はアジェンダの内容ごとに1回だけ作り、チャンクのベクトルは文字起こしIDごとに
+キャッシュするため、各チャンクの埋め込みは1回で済む。
+"""
+from __future__ import annotations
+
+import logging
+import math
+import os
+import re
+import threading
+import unicodedata
+import zlib
+from collections import Counter, OrderedDict
+from collections.abc import Sequence
+from functools import lru_cache
+from typing import Any, Protocol
+
+import numpy as np
+
+from ..settings import settings
+
+logger = logging.getLogger(__name__)
+
+# 文字n-gramの長さ
+LOCAL_NGRAM_SIZES = (2, 3)
+_WORD_RUNS = re.compile(r"\w+")
+
+
+def char_ngrams(text: str) -> Counter:
+    """テキストの文字n-gram（2-gram, 3-gram）の出現回数を数える
+
+    NFKC正規化・小文字化した上で、記号・空白で区切った連続区間ごとにn-gramを作る
+    （日本語は単語の区切りが無いため、単語ではなく文字n-gramで比較する）。
+    """
+    normalized = unicodedata.normalize("NFKC", text).lower()
+    grams: Counter = Counter()
+    for run in _WORD_RUNS.findall(normalized):
+        for n in LOCAL_NGRAM_SIZES:
+            grams.update(run[i:i + n] for i in range(len(run) - n + 1))
+    return grams
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """各行をL2正規化する（ゼロベクトルはそのまま）"""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1.0)
+
+
+class Embedder(Protocol):
+    """埋め込みエンジン"""
+
+    name: str
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """テキストをL2正規化した埋め込みベクトル（テキスト数 × 次元数）に変換する"""
+        ...
+
+
+class HashingEmbedder:
+    """文字n-gramのハッシュベクトル（モデル不要）
+
+    n-gramをcrc32で dim 次元のいずれかに割り当て、符号もハッシュで決める（衝突による偏りを打ち消すため）。
+    """
+
+    def __init__(self, dim: int):
+        """
+        Args:
+            dim: ベクトルの次元数
+        """
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for gram, count in char_ngrams(text).items():
+                hashed = zlib.crc32(gram.encode("utf-8"))
+                sign = 1.0 if hashed & 0x80000000 else -1.0
+                vectors[row, hashed % self.dim] += sign * (1 + math.log(count))
+        return _normalize_rows(vectors)
+
+
+class OnnxEmbedder:
+    """ONNX形式の文埋め込みモデル（CPU、平均プーリング）"""
+
+    def __init__(self, model_dir: str, max_length: int = 256):
+        """
+        Args:
+            model_dir: model.onnx と tokenizer.json を含むディレクトリ
+            max_length: 入力トークン数の上限
+
+        Raises:
+            ImportError: onnxruntime または tokenizers がインストールされていない場合
+            FileNotFoundError: モデルファイルが見つからない場合
+        """
+        import onnxruntime
+        from tokenizers import Tokenizer
+
+        model_path = os.path.join(model_dir, "model.onnx")
+        tokenizer_path = os.path.join(model_dir, "tokenizer.json")
+        for path in (model_path, tokenizer_path):
+            if not os.path.exists(path):
+                raise FileNotFoundError(path)
+
+        self.tokenizer = Tokenizer.from_file(tokenizer_path)
+        self.tokenizer.enable_truncation(max_length)
+        self.tokenizer.enable_padding()
+        self.session = onnxruntime.InferenceSession(model_path, providers=["CPUExecutionProvider"])
+        self._input_names = {i.name for i in self.session.get_inputs()}
+        self.name = f"onnx:{os.path.basename(os.path.normpath(model_dir))}"
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        encodings = self.tokenizer.encode_batch(list(texts))
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        inputs = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self._input_names:
+            inputs["token_type_ids"] = np.zeros_like(input_ids)
+
+        hidden = self.session.run(None, inputs)[0]  # (バッチ, トークン, 次元)
+        mask = attention_mask[:, :, None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+        return _normalize_rows(pooled.astype(np.float32))
+
+
+_embedder: Embedder | None = None
+_embedder_lock = threading.Lock()
+
+
+def get_embedder() -> Embedder:
+    """埋め込みエンジンのシングルトンインスタンスを取得
+
+    settings.embedding_model_dir が設定されていればONNXモデルを読み込み、
+    読み込めない場合はハッシュベクトルを使う。
+    """
+    global _embedder
+    with _embedder_lock:
+        if _embedder is None:
+            model_dir = settings.embedding_model_dir
+            if model_dir:
+                try:
+                    _embedder = OnnxEmbedder(model_dir)
+                except (ImportError, FileNotFoundError) as e:
+                    logger.warning("埋め込みモデルを読み込めないため、ハッシュベクトルを使用します: %s", e)
+            if _embedder is None:
+                _embedder = HashingEmbedder(settings.embedding_dim)
+            logger.info("埋め込みエンジン: %s", _embedder.name)
+        return _embedder
+
+
+class AgendaEmbeddingIndex:
+    """アジェンダ項目の埋め込みベクトル行列（コサイン類似度の上位k件を求める）"""
+
+    def __init__(self, agenda: tuple[tuple[str, str], ...], embedder: Embedder):
+        """
+        Args:
+            agenda: (タイトル, 期待成果物) のタプル
+            embedder: 埋め込みエンジン
+        """
+        self.titles = [title for title, _ in agenda]
+        self.embedder = embedder
+        self.matrix = embedder.embed([f"{title} {outcome}".strip() for title, outcome in agenda])
+
+    def top_k(self, vector: np.ndarray, k: int = 2) -> list[tuple[float, str]]:
+        """ベクトルとのコサイン類似度が高いアジェンダを返す
+
+        Args:
+            vector: L2正規化した埋め込みベクトル
+            k: 返す件数
+
+        Returns:
+            (類似度, アジェンダタイトル) のリスト（類似度の高い順）
+        """
+        if not self.titles:
+            return []
+        scores = self.matrix @ vector
+        k = min(k, len(self.titles))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(float(scores[i]), self.titles[i]) for i in top]
+
+
+@lru_cache(maxsize=128)
+def _get_agenda_index(agenda: tuple[tuple[str, str], ...], embedder_name: str) -> AgendaEmbeddingIndex:
+    """アジェンダごとのインデックスを取得（アジェンダの内容が同じ間は再利用）"""
+    return AgendaEmbeddingIndex(agenda, get_embedder())
+
+
+def get_agenda_index(agenda_items: list[dict[str, Any]]) -> AgendaEmbeddingIndex:
+    """アジェンダ項目（タイトル、期待成果物を含む）のインデックスを取得"""
+    agenda = tuple(
+        (item.get("title", ""), item.get("expectedOutcome", "") or "")
+        for item in agenda_items
+        if item.get("title")
+    )
+    return _get_agenda_index(agenda, get_embedder().name)
+
+
+# 文字起こしID（またはテキスト）→ 埋め込みベクトル（古い順）
+_chunk_vectors: OrderedDict[tuple[str, str], np.ndarray] = OrderedDict()
+_chunk_vectors_lock = threading.Lock()
+
+
+def embed_text(text: str, transcript_id: str | None = None) -> np.ndarray:
+    """チャンクのテキストを埋め込みベクトルに変換する（同じチャンクは1回だけ変換する）
+
+    Args:
+        text: テキスト
+        transcript_id: 文字起こしID（省略時はテキスト自体をキャッシュキーにする）
+
+    Returns:
+        L2正規化した埋め込みベクトル
+    """
+    embedder = get_embedder()
+    key = (embedder.name, transcript_id or text)
+    with _chunk_vectors_lock:
+        vector = _chunk_vectors.get(key)
+        if vector is not None:
+            _chunk_vectors.move_to_end(key)
+            return vector
+
+    vector = embedder.embed([text])[0]
+    with _chunk_vectors_lock:
+        _chunk_vectors[key] = vector
+        while len(_chunk_vectors) > settings.embedding_cache_size:
+            _chunk_vectors.popitem(last=False)
+    return vector
+
+
+def suggest_agenda(
+    text: str,
+    agenda_items: list[dict[str, Any]],
+    k: int = 2,
+    transcript_id: str | None = None,
+) -> list[tuple[float, str]]:
+    """発話に近いアジェンダを類似度の高い順に返す
+
+    Args:
+        text: 発話テキスト
+        agenda_items: アジェンダ項目のリスト
+        k: 返す件数
+        transcript_id: 文字起こしID（チャンクのベクトルのキャッシュキー）
+
+    Returns:
+        (類似度, アジェンダタイトル) のリスト
+    """
+    if not text.strip():
+        return []
+    index = get_agenda_index(agenda_items)
+    return index.top_k(embed_text(text, transcript_id), k)
@@ -0,0 +1,177 @@
+"""会議イベントのプロセス内Pub/Sub
+
+文字起こし・要約・Parking Lot・脱線検知の結果を会議ごとに配信する。
+SSEエンドポイント（GET /meetings/{id}/events）から購読される。
+
+- 会議ごとに連番のイベントIDを振り、直近のイベントをリングバッファに保持する。
+  再接続時は Last-Event-ID 以降のイベントをリングバッファから再送する。
+- 購読者ごとのキューは上限付き。キューが溢れた購読者は切断扱いとし、
+  クライアントの再接続（Last-Event-ID による再送）で追いつかせる。
+- publish はスレッドセーフ（スレッドプールやジョブワーカーからも呼べる）。
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any
+
+from ..settings import settings
+
+logger = logging.getLogger(__name__)
+
+# イベント種別
+EVENT_TRANSCRIPT = "transcript"
+# 発話中の暫定テキスト（WebSocket音声ストリームのみ）
+EVENT_TRANSCRIPT_PARTIAL = "transcript_partial"
+EVENT_SUMMARY = "summary"
+EVENT_PARKING = "parking"
+EVENT_DEVIATION = "deviation"
+# Last-Event-ID のイベントがリングバッファから消えており、再送できない場合に送る
+EVENT_RESYNC = "resync"
+
+
+@dataclass
+class MeetingEvent:
+    """会議イベント"""
+
+    id: int
+    type: str
+    data: dict[str, Any]
+
+
+@dataclass(eq=False)
+class Subscription:
+    """会議イベントの購読"""
+
+    meeting_id: str
+    loop: asyncio.AbstractEventLoop
+    queue: asyncio.Queue
+    # キューが溢れた（購読者が遅すぎる）場合にTrue
+    overflowed: bool = False
+    replay: list[MeetingEvent] = field(default_factory=list)
+
+
+class EventBus:
+    """会議ごとのイベント配信"""
+
+    def __init__(self, history_size: int | None = None, queue_size: int | None = None):
+        """
+        Args:
+            history_size: 会議ごとに保持するイベント数（再送用）
+            queue_size: 購読者ごとのキューの上限
+        """
+        self.history_size = history_size or settings.sse_history_size
+        self.queue_size = queue_size or settings.sse_queue_size
+        self._lock = threading.Lock()
+        self._last_ids: dict[str, int] = {}
+        self._history: dict[str, deque[MeetingEvent]] = {}
+        self._subscribers: dict[str, set[Subscription]] = {}
+
+    def publish(self, meeting_id: str, event_type: str, data: dict[str, Any]) -> MeetingEvent:
+        """イベントを配信する（スレッドセーフ）
+
+        Args:
+            meeting_id: 会議ID
+            event_type: イベント種別
+            data: イベントデータ（JSONに変換できる辞書）
+
+        Returns:
+            配信したイベント
+        """
+        with self._lock:
+            event_id = self._last_ids.get(meeting_id, 0) + 1
+            self._last_ids[meeting_id] = event_id
+            event = MeetingEvent(id=event_id, type=event_type, data=data)
+
+            history = self._history.get(meeting_id)
+            if history is None:
+                history = deque(maxlen=self.history_size)
+                self._history[meeting_id] = history
+            history.append(event)
+            subscribers = list(self._subscribers.get(meeting_id, ()))
+
+        if subscribers:
+            try:
+                running_loop = asyncio.get_running_loop()
+            except RuntimeError:
+                running_loop = None
+            for sub in subscribers:
+                if sub.loop is running_loop:
+                    self._deliver(sub, event)
+                elif not sub.loop.is_closed():
+                    sub.loop.call_soon_threadsafe(self._deliver, sub, event)
+        return event
+
+    def _deliver(self, sub: Subscription, event: MeetingEvent) -> None:
+        """購読者のキューにイベントを入れる（購読者のイベントループ上で実行）"""
+        if sub.overflowed:
+            return
+        try:
+            sub.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            sub.overflowed = True
+            logger.warning(
+                "Event subscriber overflowed, disconnecting: meeting_id=%s, queue_size=%d",
+                sub.meeting_id,
+                self.queue_size,
+            )
+
+    def subscribe(self, meeting_id: str, last_event_id: int | None = None) -> Subscription:
+        """会議のイベントを購読する（イベントループ上で呼ぶ）
+
+        last_event_id を指定した場合、それ以降のイベントを Subscription.replay に設定する。
+        再送できないイベントがある場合は、replay を resync イベント1件とする。
+
+        Args:
+            meeting_id: 会議ID
+            last_event_id: クライアントが最後に受信したイベントID
+
+        Returns:
+            購読
+        """
+        sub = Subscription(
+            meeting_id=meeting_id,
+            loop=asyncio.get_running_loop(),
+            queue=asyncio.Queue(maxsize=self.queue_size),
+        )
+        with self._lock:
+            if last_event_id is not None:
+                sub.replay = self._replay_after(meeting_id, last_event_id)
+            self._subscribers.setdefault(meeting_id, set()).add(sub)
+        return sub
+
+    def _replay_after(self, meeting_id: str, last_event_id: int) -> list[MeetingEvent]:
+        """last_event_id より後のイベントをリングバッファから取り出す（ロック内で呼ぶ）"""
+        history = self._history.get(meeting_id)
+        current_id = self._last_ids.get(meeting_id, 0)
+        if last_event_id == current_id:
+            return []
+
+        events = list(history or ())
+        oldest_id = events[0].id if events else current_id + 1
+        # サーバー再起動でIDが巻き戻った場合、またはリングバッファから消えている場合は再同期させる
+        if last_event_id > current_id or last_event_id < oldest_id - 1:
+            resync = MeetingEvent(id=current_id, type=EVENT_RESYNC, data={"last_event_id": current_id})
+            return [resync]
+        return [event for event in events if event.id > last_event_id]
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        """購読を解除する"""
+        with self._lock:
+            subscribers = self._subscribers.get(sub.meeting_id)
+            if subscribers is not None:
+                subscribers.discard(sub)
+                if not subscribers:
+                    del self._subscribers[sub.meeting_id]
+
+    def subscriber_count(self, meeting_id: str) -> int:
+        """会議の購読者数を返す"""
+        with self._lock:
+            return len(self._subscribers.get(meeting_id, ()))
+
+
+# シングルトンインスタンス
+event_bus = EventBus()
@@ -0,0 +1,186 @@
+"""ASR結果の幻聴（ハルシネーション）・言語フィルタ
+
+Whisper は無音や雑音に対して「ご視聴ありがとうございました」のような定型文や、
+日本語以外のテキストを出力することがある。文字起こし結果ごとに次の判定を行う。
+
+- 言語判定: 日本語文字（ひらがな・カタカナ・漢字）の割合が低いテキストを除外する。
+  文字種ごとの連続区間を1つの正規表現で走査し、1パスで数える
+- 定型文判定: 幻聴フレーズを1つの正規表現にまとめてコンパイルし、1回の検索で判定する。
+  リテラルのフレーズは共通の接頭辞でまとめたトライ木の正規表現にするため、
+  フレーズが数百件に増えても検索コストはほとんど増えない
+
+フレーズは DEFAULT_HALLUCINATION_PHRASES に加えて、settings.asr_hallucination_phrases_file
+（1行1フレーズ、# から始まる行はコメント、"re:" から始まる行は正規表現）から読み込む。
+"""
+from __future__ import annotations
+
+import logging
+import os
+import re
+from collections.abc import Iterable
+
+from ..settings import settings
+
+logger = logging.getLogger(__name__)
+
+# 正規表現として扱うフレーズの接頭辞
+REGEX_PREFIX = "re:"
+
+# 既定の幻聴フレーズ（明らかに不正なパターンのみ、最小限）
+DEFAULT_HALLUCINATION_PHRASES = [
+    "re:ご視聴.*?ありがとう",
+    r"re:Thanks?\s+for\s+watching",
+    "让我们来看看",
+    "re:視聴.*?感謝",
+    "re:ご.*?視聴.*?ございました",
+]
+
+# 日本語の割合がこの値未満のテキストは除外する（明らかに日本語ではない）
+MIN_JAPANESE_RATIO = 0.2
+# 空白以外の文字数がこの値以下のテキストは言語判定をしない
+MIN_CHARS_FOR_RATIO = 5
+
+_JAPANESE_CHARS = "぀-ゟ゠-ヿ一-龯"
+# 日本語文字の連続区間（グループ1）と、それ以外の空白以外の文字の連続区間
+_CHAR_RUNS = re.compile(rf"([{_JAPANESE_CHARS}]+)|[^\s{_JAPANESE_CHARS}]+")
+
+
+def count_japanese_chars(text: str) -> tuple[int, int]:
+    """日本語文字数と空白以外の文字数を1パスで数える
+
+    Args:
+        text: テキスト
+
+    Returns:
+        (日本語文字数, 空白以外の文字数)
+    """
+    japanese = 0
+    total = 0
+    for match in _CHAR_RUNS.finditer(text):
+        length = match.end() - match.start()
+        total += length
+        if match.lastindex:
+            japanese += length
+    return japanese, total
+
+
+def _trie_regex(phrases: Iterable[str]) -> str:
+    """リテラルのフレーズを、共通の接頭辞をまとめた正規表現に変換する
+
+    例: ["ありがとう", "ありがとうございます", "あります"] → "あり(?:がとう(?:ございます)?|ます)"
+    """
+    trie: dict = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[""] = {}  # フレーズの終端
+
+    def build(node: dict) -> str:
+        is_end = "" in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        if len(branches) == 1 and not is_end:
+            return branches[0]
+        pattern = f"(?:{'|'.join(branches)})"
+        return f"{pattern}?" if is_end else pattern
+
+    return build(trie)
+
+
+def load_phrase_file(path: str) -> list[str]:
+    """フレーズファイルを読み込む（1行1フレーズ、空行と # から始まる行は無視）
+
+    Args:
+        path: ファイルパス
+
+    Returns:
+        フレーズのリスト
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        return [
+            line.strip()
+            for line in f
+            if line.strip() and not line.lstrip().startswith("#")
+        ]
+
+
+class HallucinationFilter:
+    """幻聴フレーズと日本語の割合でASR結果を判定するフィルタ"""
+
+    def __init__(self, phrases: Iterable[str]):
+        """
+        Args:
+            phrases: 幻聴フレーズ（"re:" から始まるものは正規表現、それ以外はリテラル）
+        """
+        literals: set[str] = set()
+        regexes: list[str] = []
+        for phrase in phrases:
+            if phrase.startswith(REGEX_PREFIX):
+                regexes.append(phrase[len(REGEX_PREFIX):])
+            elif phrase:
+                # IGNORECASE で照合するため、大文字・小文字違いの重複をまとめる
+                literals.add(phrase.lower())
+
+        alternatives = [f"(?:{regex})" for regex in regexes]
+        if literals:
+            alternatives.append(_trie_regex(literals))
+        self.phrase_count = len(literals) + len(regexes)
+        self._pattern = re.compile("|".join(alternatives), re.IGNORECASE) if alternatives else None
+
+    def find_phrase(self, text: str) -> str | None:
+        """テキストに含まれる幻聴フレーズを探す
+
+        Returns:
+            一致した部分文字列（見つからない場合はNone）
+        """
+        if self._pattern is None:
+            return None
+        match = self._pattern.search(text)
+        return match.group(0) if match else None
+
+    def filter(self, text: str) -> str:
+        """幻聴と判定したテキストを除外する
+
+        Args:
+            text: 文字起こし結果テキスト
+
+        Returns:
+            フィルタリング後のテキスト（幻聴と判定された場合は空文字列）
+        """
+        if not text:
+            return ""
+
+        japanese, total = count_japanese_chars(text)
+        if total > MIN_CHARS_FOR_RATIO:
+            ratio = japanese / total
+            if ratio < MIN_JAPANESE_RATIO:
+                logger.info(">>> 日本語の割合が低すぎます（%.2f%% < 20%%）、無視します", ratio * 100)
+                return ""
+
+        matched = self.find_phrase(text)
+        if matched is not None:
+            logger.info(">>> 幻聴パターンを検出 (%s), 無視します: %s", matched, text[:100])
+            return ""
+
+        return text
+
+
+_filter: HallucinationFilter | None = None
+
+
+def get_hallucination_filter() -> HallucinationFilter:
+    """幻聴フィルタのシングルトンインスタンスを取得（初回のみフレーズを読み込んでコンパイル）"""
+    global _filter
+    if _filter is None:
+        phrases = list(DEFAULT_HALLUCINATION_PHRASES)
+        path = settings.asr_hallucination_phrases_file
+        if path:
+            if os.path.exists(path):
+                phrases.extend(load_phrase_file(path))
+            else:
+                logger.warning("幻聴フレーズファイルが見つかりません: %s", path)
+        _filter = HallucinationFilter(phrases)
+        logger.info("幻聴フィルタを初期化しました（フレーズ数: %d）", _filter.phrase_count)
+    return _filter
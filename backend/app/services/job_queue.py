@@ -0,0 +1,617 @@
+"""SQLiteを使った永続バックグラウンドジョブキュー
+
+要約生成などの時間のかかる処理をジョブとして {data_dir}/jobs.sqlite3 に登録し、
+ワーカーループで順に実行する。プロセスが再起動しても未完了のジョブは失われない。
+
+- 優先度: priority が小さいジョブから実行する
+- 重複排除: 同じ dedup_key（既定は「会議ID:ジョブ種別」）の待機中ジョブがあれば、
+  新しく登録せずにペイロードを最新の内容で上書きする
+- リトライ: 失敗したジョブは max_attempts 回まで指数バックオフで再実行する
+- 実行中のジョブはワーカーが job_heartbeat_interval_sec ごとにロック期限を延長する。
+  プロセスが落ちて延長が止まったジョブは、ロック期限（job_visibility_timeout_sec）切れで再実行される
+  （最後の試行だった場合は再実行せず failed にする）
+- 専用ワーカー: dedicate() で指定したジョブ種別は専用のワーカー数だけで実行し、
+  他の種別のジョブ（要約など）とワーカーを取り合わないようにする
+"""
+from __future__ import annotations
+
+import asyncio
+import inspect
+import json
+import logging
+import os
+import socket
+import time
+import uuid
+from collections.abc import Callable
+from datetime import datetime, timezone
+from typing import Any
+
+from ..core.sqlite import connect
+from ..schemas.job import Job
+from ..settings import settings
+
+logger = logging.getLogger(__name__)
+
+JOB_STATUS_QUEUED = "queued"
+JOB_STATUS_RUNNING = "running"
+JOB_STATUS_SUCCEEDED = "succeeded"
+JOB_STATUS_FAILED = "failed"
+
+DEFAULT_PRIORITY = 100
+
+# ジョブハンドラ: Jobを受け取り、結果（JSONに変換できる辞書またはNone）を返す
+JobHandler = Callable[[Job], Any]
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class JobQueue:
+    """SQLiteを使った永続ジョブキュー"""
+
+    def __init__(self, db_path: str):
+        """
+        Args:
+            db_path: SQLiteファイルのパス
+        """
+        self.db_path = db_path
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.handlers: dict[str, JobHandler] = {}
+        # 専用ワーカーで実行するジョブ種別 → ワーカー数
+        self.dedicated: dict[str, int] = {}
+        self._workers: list[asyncio.Task] = []
+        self._wakeup: asyncio.Event | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._init_db()
+
+    def _init_db(self) -> None:
+        with connect(self.db_path) as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    type TEXT NOT NULL,
+                    meeting_id TEXT,
+                    dedup_key TEXT,
+                    status TEXT NOT NULL,
+                    priority INTEGER NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    max_attempts INTEGER NOT NULL,
+                    payload TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    run_after REAL NOT NULL,
+                    locked_by TEXT,
+                    locked_until REAL,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs (status, priority, run_after)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_dedup ON jobs (dedup_key, status)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_meeting ON jobs (meeting_id)")
+
+    def register(self, job_type: str, handler: JobHandler) -> None:
+        """ジョブ種別に対応するハンドラを登録する
+
+        同期関数はスレッドプールで、コルーチン関数はイベントループ上で実行する。
+
+        Args:
+            job_type: ジョブ種別
+            handler: ジョブハンドラ
+        """
+        self.handlers[job_type] = handler
+
+    def dedicate(self, job_type: str, workers: int) -> None:
+        """ジョブ種別を専用ワーカーで実行するよう設定する（start() の前に呼ぶ）
+
+        専用ワーカーはこの種別のジョブだけを実行し、共通のワーカーはこの種別を実行しない。
+        同時に実行されるこの種別のジョブは workers 件までになる。
+
+        Args:
+            job_type: ジョブ種別
+            workers: 専用ワーカー数
+        """
+        self.dedicated[job_type] = workers
+
+    def enqueue(
+        self,
+        job_type: str,
+        meeting_id: str | None = None,
+        payload: dict[str, Any] | None = None,
+        priority: int = DEFAULT_PRIORITY,
+        dedup_key: str | None = None,
+        max_attempts: int | None = None,
+        delay_sec: float = 0,
+    ) -> Job:
+        """ジョブを登録する（スレッドセーフ）
+
+        同じ dedup_key の待機中ジョブがある場合は、そのジョブのペイロードを上書きして返す
+        （実行予定時刻は変えない）。
+        実行中のジョブは重複とみなさない（実行後の最新データで再実行するため）。
+
+        Args:
+            job_type: ジョブ種別
+            meeting_id: 会議ID
+            payload: ジョブのパラメータ
+            priority: 優先度（小さいほど先に実行）
+            dedup_key: 重複排除キー（省略時は「会議ID:ジョブ種別」）
+            max_attempts: 最大試行回数（省略時は settings.job_max_attempts）
+            delay_sec: 新しく登録する場合に、実行を遅らせる秒数
+
+        Returns:
+            登録された（または上書きされた）ジョブ
+        """
+        if dedup_key is None and meeting_id is not None:
+            dedup_key = f"{meeting_id}:{job_type}"
+        payload_json = json.dumps(payload or {}, ensure_ascii=False)
+        now_iso = _now_iso()
+
+        with connect(self.db_path) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = None
+                if dedup_key is not None:
+                    row = conn.execute(
+                        "SELECT id, priority FROM jobs WHERE dedup_key = ? AND status = ? LIMIT 1",
+                        (dedup_key, JOB_STATUS_QUEUED),
+                    ).fetchone()
+
+                if row:
+                    job_id = row["id"]
+                    conn.execute(
+                        "UPDATE jobs SET payload = ?, priority = ?, updated_at = ? WHERE id = ?",
+                        (payload_json, min(row["priority"], priority), now_iso, job_id),
+                    )
+                    logger.info("Job deduplicated: id=%s, type=%s, meeting_id=%s", job_id, job_type, meeting_id)
+                else:
+                    job_id = str(uuid.uuid4())
+                    conn.execute(
+                        """
+                        INSERT INTO jobs (
+                            id, type, meeting_id, dedup_key, status, priority, attempts,
+                            max_attempts, payload, run_after, created_at, updated_at
+                        ) VALUES (?, ?, ?, ?, ?, ?, 0, ?, ?, ?, ?, ?)
+                        """,
+                        (
+                            job_id,
+                            job_type,
+                            meeting_id,
+                            dedup_key,
+                            JOB_STATUS_QUEUED,
+                            priority,
+                            max_attempts or settings.job_max_attempts,
+                            payload_json,
+                            time.time() + delay_sec,
+                            now_iso,
+                            now_iso,
+                        ),
+                    )
+                    logger.info("Job enqueued: id=%s, type=%s, meeting_id=%s", job_id, job_type, meeting_id)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+        self._notify(delay_sec)
+        job = self.get(job_id)
+        assert job is not None
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        """ジョブを取得する
+
+        Args:
+            job_id: ジョブID
+
+        Returns:
+            ジョブ（存在しない場合はNone）
+        """
+        with connect(self.db_path) as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def list_jobs(
+        self,
+        meeting_id: str | None = None,
+        job_type: str | None = None,
+        limit: int = 50,
+    ) -> list[Job]:
+        """ジョブを新しい順に取得する
+
+        Args:
+            meeting_id: 会議IDで絞り込む
+            job_type: ジョブ種別で絞り込む
+            limit: 最大件数
+
+        Returns:
+            ジョブのリスト
+        """
+        conditions = []
+        params: list[Any] = []
+        if meeting_id is not None:
+            conditions.append("meeting_id = ?")
+            params.append(meeting_id)
+        if job_type is not None:
+            conditions.append("type = ?")
+            params.append(job_type)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        params.append(limit)
+
+        with connect(self.db_path) as conn:
+            rows = conn.execute(
+                f"SELECT * FROM jobs {where} ORDER BY created_at DESC LIMIT ?", params
+            ).fetchall()
+        return [self._row_to_job(row) for row in rows]
+
+    @staticmethod
+    def _row_to_job(row: Any) -> Job:
+        return Job(
+            id=row["id"],
+            type=row["type"],
+            meeting_id=row["meeting_id"],
+            status=row["status"],
+            priority=row["priority"],
+            attempts=row["attempts"],
+            max_attempts=row["max_attempts"],
+            payload=json.loads(row["payload"]),
+            result=json.loads(row["result"]) if row["result"] else None,
+            error=row["error"],
+            created_at=row["created_at"],
+            updated_at=row["updated_at"],
+        )
+
+    def claim_next(
+        self,
+        job_types: list[str] | None = None,
+        exclude_types: list[str] | None = None,
+    ) -> Job | None:
+        """実行可能なジョブを1件取得し、実行中にする
+
+        待機中で実行時刻を過ぎたジョブと、ロック期限が切れた実行中ジョブ（プロセス停止で
+        取り残されたもの）を対象に、優先度・登録順で1件を取得する。
+        ロック期限が切れたジョブのうち、試行回数が上限に達しているものは取得せず失敗にする。
+
+        Args:
+            job_types: 取得するジョブ種別（省略時はすべて）
+            exclude_types: 取得しないジョブ種別
+
+        Returns:
+            取得したジョブ（実行可能なジョブが無い場合はNone）
+        """
+        now = time.time()
+        type_filter = ""
+        params: list[Any] = [JOB_STATUS_QUEUED, now, JOB_STATUS_RUNNING, now]
+        if job_types:
+            type_filter += f" AND type IN ({', '.join('?' * len(job_types))})"
+            params.extend(job_types)
+        if exclude_types:
+            type_filter += f" AND type NOT IN ({', '.join('?' * len(exclude_types))})"
+            params.extend(exclude_types)
+
+        with connect(self.db_path) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # 最後の試行中にロック期限が切れたジョブは、再実行せずに失敗とする
+                expired = conn.execute(
+                    """
+                    SELECT id, type FROM jobs
+                    WHERE status = ? AND locked_until < ? AND attempts >= max_attempts
+                    """,
+                    (JOB_STATUS_RUNNING, now),
+                ).fetchall()
+                for expired_row in expired:
+                    conn.execute(
+                        """
+                        UPDATE jobs
+                        SET status = ?, error = ?, locked_by = NULL, locked_until = NULL,
+                            updated_at = ?
+                        WHERE id = ?
+                        """,
+                        (
+                            JOB_STATUS_FAILED,
+                            "Lock expired on the final attempt",
+                            _now_iso(),
+                            expired_row["id"],
+                        ),
+                    )
+                    logger.error(
+                        "Job failed permanently (lock expired on the final attempt): id=%s, type=%s",
+                        expired_row["id"], expired_row["type"],
+                    )
+
+                row = conn.execute(
+                    f"""
+                    SELECT id FROM jobs
+                    WHERE ((status = ? AND run_after <= ?)
+                       OR (status = ? AND locked_until < ?)){type_filter}
+                    ORDER BY priority, created_at
+                    LIMIT 1
+                    """,
+                    params,
+                ).fetchone()
+                if not row:
+                    conn.execute("COMMIT")
+                    return None
+
+                conn.execute(
+                    """
+                    UPDATE jobs
+                    SET status = ?, attempts = attempts + 1, locked_by = ?, locked_until = ?,
+                        updated_at = ?
+                    WHERE id = ?
+                    """,
+                    (
+                        JOB_STATUS_RUNNING,
+                        self.worker_id,
+                        now + settings.job_visibility_timeout_sec,
+                        _now_iso(),
+                        row["id"],
+                    ),
+                )
+                claimed = conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone()
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return self._row_to_job(claimed)
+
+    def heartbeat(self, job_id: str) -> bool:
+        """実行中のジョブのロック期限を延長する
+
+        Args:
+            job_id: ジョブID
+
+        Returns:
+            延長できたか（ロック期限切れで他のワーカーが取得し直した場合はFalse）
+        """
+        with connect(self.db_path) as conn:
+            cursor = conn.execute(
+                """
+                UPDATE jobs SET locked_until = ?, updated_at = ?
+                WHERE id = ? AND status = ? AND locked_by = ?
+                """,
+                (
+                    time.time() + settings.job_visibility_timeout_sec,
+                    _now_iso(),
+                    job_id,
+                    JOB_STATUS_RUNNING,
+                    self.worker_id,
+                ),
+            )
+            return cursor.rowcount > 0
+
+    def complete(self, job: Job, result: dict[str, Any] | None) -> bool:
+        """ジョブを成功として記録する
+
+        ロック期限切れで他のワーカーが取得し直した場合は、新しい実行の結果を上書きしない
+        （実行中かつ自分が取得した試行のままの場合のみ更新する）。
+
+        Args:
+            job: 成功したジョブ
+            result: 実行結果
+
+        Returns:
+            記録できたか
+        """
+        with connect(self.db_path) as conn:
+            cursor = conn.execute(
+                """
+                UPDATE jobs
+                SET status = ?, result = ?, error = NULL, locked_by = NULL, locked_until = NULL,
+                    updated_at = ?
+                WHERE id = ? AND status = ? AND locked_by = ? AND attempts = ?
+                """,
+                (
+                    JOB_STATUS_SUCCEEDED,
+                    json.dumps(result, ensure_ascii=False) if result is not None else None,
+                    _now_iso(),
+                    job.id,
+                    JOB_STATUS_RUNNING,
+                    self.worker_id,
+                    job.attempts,
+                ),
+            )
+        if cursor.rowcount == 0:
+            logger.warning(
+                "Job lock was lost before completion, result discarded: id=%s, type=%s, attempt=%d",
+                job.id, job.type, job.attempts,
+            )
+            return False
+        return True
+
+    def fail(self, job: Job, error: str) -> bool:
+        """ジョブの失敗を記録する
+
+        試行回数が上限未満の場合は、指数バックオフ後に再実行されるよう待機中に戻す。
+        ロック期限切れで他のワーカーが取得し直した場合は、新しい実行のロックを解除しない
+        （実行中かつ自分が取得した試行のままの場合のみ更新する）。
+
+        Args:
+            job: 失敗したジョブ
+            error: エラーメッセージ
+
+        Returns:
+            記録できたか
+        """
+        retry = job.attempts < job.max_attempts
+        status = JOB_STATUS_QUEUED if retry else JOB_STATUS_FAILED
+        run_after = time.time() + settings.job_retry_base_sec * (2 ** (job.attempts - 1))
+        with connect(self.db_path) as conn:
+            cursor = conn.execute(
+                """
+                UPDATE jobs
+                SET status = ?, error = ?, run_after = ?, locked_by = NULL, locked_until = NULL,
+                    updated_at = ?
+                WHERE id = ? AND status = ? AND locked_by = ? AND attempts = ?
+                """,
+                (
+                    status,
+                    error,
+                    run_after,
+                    _now_iso(),
+                    job.id,
+                    JOB_STATUS_RUNNING,
+                    self.worker_id,
+                    job.attempts,
+                ),
+            )
+        if cursor.rowcount == 0:
+            logger.warning(
+                "Job lock was lost before the failure was recorded: "
+                "id=%s, type=%s, attempt=%d, error=%s",
+                job.id, job.type, job.attempts, error,
+            )
+            return False
+        if retry:
+            logger.warning(
+                "Job failed, will retry: id=%s, type=%s, attempt=%d/%d, error=%s",
+                job.id, job.type, job.attempts, job.max_attempts, error,
+            )
+        else:
+            logger.error(
+                "Job failed permanently: id=%s, type=%s, attempts=%d, error=%s",
+                job.id, job.type, job.attempts, error,
+            )
+        return True
+
+    async def start(self, workers: int | None = None) -> None:
+        """ワーカーループを開始する（アプリ起動時に呼ぶ）
+
+        Args:
+            workers: 並列実行するワーカー数（省略時は settings.job_queue_workers）
+        """
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        count = workers or settings.job_queue_workers
+        exclude_types = list(self.dedicated)
+        for index in range(count):
+            self._workers.append(
+                asyncio.create_task(self._run_worker(index, exclude_types=exclude_types))
+            )
+        for job_type, dedicated_count in self.dedicated.items():
+            for index in range(dedicated_count):
+                self._workers.append(
+                    asyncio.create_task(self._run_worker(index, job_types=[job_type]))
+                )
+        logger.info(
+            "Job queue started: worker_id=%s, workers=%d, dedicated=%s",
+            self.worker_id, count, self.dedicated,
+        )
+
+    async def shutdown(self) -> None:
+        """ワーカーループを停止する（アプリ終了時に呼ぶ）
+
+        実行中のジョブはロック期限切れ後に再実行される。
+        """
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers.clear()
+        logger.info("Job queue stopped: worker_id=%s", self.worker_id)
+
+    def _notify(self, delay_sec: float = 0) -> None:
+        """待機中のワーカーを起こす（別スレッドからも呼べる）
+
+        Args:
+            delay_sec: 起こすまでの秒数（実行を遅らせたジョブの実行予定時刻に合わせる）
+        """
+        if self._loop is None or self._wakeup is None or self._loop.is_closed():
+            return
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        wakeup = self._wakeup
+        if delay_sec > 0:
+            self._loop.call_soon_threadsafe(self._loop.call_later, delay_sec, wakeup.set)
+        elif running_loop is self._loop:
+            wakeup.set()
+        else:
+            self._loop.call_soon_threadsafe(wakeup.set)
+
+    async def _run_worker(
+        self,
+        index: int,
+        job_types: list[str] | None = None,
+        exclude_types: list[str] | None = None,
+    ) -> None:
+        """ジョブを1件ずつ取得して実行するワーカーループ"""
+        assert self._wakeup is not None
+        while True:
+            try:
+                job = await asyncio.to_thread(self.claim_next, job_types, exclude_types)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Failed to claim job (worker=%d): %s", index, e, exc_info=True)
+                job = None
+
+            if job is None:
+                # 新しいジョブの登録またはポーリング間隔の経過まで待機
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=settings.job_poll_interval_sec)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                continue
+
+            await self._execute(job)
+
+    async def _heartbeat_loop(self, job: Job) -> None:
+        """ジョブの実行中、ロック期限を定期的に延長する（期限切れによる重複実行を防ぐ）"""
+        while True:
+            await asyncio.sleep(settings.job_heartbeat_interval_sec)
+            try:
+                renewed = await asyncio.to_thread(self.heartbeat, job.id)
+            except Exception as e:
+                logger.warning("Failed to renew job lock: id=%s, error=%s", job.id, e)
+                continue
+            if not renewed:
+                logger.warning("Job lock was lost: id=%s, type=%s", job.id, job.type)
+                return
+
+    async def _execute(self, job: Job) -> None:
+        handler = self.handlers.get(job.type)
+        if handler is None:
+            await asyncio.to_thread(self.fail, job, f"No handler registered for job type: {job.type}")
+            return
+
+        logger.info(
+            "Job started: id=%s, type=%s, meeting_id=%s, attempt=%d",
+            job.id, job.type, job.meeting_id, job.attempts,
+        )
+        heartbeat = asyncio.create_task(self._heartbeat_loop(job))
+        try:
+            if inspect.iscoroutinefunction(handler):
+                result = await handler(job)
+            else:
+                result = await asyncio.to_thread(handler, job)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.debug("Job handler raised", exc_info=True)
+            await asyncio.to_thread(self.fail, job, str(e) or e.__class__.__name__)
+            return
+        finally:
+            heartbeat.cancel()
+
+        if await asyncio.to_thread(self.complete, job, result):
+            logger.info("Job succeeded: id=%s, type=%s, meeting_id=%s", job.id, job.type, job.meeting_id)
+
+
+# シングルトンインスタンス
+_job_queue: JobQueue | None = None
+
+
+def get_job_queue() -> JobQueue:
+    """ジョブキューのシングルトンインスタンスを取得"""
+    global _job_queue
+    if _job_queue is None:
+        _job_queue = JobQueue(os.path.join(settings.data_dir, "jobs.sqlite3"))
+    return _job_queue
@@ -1,97 +1,487 @@
-"""会議スケジューラー - 3分ごとの要約生成バッチ処理"""
+"""会議スケジューラー - 発話量に応じた要約生成バッチ処理
+
+新しい文字起こしの量（文字数・件数）や話題の転換（脱線検知）をトリガーとして要約を生成する。
+最小・最大間隔で生成頻度を制御し、差分が無い場合は要約を生成しない。
+
+スケジュール状態はSQLite（{data_dir}/scheduler.sqlite3）に保存し、各会議の要約ループは
+リース（有効期限付きの所有権）を取得した1つのワーカーだけが実行する。
+リースはハートビートで更新され、ワーカーの停止・再起動時は期限切れ後に別のワーカー
+（または再起動後の同じワーカー）が引き継ぐ。
+"""
 import asyncio
 import logging
+import os
+import socket
+import time
+from functools import partial
 from typing import Dict, Set
-from datetime import datetime, timezone
+from uuid import uuid4
 
-from ..storage import DataStore
+from ..core.sqlite import connect
 from ..meeting_summarizer.service import summarize_meeting
 from ..settings import settings
+from ..storage import DataStore
+from .summary_service import (
+    build_summary_data,
+    generate_incremental_summary,
+    make_checkpoint,
+    measure_delta,
+    save_summary,
+)
+from .transcript_index import get_transcript_index
 
 logger = logging.getLogger(__name__)
 
 
+class SummaryLeaseStore:
+    """要約スケジュールとリースをSQLiteで管理するストア
+
+    summary_schedules テーブルの1行が1会議に対応する。
+    - active: 会議中（要約ループを実行すべき）かどうか
+    - owner / lease_expires_at: ループを実行中のワーカーとリースの有効期限（UNIX秒）
+    - topic_shift_at: 他のワーカーから通知された話題の転換（ループを実行中のワーカーが取り出す）
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        with connect(self.db_path) as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS summary_schedules (
+                    meeting_id TEXT PRIMARY KEY,
+                    active INTEGER NOT NULL DEFAULT 1,
+                    owner TEXT,
+                    lease_expires_at REAL NOT NULL DEFAULT 0,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(summary_schedules)")}
+            if "topic_shift_at" not in columns:
+                conn.execute("ALTER TABLE summary_schedules ADD COLUMN topic_shift_at REAL")
+
+    def activate(self, meeting_id: str):
+        """会議のスケジュールを有効にする"""
+        now = time.time()
+        with connect(self.db_path) as conn:
+            conn.execute(
+                """
+                INSERT INTO summary_schedules (meeting_id, active, updated_at)
+                VALUES (?, 1, ?)
+                ON CONFLICT(meeting_id) DO UPDATE SET active = 1, updated_at = excluded.updated_at
+                """,
+                (meeting_id, now),
+            )
+
+    def deactivate(self, meeting_id: str):
+        """会議のスケジュールを無効にし、リースを解放する"""
+        with connect(self.db_path) as conn:
+            conn.execute(
+                """
+                UPDATE summary_schedules
+                SET active = 0, owner = NULL, lease_expires_at = 0, updated_at = ?
+                WHERE meeting_id = ?
+                """,
+                (time.time(), meeting_id),
+            )
+
+    def try_acquire(self, meeting_id: str, owner: str, ttl_sec: float) -> bool:
+        """リースを取得または更新する
+
+        リースが未取得・期限切れ・自分の所有の場合のみ取得できる（原子的なUPDATE）。
+
+        Args:
+            meeting_id: 会議ID
+            owner: ワーカーID
+            ttl_sec: リースの有効期間（秒）
+
+        Returns:
+            リースを保持している場合True
+        """
+        now = time.time()
+        with connect(self.db_path) as conn:
+            cursor = conn.execute(
+                """
+                UPDATE summary_schedules
+                SET owner = ?, lease_expires_at = ?, updated_at = ?
+                WHERE meeting_id = ? AND active = 1
+                  AND (owner IS NULL OR owner = ? OR lease_expires_at < ?)
+                """,
+                (owner, now + ttl_sec, now, meeting_id, owner, now),
+            )
+            return cursor.rowcount == 1
+
+    def release(self, meeting_id: str, owner: str):
+        """自分が保持しているリースを解放する"""
+        with connect(self.db_path) as conn:
+            conn.execute(
+                """
+                UPDATE summary_schedules
+                SET owner = NULL, lease_expires_at = 0, updated_at = ?
+                WHERE meeting_id = ? AND owner = ?
+                """,
+                (time.time(), meeting_id, owner),
+            )
+
+    def mark_topic_shift(self, meeting_id: str):
+        """話題の転換を記録する（ループを実行中の別のワーカーに伝えるため）"""
+        with connect(self.db_path) as conn:
+            conn.execute(
+                "UPDATE summary_schedules SET topic_shift_at = ? WHERE meeting_id = ? AND active = 1",
+                (time.time(), meeting_id),
+            )
+
+    def take_topic_shift(self, meeting_id: str) -> bool:
+        """記録された話題の転換を取り出す
+
+        Returns:
+            話題の転換が記録されていた場合True（記録は消去する）
+        """
+        with connect(self.db_path) as conn:
+            cursor = conn.execute(
+                """
+                UPDATE summary_schedules SET topic_shift_at = NULL
+                WHERE meeting_id = ? AND topic_shift_at IS NOT NULL
+                """,
+                (meeting_id,),
+            )
+            return cursor.rowcount == 1
+
+    def list_active(self) -> list[str]:
+        """スケジュールが有効な会議IDの一覧を取得する"""
+        with connect(self.db_path) as conn:
+            rows = conn.execute(
+                "SELECT meeting_id FROM summary_schedules WHERE active = 1"
+            ).fetchall()
+        return [row["meeting_id"] for row in rows]
+
+
 class MeetingScheduler:
-    """会議中の自動要約生成を管理するスケジューラー"""
+    """会議中の自動要約生成を管理するスケジューラー
 
-    def __init__(self, data_store: DataStore):
+    active_meetings / tasks はこのワーカーがリースを保持して実行中のループのみを表す。
+    会議全体のスケジュール状態は SummaryLeaseStore が保持する。
+    """
+
+    def __init__(self, data_store: DataStore, lease_store: SummaryLeaseStore | None = None):
         self.data_store = data_store
+        self.leases = lease_store or SummaryLeaseStore(
+            os.path.join(settings.data_dir, "scheduler.sqlite3")
+        )
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+        self._reconcile_task: asyncio.Task | None = None
         self.active_meetings: Set[str] = set()
         self.tasks: Dict[str, asyncio.Task] = {}
+        # 要約ループを起こすためのイベント（複数のトリガーは1回の評価にまとめられる）
+        self.wakeups: Dict[str, asyncio.Event] = {}
+        # 話題の転換が通知され、次回の評価で要約を生成すべき会議
+        self.topic_shifts: Set[str] = set()
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    @property
+    def lease_ttl_sec(self) -> float:
+        """リースの有効期間（ハートビート間隔の3倍）"""
+        return settings.scheduler_heartbeat_sec * 3
+
+    async def start(self):
+        """リースの取得・更新ループを開始する（アプリケーション起動時に呼び出す）
+
+        再起動前に有効だった会議のループも、リースの期限切れ後にこのループで再開される。
+        """
+        if self._reconcile_task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._reconcile_task = asyncio.create_task(self._run_reconcile_loop())
+        logger.info(f"Summary scheduler started (worker={self.worker_id})")
+
+    async def shutdown(self):
+        """全ループを停止し、保持しているリースを解放する（アプリケーション終了時に呼び出す）"""
+        if self._reconcile_task is not None:
+            self._reconcile_task.cancel()
+            self._reconcile_task = None
+
+        for meeting_id in list(self.active_meetings):
+            self._stop_local_loop(meeting_id)
+            try:
+                await asyncio.to_thread(self.leases.release, meeting_id, self.worker_id)
+            except Exception as e:
+                logger.warning(f"Failed to release lease for meeting {meeting_id}: {e}")
+        logger.info(f"Summary scheduler stopped (worker={self.worker_id})")
 
     async def start_meeting_scheduler(self, meeting_id: str):
         """会議の要約スケジューラーを開始する
 
+        スケジュールを有効にし、リースを取得できた場合はこのワーカーでループを開始する。
+        取得できない場合は、リースを保持する別のワーカーがループを実行する。
+
         Args:
             meeting_id: 会議ID
         """
+        await asyncio.to_thread(self.leases.activate, meeting_id)
+
         if meeting_id in self.active_meetings:
             logger.warning(f"Meeting {meeting_id} scheduler is already running")
             return
 
+        acquired = await asyncio.to_thread(
+            self.leases.try_acquire, meeting_id, self.worker_id, self.lease_ttl_sec
+        )
+        if not acquired:
+            logger.info(f"Summary scheduler for meeting {meeting_id} is owned by another worker")
+            return
+
+        self._start_local_loop(meeting_id)
+
+    def stop_meeting_scheduler(self, meeting_id: str):
+        """会議の要約スケジューラーを停止する
+
+        スケジュールを無効にする。別のワーカーが実行中のループは、
+        次回のハートビートで無効化を検知して停止する。
+
+        Args:
+            meeting_id: 会議ID
+        """
+        self.leases.deactivate(meeting_id)
+
+        if meeting_id not in self.active_meetings:
+            logger.info(f"Meeting {meeting_id} scheduler is not running on this worker")
+            return
+
+        self._stop_local_loop(meeting_id)
+
+    def _start_local_loop(self, meeting_id: str):
+        """このワーカーで要約ループを開始する"""
         self.active_meetings.add(meeting_id)
+        self.wakeups[meeting_id] = asyncio.Event()
         # 実行中のイベントループを取得してタスクを作成（FastAPI環境用）
         try:
+            self._loop = asyncio.get_running_loop()
             task = asyncio.create_task(self._run_summary_loop(meeting_id))
             self.tasks[meeting_id] = task
-            logger.info(f"Started summary scheduler for meeting {meeting_id}")
+            task.add_done_callback(partial(self._on_loop_done, meeting_id))
+            logger.info(f"Started summary scheduler for meeting {meeting_id} (worker={self.worker_id})")
         except Exception as e:
             logger.error(f"Failed to start scheduler for meeting {meeting_id}: {e}", exc_info=True)
             self.active_meetings.discard(meeting_id)
+            self.wakeups.pop(meeting_id, None)
             raise
 
-    def stop_meeting_scheduler(self, meeting_id: str):
-        """会議の要約スケジューラーを停止する
+    def _stop_local_loop(self, meeting_id: str):
+        """このワーカーの要約ループを停止する"""
+        self.active_meetings.discard(meeting_id)
+        self.wakeups.pop(meeting_id, None)
+        self.topic_shifts.discard(meeting_id)
+        task = self.tasks.pop(meeting_id, None)
+        if task:
+            task.cancel()
+        logger.info(f"Stopped summary scheduler for meeting {meeting_id}")
+
+    def _on_loop_done(self, meeting_id: str, task: asyncio.Task):
+        """要約ループの終了時の処理
+
+        _stop_local_loop 以外で終了したループ（予期しない例外など）を active_meetings から外し、
+        次回の _reconcile（リースは保持したまま）でループを再開させる。
+        """
+        if self.tasks.get(meeting_id) is not task:
+            # 停止済み、または新しいループに置き換え済み
+            return
+        self.tasks.pop(meeting_id, None)
+        self.active_meetings.discard(meeting_id)
+        self.wakeups.pop(meeting_id, None)
+        error = None if task.cancelled() else task.exception()
+        logger.error(
+            f"Summary loop for meeting {meeting_id} ended unexpectedly; "
+            f"it will be restarted by the next reconcile: {error!r}"
+        )
+
+    async def _run_reconcile_loop(self):
+        """ハートビート間隔ごとにリースを取得・更新し、ループの起動・停止を同期する"""
+        try:
+            while True:
+                try:
+                    await self._reconcile()
+                except Exception as e:
+                    logger.error(f"Summary scheduler reconcile error: {e}", exc_info=True)
+                await asyncio.sleep(settings.scheduler_heartbeat_sec)
+        except asyncio.CancelledError:
+            pass
+
+    async def _reconcile(self):
+        """リースの状態とこのワーカーのループを一致させる
+
+        - 有効な会議のリースを取得・更新し、取得できた会議のループを開始する
+        - リースを失った会議、無効化された会議のループを停止する
+        """
+        active_ids = set(await asyncio.to_thread(self.leases.list_active))
+
+        for meeting_id in active_ids:
+            acquired = await asyncio.to_thread(
+                self.leases.try_acquire, meeting_id, self.worker_id, self.lease_ttl_sec
+            )
+            if acquired and meeting_id not in self.active_meetings:
+                logger.info(f"Acquired summary lease for meeting {meeting_id}")
+                self._start_local_loop(meeting_id)
+            elif not acquired and meeting_id in self.active_meetings:
+                logger.warning(f"Lost summary lease for meeting {meeting_id}")
+                self._stop_local_loop(meeting_id)
+
+        for meeting_id in list(self.active_meetings - active_ids):
+            self._stop_local_loop(meeting_id)
+
+    def notify_new_transcript(self, meeting_id: str):
+        """新しい文字起こしの追加を通知する（要約トリガーの再評価を促す）
+
+        同期エンドポイント（スレッドプール）からも呼び出せる。
+
+        Args:
+            meeting_id: 会議ID
+        """
+        self._wake(meeting_id)
+
+    def notify_topic_shift(self, meeting_id: str):
+        """話題の転換（脱線検知）を通知する
+
+        最小間隔を満たし、差分がある場合は発話量にかかわらず次回の評価で要約を生成する。
+        ループが別のワーカーで実行中の場合はSQLiteに記録し、そのワーカーが次回の評価
+        （summary_poll_interval_sec 以内）で取り出す。
 
         Args:
             meeting_id: 会議ID
         """
         if meeting_id not in self.active_meetings:
-            logger.warning(f"Meeting {meeting_id} scheduler is not running")
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                self.leases.mark_topic_shift(meeting_id)
+            else:
+                loop.run_in_executor(None, self.leases.mark_topic_shift, meeting_id)
             return
+        self.topic_shifts.add(meeting_id)
+        self._wake(meeting_id)
 
-        self.active_meetings.discard(meeting_id)
-        task = self.tasks.pop(meeting_id, None)
-        if task:
-            task.cancel()
-        logger.info(f"Stopped summary scheduler for meeting {meeting_id}")
+    def _wake(self, meeting_id: str):
+        """要約ループを起こす（イベントループ外のスレッドからも安全に呼び出せる）"""
+        event = self.wakeups.get(meeting_id)
+        if event is None or self._loop is None or self._loop.is_closed():
+            return
+        self._loop.call_soon_threadsafe(event.set)
 
     async def _run_summary_loop(self, meeting_id: str):
-        """3分ごとに要約を生成するループ
+        """発話量に応じて要約を生成するループ
+
+        通知（新しい文字起こし・話題の転換）またはポーリング間隔ごとにトリガー条件を評価する。
+        - 前回の要約から summary_min_interval_sec 未満の場合は生成しない
+        - 差分（新しい文字起こし）が無い場合は生成しない
+        - 差分が summary_trigger_chars 文字 / summary_trigger_chunks 件以上、話題の転換、
+          または前回の要約から summary_max_interval_sec 以上経過した場合に生成する
 
         Args:
             meeting_id: 会議ID
         """
+        last_summary_at = time.monotonic()
         try:
             while meeting_id in self.active_meetings:
-                # 3分待機
-                await asyncio.sleep(3 * 60)  # 180秒
+                event = self.wakeups.get(meeting_id)
+                if event is None:
+                    break
+
+                # 通知またはポーリング間隔まで待機（待機中の複数の通知は1回の評価にまとめる）
+                try:
+                    await asyncio.wait_for(event.wait(), timeout=settings.summary_poll_interval_sec)
+                except asyncio.TimeoutError:
+                    pass
+                event.clear()
 
                 # まだアクティブかチェック
                 if meeting_id not in self.active_meetings:
                     break
 
+                # 他のワーカーに通知された話題の転換を取り込む
+                if await asyncio.to_thread(self.leases.take_topic_shift, meeting_id):
+                    self.topic_shifts.add(meeting_id)
+
+                elapsed = time.monotonic() - last_summary_at
+                if elapsed < settings.summary_min_interval_sec:
+                    continue
+
+                if not await self._should_summarize(meeting_id, elapsed):
+                    continue
+
+                # 生成直前にリースを確認・更新（他のワーカーとの重複生成を防ぐ）
+                owns_lease = await asyncio.to_thread(
+                    self.leases.try_acquire, meeting_id, self.worker_id, self.lease_ttl_sec
+                )
+                if not owns_lease:
+                    logger.warning(f"Summary lease for meeting {meeting_id} is no longer held")
+                    self._stop_local_loop(meeting_id)
+                    break
+
                 # 要約を生成
                 try:
                     await self._generate_summary(meeting_id)
                 except Exception as e:
                     logger.error(f"Failed to generate summary for meeting {meeting_id}: {e}", exc_info=True)
+                finally:
+                    last_summary_at = time.monotonic()
+                    self.topic_shifts.discard(meeting_id)
 
         except asyncio.CancelledError:
             logger.info(f"Summary loop cancelled for meeting {meeting_id}")
         except Exception as e:
             logger.error(f"Summary loop error for meeting {meeting_id}: {e}", exc_info=True)
 
+    async def _should_summarize(self, meeting_id: str, elapsed: float) -> bool:
+        """要約を生成すべきかを判定する
+
+        Args:
+            meeting_id: 会議ID
+            elapsed: 前回の要約からの経過秒数
+
+        Returns:
+            要約を生成すべき場合True
+        """
+        delta_chars, delta_chunks = await asyncio.to_thread(
+            measure_delta, self.data_store, meeting_id
+        )
+        if delta_chunks == 0:
+            return False
+
+        if delta_chars >= settings.summary_trigger_chars:
+            reason = f"chars={delta_chars}"
+        elif delta_chunks >= settings.summary_trigger_chunks:
+            reason = f"chunks={delta_chunks}"
+        elif meeting_id in self.topic_shifts:
+            reason = "topic_shift"
+        elif elapsed >= settings.summary_max_interval_sec:
+            reason = f"max_interval={elapsed:.0f}s"
+        else:
+            return False
+
+        logger.info(f"Summary triggered for meeting {meeting_id} ({reason})")
+        return True
+
     async def _generate_summary(self, meeting_id: str):
         """要約を生成してストレージに保存する
 
+        インクリメンタルモード（settings.summary_incremental）では、前回の要約以降の
+        差分だけを要約して前回の要約に畳み込む。
+
         Args:
             meeting_id: 会議ID
         """
         logger.info(f"Generating summary for meeting {meeting_id}")
 
-        # 文字起こしデータを読み込む
-        transcripts = self.data_store.load_transcripts(meeting_id)
+        if settings.summary_incremental:
+            summary_data = await asyncio.to_thread(
+                generate_incremental_summary, self.data_store, meeting_id
+            )
+            if summary_data is not None:
+                logger.info(f"Incremental summary generated and saved for meeting {meeting_id}")
+            return
+
+        # 文字起こしデータを読み込む（transcripts.json が更新されていなければインデックスを再利用）
+        index = get_transcript_index(self.data_store, meeting_id)
+        transcripts = index.transcripts
         if not transcripts:
             logger.warning(f"No transcripts found for meeting {meeting_id}")
             return
@@ -109,16 +499,12 @@ class MeetingScheduler:
         )
 
         # 要約データを作成
-        summary_data = {
-            "generated_at": datetime.now(timezone.utc).isoformat(),
-            "summary": summary_result.summary,
-            "decisions": summary_result.decisions,
-            "undecided": summary_result.undecided,
-            "actions": [action.model_dump() for action in summary_result.actions],
-        }
+        summary_data = build_summary_data(
+            summary_result, checkpoint=make_checkpoint(transcripts), audio_end_sec=index.end_sec
+        )
 
         # 要約データを保存
-        self.data_store.save_summary(meeting_id, summary_data)
+        save_summary(self.data_store, meeting_id, summary_data)
 
         logger.info(f"Summary generated and saved for meeting {meeting_id}")
 
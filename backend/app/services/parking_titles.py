@@ -0,0 +1,185 @@
+"""保留事項（Parking Lot）のタイトル生成（リクエストの処理から切り離してバックグラウンドで生成）
+
+POST /parking では内容の先頭を仮のタイトルとして即座に保存・配信し（title_pending=True）、
+LLMによるタイトル生成は JOB_PARKING_TITLE のジョブで行う。生成したタイトルで項目を更新し、
+EVENT_PARKING で更新後の項目を配信する。
+
+- まとめた生成: ジョブは会議ごとに1つ（重複排除キーは既定の「会議ID:ジョブ種別」）で、
+  登録から parking_title_batch_window_ms 待って実行する。その間に続けて追加された項目は
+  1つのジョブで、1回のAPI呼び出しでまとめてタイトルを生成する
+- キャッシュ: 同じ内容（正規化した内容のSHA-256が同じ）のタイトルはLLMを呼ばずに再利用する
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict
+from functools import partial
+from typing import Any
+
+from ..schemas.job import Job
+from ..settings import settings
+from ..storage import DataStore
+from .ai_deviation import ai_deviation_service
+from .event_bus import EVENT_PARKING, event_bus
+from .job_queue import JobQueue
+
+logger = logging.getLogger(__name__)
+
+JOB_PARKING_TITLE = "parking_title"  # 保留事項のタイトル生成
+
+# 脱線検知（30）より後、要約（50）より先に実行する
+PARKING_TITLE_PRIORITY = 40
+
+
+def provisional_title(content: str) -> str:
+    """タイトル生成が終わるまでの仮のタイトル（内容の先頭）"""
+    return " ".join(content.split())[:settings.parking_provisional_title_chars]
+
+
+def content_hash(content: str) -> str:
+    """タイトルのキャッシュキー（NFKC正規化・空白を詰めた内容のSHA-256）"""
+    normalized = " ".join(unicodedata.normalize("NFKC", content).split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class ParkingTitleCache:
+    """内容のハッシュ → 生成したタイトル（件数上限付きのLRU）"""
+
+    def __init__(self, max_entries: int):
+        """
+        Args:
+            max_entries: キャッシュするタイトルの最大件数
+        """
+        self.max_entries = max_entries
+        self._titles: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            title = self._titles.get(key)
+            if title is not None:
+                self._titles.move_to_end(key)
+            return title
+
+    def put(self, key: str, title: str) -> None:
+        with self._lock:
+            self._titles[key] = title
+            self._titles.move_to_end(key)
+            while len(self._titles) > self.max_entries:
+                self._titles.popitem(last=False)
+
+
+# シングルトンインスタンス
+_title_cache: ParkingTitleCache | None = None
+
+
+def get_parking_title_cache() -> ParkingTitleCache:
+    """保留事項タイトルキャッシュのシングルトンインスタンスを取得"""
+    global _title_cache
+    if _title_cache is None:
+        _title_cache = ParkingTitleCache(settings.parking_title_cache_size)
+    return _title_cache
+
+
+def enqueue_parking_titles(queue: JobQueue, meeting_id: str) -> Job:
+    """会議のタイトル未生成の保留事項について、タイトル生成ジョブを登録する
+
+    Args:
+        queue: ジョブキュー
+        meeting_id: 会議ID
+
+    Returns:
+        登録したジョブ（待機中のジョブがある場合はそのジョブ）
+    """
+    return queue.enqueue(
+        JOB_PARKING_TITLE,
+        meeting_id,
+        priority=PARKING_TITLE_PRIORITY,
+        # 続けて追加される項目を1つのジョブにまとめるため、少し待ってから実行する
+        delay_sec=settings.parking_title_batch_window_ms / 1000,
+    )
+
+
+async def _run_parking_title_job(store: DataStore, job: Job) -> dict[str, Any]:
+    """JOB_PARKING_TITLE のハンドラ"""
+    meeting_id = job.meeting_id
+    meeting = await asyncio.to_thread(store.load_meeting, meeting_id)
+    if not meeting:
+        return {"skipped": True}
+
+    pending = [
+        item for item in meeting.get("parking") or []
+        if item.get("title_pending") and item.get("content")
+    ]
+    if not pending:
+        return {"skipped": True, "reason": "no_pending"}
+
+    cache = get_parking_title_cache()
+    titles: dict[str, str] = {}
+    misses: dict[str, str] = {}  # 内容のハッシュ → 内容（同じ内容は1回だけ生成する）
+    generated = 0
+    for item in pending:
+        key = content_hash(item["content"])
+        title = cache.get(key)
+        if title is not None:
+            titles[item["id"]] = title
+        else:
+            misses[key] = item["content"]
+
+    if misses:
+        logger.info("🤖 保留事項のタイトルを生成中: meeting_id=%s, 件数=%d", meeting_id, len(misses))
+        results = await ai_deviation_service.generate_parking_titles(list(misses.values()))
+        for key, title in zip(misses, results, strict=True):
+            if title:
+                cache.put(key, title)
+                generated += 1
+        for item in pending:
+            title = cache.get(content_hash(item["content"]))
+            if title is not None:
+                titles[item["id"]] = title
+
+    failed = len(pending) - len(titles)
+    final_attempt = job.attempts >= job.max_attempts
+    pending_ids = {item.get("id") for item in pending}
+
+    # 生成中に他のリクエストが保存した変更を消さないよう、最新の会議データを会議ごとのロック内で更新する
+    updated: list[dict[str, Any]] = []
+
+    def apply_titles(meeting: dict[str, Any]) -> None:
+        for item in meeting.get("parking") or []:
+            if not item.get("title_pending"):
+                continue
+            title = titles.get(item.get("id"))
+            if title is not None:
+                item["title"] = title
+            elif not final_attempt or item.get("id") not in pending_ids:
+                # 生成中に追加された項目は、追加時に登録されたジョブで生成する
+                continue
+            # 最後の試行でも生成できなかった項目は仮のタイトルのまま確定する
+            item["title_pending"] = False
+            updated.append(item)
+
+    meeting = await asyncio.to_thread(store.update_meeting, meeting_id, apply_titles)
+    if not meeting:
+        return {"skipped": True}
+    for item in updated:
+        event_bus.publish(meeting_id, EVENT_PARKING, item)
+
+    if failed and not final_attempt:
+        # 生成できたタイトルは反映済み。失敗した項目はリトライで再生成する
+        raise RuntimeError(f"{failed}件の保留事項のタイトルを生成できませんでした")
+    return {"updated": len(updated), "generated": generated, "failed": failed}
+
+
+def register_parking_jobs(queue: JobQueue, store: DataStore) -> None:
+    """保留事項のタイトル生成ジョブのハンドラをジョブキューに登録する
+
+    Args:
+        queue: ジョブキュー
+        store: データストア
+    """
+    queue.register(JOB_PARKING_TITLE, partial(_run_parking_title_job, store))
@@ -0,0 +1,207 @@
+"""ストリーミング文字起こし（途中経過の配信とつなぎ目の重複除去）
+
+WebSocket音声ストリームで発話中のセグメントに対し、一定間隔で直近の窓（window）を
+transcribe_audio_file で文字起こしし、暫定テキスト（transcript_partial イベント）として配信する。
+連続する窓は重なっているため、つなぎ目で重複したテキストを取り除いて暫定テキストを伸ばしていく。
+セグメントが確定すると、セグメント全体の文字起こし結果（確定テキスト）で置き換える。
+
+コスト: 暫定文字起こしは interval_sec ごとに window_sec 秒の音声をASRに送るため、発話時間に対して
+約 window_sec / interval_sec 倍（既定値では 10 / 3 ≒ 3.3倍）の音声が、確定時の文字起こしとは別に課金される。
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import re
+import tempfile
+from collections.abc import Callable
+
+from ..settings import settings
+from .asr import transcribe_audio_file
+from .event_bus import EVENT_TRANSCRIPT_PARTIAL, event_bus
+
+logger = logging.getLogger(__name__)
+
+# 重複として探す最大の文字数（暫定文字起こしの窓の重なり（既定値では7秒）が収まる長さ）
+SEAM_SEARCH_CHARS = 120
+# 重複とみなす最小の一致文字数（短い定型句の偶然の一致でつながないようにする）
+MIN_SEAM_CHARS = 6
+# 次のテキストの先頭で読み飛ばしてよい文字数（窓の先頭で途切れた語の認識結果）
+SEAM_MAX_HEAD_SKIP = 5
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _find_seam(previous_text: str, text: str) -> int | None:
+    """前のテキストの末尾と次のテキストの先頭で重複している箇所を探す
+
+    前のテキストの末尾まで続き、次のテキストの先頭付近（SEAM_MAX_HEAD_SKIP 文字以内）から
+    始まる一致のみを重複とみなす。途中で共通の言い回しが現れるだけの場合はつながない。
+
+    Returns:
+        次のテキストの重複終了位置。重複が無い場合はNone
+    """
+    if not previous_text or not text:
+        return None
+
+    tail = previous_text[-SEAM_SEARCH_CHARS:]
+    best: tuple[int, int] | None = None  # (一致文字数, 次のテキストの一致開始位置)
+    for start in range(min(SEAM_MAX_HEAD_SKIP, len(text) - MIN_SEAM_CHARS) + 1):
+        longest = min(len(tail), len(text) - start)
+        if best is not None and longest <= best[0]:
+            break
+        for size in range(longest, MIN_SEAM_CHARS - 1, -1):
+            if tail.endswith(text[start:start + size]):
+                if best is None or size > best[0]:
+                    best = (size, start)
+                break
+    if best is None:
+        return None
+    size, start = best
+    return start + size
+
+
+def strip_overlap(previous_text: str, text: str) -> str:
+    """次のテキストの先頭から、前のテキストと重複している部分を取り除く
+
+    Args:
+        previous_text: 前のテキスト（確定済み）
+        text: 重なった音声から得た次のテキスト
+
+    Returns:
+        重複部分を除いた次のテキスト
+    """
+    seam = _find_seam(previous_text, text)
+    if seam is None:
+        return text
+    return text[seam:].lstrip()
+
+
+def merge_overlapping(previous_text: str, text: str) -> str:
+    """重なった窓の文字起こし結果をつなぐ
+
+    前のテキストの末尾と新しい窓の先頭の重複を除いてつなぐ。
+    重複が見つからない場合は、発話を失わないよう単純に連結する。
+
+    Args:
+        previous_text: これまでの暫定テキスト
+        text: 新しい窓の文字起こし結果
+
+    Returns:
+        つないだ暫定テキスト
+    """
+    if not previous_text:
+        return text
+    seam = _find_seam(previous_text, text)
+    if seam is None:
+        return f"{previous_text}{text}"
+    return previous_text + text[seam:]
+
+
+def normalize_for_seam(text: str) -> str:
+    """つなぎ目の比較用に空白を除去する（日本語の文字起こしは空白が揺れやすいため）"""
+    return _WHITESPACE.sub("", text)
+
+
+class PartialTranscriber:
+    """発話中のセグメントの暫定テキストを生成・配信する
+
+    同時に実行する暫定文字起こしは1件まで。前の呼び出しが終わっていない場合はスキップする
+    （暫定結果のためにASRの呼び出しが溜まらないようにする）。
+    """
+
+    def __init__(self, meeting_id: str, stream_id: str):
+        """
+        Args:
+            meeting_id: 会議ID
+            stream_id: ストリームID
+        """
+        self.meeting_id = meeting_id
+        self.stream_id = stream_id
+        self.interval_sec = settings.asr_partial_interval_sec
+        self.window_sec = settings.asr_partial_window_sec
+        self.enabled = self.interval_sec > 0
+
+        self._segment_id: str | None = None
+        self._text = ""
+        self._last_end_sec = 0.0
+        self._task: asyncio.Task | None = None
+
+    def maybe_transcribe(
+        self,
+        segment_id: str,
+        end_sec: float,
+        get_window_wav: Callable[[], bytes],
+    ) -> None:
+        """前回から interval_sec 以上経過していれば、直近の窓の暫定文字起こしを開始する
+
+        Args:
+            segment_id: 発話中のセグメントのID
+            end_sec: 窓の終了位置（ストリーム先頭からの秒数）
+            get_window_wav: 直近 window_sec 秒のWAVデータを返す関数（開始する場合のみ呼ぶ）
+        """
+        if not self.enabled:
+            return
+        if segment_id != self._segment_id:
+            self._segment_id = segment_id
+            self._text = ""
+            self._last_end_sec = end_sec
+            return
+        if end_sec - self._last_end_sec < self.interval_sec:
+            return
+        if self._task is not None and not self._task.done():
+            return
+
+        self._last_end_sec = end_sec
+        self._task = asyncio.create_task(self._transcribe_window(segment_id, get_window_wav()))
+
+    async def _transcribe_window(self, segment_id: str, window_wav: bytes) -> None:
+        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_wav:
+            temp_wav.write(window_wav)
+            temp_wav_path = temp_wav.name
+        try:
+            # 窓は毎回異なる音声で再利用されないため、ASRキャッシュを使わない（確定分のキャッシュを追い出さない）
+            result = await transcribe_audio_file(temp_wav_path, use_cache=False)
+        except Exception as e:
+            logger.warning("Partial transcription failed: stream_id=%s: %s", self.stream_id, e)
+            return
+        finally:
+            if os.path.exists(temp_wav_path):
+                os.unlink(temp_wav_path)
+
+        text = normalize_for_seam(result.get("text", ""))
+        # 文字起こし中にセグメントが確定した場合は破棄する
+        if not text or segment_id != self._segment_id:
+            return
+
+        self._text = merge_overlapping(self._text, text)
+        event_bus.publish(
+            self.meeting_id,
+            EVENT_TRANSCRIPT_PARTIAL,
+            {"segment_id": segment_id, "text": self._text, "final": False},
+        )
+
+    def finalize(self, segment_id: str, text: str) -> None:
+        """セグメントの確定テキストを配信し、暫定テキストを破棄する
+
+        Args:
+            segment_id: 確定したセグメントのID
+            text: 確定テキスト（空の場合は暫定表示を消すために空文字を配信する）
+        """
+        if not self.enabled:
+            return
+        if segment_id == self._segment_id:
+            self._segment_id = None
+            self._text = ""
+        event_bus.publish(
+            self.meeting_id,
+            EVENT_TRANSCRIPT_PARTIAL,
+            {"segment_id": segment_id, "text": text, "final": True},
+        )
+
+    async def close(self) -> None:
+        """実行中の暫定文字起こしを中断する"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
@@ -0,0 +1,309 @@
+"""会議要約の生成・保存サービス
+
+会議中の自動要約（MeetingScheduler）で使用するインクリメンタル要約を提供する。
+前回の要約（summary.json）に保存したチェックポイント以降の文字起こしだけを要約し、
+【前回の要約】コンテキストとして前回の結果を渡すことで、会議全体の要約に畳み込む。
+
+要約APIの非同期生成・会議終了時の最終要約は、ジョブキュー（job_queue）のジョブとして実行する。
+"""
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timezone
+from functools import partial
+from typing import Any
+
+from ..meeting_summarizer.schema import MeetingSummaryOutput
+from ..meeting_summarizer.service import summarize_meeting
+from ..schemas.job import Job
+from ..storage import DataStore
+from .event_bus import EVENT_SUMMARY, event_bus
+from .job_queue import JobQueue
+from .summary_window import SummaryWindow, select_delta_window
+from .transcript_index import get_transcript_index
+
+logger = logging.getLogger(__name__)
+
+# ジョブ種別
+JOB_SUMMARY = "summary"  # 要約APIからの非同期要約生成（payload.text を要約）
+JOB_FINAL_SUMMARY = "final_summary"  # 会議終了時の最終要約（全文字起こしを要約）
+
+# ジョブの優先度（小さいほど先に実行）
+FINAL_SUMMARY_PRIORITY = 10
+SUMMARY_PRIORITY = 50
+
+# 要約APIの入力の上限文字数（超える場合は直近の文字起こし + 前回の要約を使う）
+MAX_INPUT_CHARS = 30000
+
+# インクリメンタル要約時に、前回の要約へ新しい会話内容を統合させる指示
+FOLD_INSTRUCTION = (
+    "【出力方針】\n"
+    "前回の要約に新しい会話内容を統合し、会議全体の最新の要約として出力してください。"
+    "前回の要約に含まれる内容のうち、新しい会話内容で変更されていないものも省略しないでください。"
+)
+
+
+def build_previous_summary_context(previous_summary: dict[str, Any] | None) -> str | None:
+    """前回の要約からプロンプト用のコンテキストを構築する
+
+    SYSTEM_PROMPTで定義された【前回の要約】【前回の決定事項】【前回の未決事項】の
+    セクション形式で出力する。
+
+    Args:
+        previous_summary: summary.jsonの内容
+
+    Returns:
+        コンテキスト文字列（前回の要約が空の場合はNone）
+    """
+    if not previous_summary:
+        return None
+
+    prev_summary_text = previous_summary.get("summary", "")
+    prev_decisions = previous_summary.get("decisions", [])
+    prev_undecided = previous_summary.get("undecided", [])
+    prev_actions = previous_summary.get("actions", [])
+
+    context_parts = []
+    if prev_summary_text:
+        context_parts.append(f"【前回の要約】\n{prev_summary_text}")
+    if prev_decisions:
+        context_parts.append("【前回の決定事項】\n" + "\n".join(f"- {d}" for d in prev_decisions))
+    if prev_undecided:
+        context_parts.append("【前回の未決事項】\n" + "\n".join(f"- {u}" for u in prev_undecided))
+    if prev_actions:
+        action_lines = [
+            f"- {a.get('title', '')}（担当: {a.get('owner') or '未定'}, 期限: {a.get('due') or '未定'}）"
+            for a in prev_actions
+            if isinstance(a, dict)
+        ]
+        if action_lines:
+            context_parts.append("【前回のアクション】\n" + "\n".join(action_lines))
+
+    if not context_parts:
+        return None
+    return "\n\n".join(context_parts)
+
+
+def compose_summary_input(text: str, previous_context: str | None, fold: bool = False) -> str:
+    """要約APIへの入力テキストを組み立てる
+
+    Args:
+        text: 新しい文字起こしテキスト
+        previous_context: build_previous_summary_context の結果
+        fold: Trueの場合、前回の要約に統合した全体要約を出力させる指示を付加する
+
+    Returns:
+        要約APIへの入力テキスト
+    """
+    if not previous_context:
+        return text
+
+    parts = [previous_context, f"【新しい会話内容】\n{text}"]
+    if fold:
+        parts.append(FOLD_INSTRUCTION)
+    return "\n\n".join(parts)
+
+
+def compose_window_input(window: SummaryWindow) -> tuple[str, bool]:
+    """要約APIの時間窓から要約APIへの入力テキストを組み立てる
+
+    時間窓の文字起こしが MAX_INPUT_CHARS を超える場合のみ、直近 MAX_INPUT_CHARS 文字に制限し、
+    前回の要約をコンテキストとして付加する（超えない場合は文脈の完全性のため全体をそのまま使う）。
+
+    Args:
+        window: select_summary_window の結果
+
+    Returns:
+        (入力テキスト, 文字数制限で切り詰めたか)
+    """
+    text = window.text
+    if len(text) <= MAX_INPUT_CHARS:
+        logger.info("Using all new transcripts (total chars: %d, within limit).", len(text))
+        return text, False
+
+    logger.info(
+        "New transcripts exceed %d chars (%d). Using recent %d chars + previous summary.",
+        MAX_INPUT_CHARS, len(text), MAX_INPUT_CHARS,
+    )
+    previous_context = build_previous_summary_context(window.previous_summary)
+    return compose_summary_input(text[-MAX_INPUT_CHARS:], previous_context), True
+
+
+def build_summary_data(
+    result: MeetingSummaryOutput,
+    checkpoint: dict[str, Any],
+    audio_end_sec: float | None = None,
+) -> dict[str, Any]:
+    """要約結果をsummary.jsonの保存形式に変換する
+
+    どの経路（要約API・ジョブ・スケジューラー）で保存した要約にもチェックポイントを記録し、
+    次回の自動要約が要約済みの文字起こしを再要約しないようにする。
+
+    Args:
+        result: 要約結果
+        checkpoint: インクリメンタル要約用のチェックポイント（make_checkpoint の結果）
+        audio_end_sec: 要約に含めた文字起こしの最後の音声時刻（次回の時間窓の起点）
+
+    Returns:
+        summary.jsonに保存する辞書
+    """
+    summary_data: dict[str, Any] = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "summary": result.summary,
+        "decisions": result.decisions,
+        "undecided": result.undecided,
+        "actions": [action.model_dump() for action in result.actions],
+        "checkpoint": checkpoint,
+    }
+    if audio_end_sec is not None:
+        summary_data["audio_end_sec"] = round(audio_end_sec, 3)
+    return summary_data
+
+
+def save_summary(store: DataStore, meeting_id: str, summary_data: dict[str, Any]) -> None:
+    """要約を保存し、購読中のクライアントに配信する
+
+    Args:
+        store: データストア
+        meeting_id: 会議ID
+        summary_data: build_summary_data の結果
+    """
+    store.save_summary(meeting_id, summary_data)
+    event_bus.publish(meeting_id, EVENT_SUMMARY, summary_data)
+
+
+def make_checkpoint(transcripts: list[dict[str, Any]]) -> dict[str, Any]:
+    """要約済みの文字起こし位置を表すチェックポイントを作成する
+
+    Args:
+        transcripts: 要約に含めた文字起こしデータ全体
+
+    Returns:
+        チェックポイント（要約済み件数と最後の文字起こしID）
+    """
+    last_id = transcripts[-1].get("id") if transcripts else None
+    return {"transcript_count": len(transcripts), "last_transcript_id": last_id}
+
+
+def generate_incremental_summary(store: DataStore, meeting_id: str) -> dict[str, Any] | None:
+    """前回の要約以降の差分だけを要約し、前回の要約に畳み込んで保存する
+
+    Args:
+        store: データストア
+        meeting_id: 会議ID
+
+    Returns:
+        保存した要約データ（差分が無い場合はNone）
+    """
+    window = select_delta_window(store, meeting_id)
+    if not window.index.transcripts:
+        logger.warning("No transcripts found for meeting %s", meeting_id)
+        return None
+
+    delta = window.transcripts
+    delta_text = window.text
+    if not delta_text.strip():
+        logger.info("No new transcripts since last summary for meeting %s", meeting_id)
+        return None
+
+    previous_context = build_previous_summary_context(window.previous_summary) if window.has_previous else None
+    input_text = compose_summary_input(delta_text, previous_context, fold=True)
+
+    logger.info(
+        "Generating incremental summary for meeting %s (delta_entries=%d, delta_chars=%d, folded=%s)",
+        meeting_id,
+        len(delta),
+        len(delta_text),
+        previous_context is not None,
+    )
+    result = summarize_meeting(input_text, verbose=True)
+
+    summary_data = build_summary_data(
+        result,
+        checkpoint=make_checkpoint(window.index.transcripts),
+        audio_end_sec=window.index.end_sec,
+    )
+    save_summary(store, meeting_id, summary_data)
+    return summary_data
+
+
+def measure_delta(store: DataStore, meeting_id: str) -> tuple[int, int]:
+    """前回の要約以降に追加された文字起こしの量を計測する
+
+    Args:
+        store: データストア
+        meeting_id: 会議ID
+
+    Returns:
+        (差分の文字数, 差分の文字起こし件数)
+    """
+    delta = select_delta_window(store, meeting_id).transcripts
+    delta_chars = sum(len(t.get("text", "").strip()) for t in delta)
+    delta_chunks = sum(1 for t in delta if t.get("text", "").strip())
+    return delta_chars, delta_chunks
+
+
+def generate_final_summary(store: DataStore, meeting_id: str) -> dict[str, Any] | None:
+    """全文字起こしから最終要約を生成して保存する
+
+    Args:
+        store: データストア
+        meeting_id: 会議ID
+
+    Returns:
+        保存した要約データ（文字起こしが空の場合はNone）
+    """
+    index = get_transcript_index(store, meeting_id)
+    transcripts = index.transcripts
+    all_text = "\n".join(t.get("text", "") for t in transcripts)
+    if not all_text.strip():
+        logger.info("No transcripts for final summary of meeting %s", meeting_id)
+        return None
+
+    logger.info("Generating final summary for meeting %s", meeting_id)
+    result = summarize_meeting(all_text, verbose=True)
+
+    summary_data = build_summary_data(
+        result,
+        checkpoint=make_checkpoint(transcripts),
+        audio_end_sec=index.end_sec,
+    )
+    save_summary(store, meeting_id, summary_data)
+    logger.info("Final summary saved for meeting %s", meeting_id)
+    return summary_data
+
+
+def _run_summary_job(store: DataStore, job: Job) -> dict[str, Any]:
+    """JOB_SUMMARY のハンドラ: 登録時に組み立てた入力テキストを要約して保存する"""
+    text = job.payload.get("text", "")
+    if not text.strip():
+        return {"skipped": True}
+
+    result = summarize_meeting(text, verbose=True)
+    summary_data = build_summary_data(
+        result,
+        # 旧形式のペイロード（チェックポイント無し）は要約済み件数0として記録し、次回は全件を要約する
+        checkpoint=job.payload.get("checkpoint") or make_checkpoint([]),
+        audio_end_sec=job.payload.get("audio_end_sec"),
+    )
+    save_summary(store, job.meeting_id, summary_data)
+    return {"generated_at": summary_data["generated_at"]}
+
+
+def _run_final_summary_job(store: DataStore, job: Job) -> dict[str, Any]:
+    """JOB_FINAL_SUMMARY のハンドラ"""
+    summary_data = generate_final_summary(store, job.meeting_id)
+    if summary_data is None:
+        return {"skipped": True}
+    return {"generated_at": summary_data["generated_at"]}
+
+
+def register_summary_jobs(queue: JobQueue, store: DataStore) -> None:
+    """要約関連のジョブハンドラをジョブキューに登録する
+
+    Args:
+        queue: ジョブキュー
+        store: データストア
+    """
+    queue.register(JOB_SUMMARY, partial(_run_summary_job, store))
+    queue.register(JOB_FINAL_SUMMARY, partial(_run_final_summary_job, store))
@@ -0,0 +1,132 @@
+"""要約に含める文字起こしの時間窓の選択
+
+要約API（POST /summary/generate, /summary/generate_async）と会議中の自動要約（スケジューラー）が
+共通で使う。文字起こしは音声時刻インデックス（transcript_index）から取り出すため、
+transcripts.json が更新されていなければ再読み込みもタイムスタンプの再解析もしない。
+
+- 要約API: 前回の要約の3分前以降（文脈の継続性のため）を二分探索で抽出する。
+  前回の要約の audio_end_sec（音声時刻）を起点とし、旧形式の要約では generated_at（記録時刻）を起点とする
+- 自動要約: 前回の要約のチェックポイント（要約済み件数）以降の差分を取り出す
+"""
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import Any
+
+from ..storage import DataStore
+from .transcript_index import TranscriptTimeIndex, get_transcript_index, parse_timestamp
+
+logger = logging.getLogger(__name__)
+
+# 前回の要約生成時点より前に遡って含める時間（文脈の継続性のため）
+CONTEXT_BUFFER_SEC = 3 * 60
+
+
+@dataclass
+class SummaryWindow:
+    """要約に含める文字起こしの時間窓"""
+
+    transcripts: list[dict[str, Any]]  # 時間窓の文字起こし
+    index: TranscriptTimeIndex  # 会議全体の音声時刻インデックス
+    previous_summary: dict[str, Any] | None = None
+    has_previous: bool = False  # 前回の要約を起点に抽出したか
+
+    @property
+    def text(self) -> str:
+        """時間窓の文字起こしテキスト（改行区切り）"""
+        return "\n".join(t.get("text", "") for t in self.transcripts)
+
+
+def select_summary_window(store: DataStore, meeting_id: str) -> SummaryWindow:
+    """前回の要約の3分前以降の文字起こしを抽出する（前回の要約が無い場合は全件）
+
+    Args:
+        store: データストア
+        meeting_id: 会議ID
+
+    Returns:
+        要約に含める時間窓
+    """
+    index = get_transcript_index(store, meeting_id)
+    previous_summary = store.load_summary(meeting_id)
+    window = SummaryWindow(index.transcripts, index, previous_summary)
+    if not previous_summary:
+        return window
+
+    previous_audio_end_sec = previous_summary.get("audio_end_sec")
+    if previous_audio_end_sec is not None:
+        # 音声時刻のインデックスで抽出する（ASRの処理遅延や完了順に影響されない）
+        context_start_sec = max(0.0, previous_audio_end_sec - CONTEXT_BUFFER_SEC)
+        logger.info(
+            "Extracting transcripts from audio time %.1fs (3 minutes before previous summary)",
+            context_start_sec,
+        )
+        window.transcripts = index.window(context_start_sec)
+        window.has_previous = True
+        return window
+
+    previous_generated_at = parse_timestamp(previous_summary.get("generated_at"))
+    if previous_generated_at is None:
+        if "generated_at" in previous_summary:
+            logger.warning("Failed to parse previous summary generated_at: %s", previous_summary["generated_at"])
+        return window
+
+    # 旧形式の要約: 前回生成時点の3分前以降に記録された文字起こし
+    context_start = previous_generated_at - CONTEXT_BUFFER_SEC
+    logger.info(
+        "Extracting transcripts recorded after %s (3 minutes before previous summary)",
+        previous_summary["generated_at"],
+    )
+    window.transcripts = index.since_timestamp(context_start)
+    window.has_previous = True
+    return window
+
+
+def split_delta(
+    transcripts: list[dict[str, Any]],
+    previous_summary: dict[str, Any] | None,
+) -> tuple[list[dict[str, Any]], bool]:
+    """前回のチェックポイント以降の文字起こし（差分）を取り出す
+
+    transcripts.jsonは追記のみで更新されるため、チェックポイントの件数位置以降を差分とする。
+    チェックポイントが無い、または最後の文字起こしIDが一致しない場合は全件を差分とする。
+
+    Args:
+        transcripts: 文字起こしデータ全体
+        previous_summary: summary.jsonの内容
+
+    Returns:
+        (差分の文字起こし, 前回の要約に畳み込めるか)
+    """
+    checkpoint = (previous_summary or {}).get("checkpoint")
+    if not checkpoint:
+        return transcripts, False
+
+    count = checkpoint.get("transcript_count", 0)
+    if not isinstance(count, int) or count <= 0 or count > len(transcripts):
+        logger.warning("Summary checkpoint is out of range (count=%s), re-summarizing all", count)
+        return transcripts, False
+
+    last_id = checkpoint.get("last_transcript_id")
+    if last_id is not None and transcripts[count - 1].get("id") != last_id:
+        logger.warning("Summary checkpoint id mismatch (id=%s), re-summarizing all", last_id)
+        return transcripts, False
+
+    return transcripts[count:], True
+
+
+def select_delta_window(store: DataStore, meeting_id: str) -> SummaryWindow:
+    """前回の要約のチェックポイント以降の文字起こし（差分）を取り出す
+
+    Args:
+        store: データストア
+        meeting_id: 会議ID
+
+    Returns:
+        差分の時間窓（has_previous は前回の要約に畳み込めるか）
+    """
+    index = get_transcript_index(store, meeting_id)
+    previous_summary = store.load_summary(meeting_id)
+    delta, can_fold = split_delta(index.transcripts, previous_summary)
+    return SummaryWindow(delta, index, previous_summary, can_fold)
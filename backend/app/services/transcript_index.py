@@ -0,0 +1,150 @@
+"""文字起こしの音声時刻インデックス
+
+transcripts.json は文字起こしが完了した順（ASRの処理順）に追記されるため、発話順とは限らない。
+各エントリの start_sec（会議開始からの音声時刻）でソートしたインデックスを作り、
+時間窓の抽出を二分探索で行う。インデックスは transcripts.json が更新されるまで再利用する。
+
+start_sec を持たない旧データは elapsed_time（HH:MM:SS）を音声時刻の代わりに使う。
+
+audio_end_sec を持たない旧形式の要約の時間窓（記録時刻 timestamp による抽出）のため、
+記録時刻も作成時に1回だけエポック秒に変換し、ソートした配列を二分探索する。
+"""
+from __future__ import annotations
+
+import threading
+from bisect import bisect_left
+from datetime import datetime
+from typing import Any
+
+from ..storage import DataStore
+
+
+def _parse_elapsed(elapsed: str | None) -> float:
+    """HH:MM:SS形式の経過時間を秒数に変換する（不正な場合は0）"""
+    if not elapsed:
+        return 0.0
+    try:
+        hours, minutes, seconds = (int(part) for part in elapsed.split(":"))
+    except (ValueError, AttributeError):
+        return 0.0
+    return float(hours * 3600 + minutes * 60 + seconds)
+
+
+def parse_timestamp(value: str | None) -> float | None:
+    """ISO 8601形式の記録時刻をエポック秒に変換する（無い・不正な場合はNone）"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except (ValueError, AttributeError, TypeError):
+        return None
+
+
+def transcript_start_sec(entry: dict[str, Any]) -> float:
+    """エントリの開始位置（音声時刻）を返す"""
+    start_sec = entry.get("start_sec")
+    if start_sec is not None:
+        return float(start_sec)
+    return _parse_elapsed(entry.get("elapsed_time"))
+
+
+def transcript_end_sec(entry: dict[str, Any]) -> float:
+    """エントリの終了位置（音声時刻）を返す"""
+    end_sec = entry.get("end_sec")
+    if end_sec is not None:
+        return float(end_sec)
+    return transcript_start_sec(entry)
+
+
+class TranscriptTimeIndex:
+    """音声時刻でソートした文字起こしのインデックス"""
+
+    def __init__(self, transcripts: list[dict[str, Any]]):
+        """
+        Args:
+            transcripts: transcripts.json の内容（追記順）
+        """
+        self.transcripts = transcripts
+        # 同じ開始位置のエントリは追記順を保つ（安定ソート）
+        self.entries = sorted(transcripts, key=transcript_start_sec)
+        self._starts = [transcript_start_sec(t) for t in self.entries]
+        self.end_sec = max((transcript_end_sec(t) for t in self.entries), default=0.0)
+
+        # 記録時刻（エポック秒）でソートした (時刻, 追記位置)。記録時刻が無い・不正なエントリは別に持つ
+        stamped: list[tuple[float, int]] = []
+        self._undated: list[int] = []
+        for position, entry in enumerate(transcripts):
+            stamp = parse_timestamp(entry.get("timestamp"))
+            if stamp is None:
+                self._undated.append(position)
+            else:
+                stamped.append((stamp, position))
+        stamped.sort()
+        self._stamps = [stamp for stamp, _ in stamped]
+        self._stamp_positions = [position for _, position in stamped]
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def window(self, start_sec: float, end_sec: float | None = None) -> list[dict[str, Any]]:
+        """開始位置が [start_sec, end_sec) に入るエントリを発話順で返す
+
+        Args:
+            start_sec: 窓の開始位置（秒）
+            end_sec: 窓の終了位置（秒、Noneの場合は最後まで）
+
+        Returns:
+            文字起こしエントリのリスト（音声時刻順）
+        """
+        lo = bisect_left(self._starts, start_sec)
+        hi = len(self.entries) if end_sec is None else bisect_left(self._starts, end_sec, lo)
+        return self.entries[lo:hi]
+
+    def since_timestamp(self, epoch: float) -> list[dict[str, Any]]:
+        """記録時刻が epoch 以降のエントリを追記順で返す
+
+        記録時刻が無い・不正なエントリは常に含める（安全のため）。
+
+        Args:
+            epoch: 記録時刻の下限（エポック秒）
+
+        Returns:
+            文字起こしエントリのリスト（追記順）
+        """
+        lo = bisect_left(self._stamps, epoch)
+        # 記録時刻は通常追記順に並んでいるため、このソートはほぼ線形時間（窓の件数分）で終わる
+        positions = sorted(self._stamp_positions[lo:] + self._undated)
+        return [self.transcripts[i] for i in positions]
+
+    def latest(self, duration_sec: float) -> list[dict[str, Any]]:
+        """最後の発話から duration_sec 秒以内に始まったエントリを返す"""
+        return self.window(max(0.0, self.end_sec - duration_sec))
+
+
+_cache: dict[str, tuple[tuple, TranscriptTimeIndex]] = {}
+_cache_lock = threading.Lock()
+
+
+def get_transcript_index(store: DataStore, meeting_id: str) -> TranscriptTimeIndex:
+    """会議の音声時刻インデックスを取得する（transcripts.json が更新されていなければ再利用）
+
+    Args:
+        store: データストア
+        meeting_id: 会議ID
+
+    Returns:
+        音声時刻インデックス
+    """
+    version = store.transcripts_version(meeting_id)
+    if version is None:
+        return TranscriptTimeIndex([])
+
+    with _cache_lock:
+        cached = _cache.get(meeting_id)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+    index = TranscriptTimeIndex(store.load_transcripts(meeting_id))
+    with _cache_lock:
+        _cache[meeting_id] = (version, index)
+    return index
@@ -0,0 +1,282 @@
+"""文字起こし結果の記録サービス
+
+文字起こし結果を transcripts.json に追記し、後続処理（自動要約スケジューラーへの通知、
+SSE購読者への配信）を起動する。HTTPアップロードとWebSocketストリームの両方から使用する。
+
+アップロードを非同期で受け付けた場合は、保存済みのチャンクをジョブキューの
+文字起こしジョブ（専用ワーカーで同時実行数を制限）で文字起こしする。
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime, timezone
+from functools import partial
+from typing import Any
+from uuid import uuid4
+
+from ..schemas.job import Job
+from ..settings import settings
+from ..storage import DataStore
+from .asr import transcribe_audio_file
+from .deviation_pipeline import enqueue_deviation_check
+from .event_bus import EVENT_TRANSCRIPT, event_bus
+from .job_queue import JobQueue, get_job_queue
+from .meeting_scheduler import get_scheduler
+
+logger = logging.getLogger(__name__)
+
+# ジョブ種別: アップロード済みチャンクの文字起こし（payload.chunk_id）
+JOB_TRANSCRIBE_CHUNK = "transcribe_chunk"
+# 文字起こしは発話の遅延に直結するため、要約より先に実行する
+TRANSCRIBE_CHUNK_PRIORITY = 20
+
+
+def elapsed_seconds(meeting_start_iso: str | None, current_iso: str) -> float | None:
+    """会議開始時刻からの経過秒数を計算する
+
+    Args:
+        meeting_start_iso: 会議開始時刻（ISO 8601形式）
+        current_iso: 現在のタイムスタンプ（ISO 8601形式）
+
+    Returns:
+        経過秒数（負の場合は0）。会議開始時刻が無い、または不正な場合はNone
+    """
+    if not meeting_start_iso:
+        return None
+
+    try:
+        start_time = datetime.fromisoformat(meeting_start_iso.replace("Z", "+00:00"))
+        current_time = datetime.fromisoformat(current_iso.replace("Z", "+00:00"))
+    except (ValueError, AttributeError) as e:
+        logger.warning("Failed to calculate elapsed time: %s", e)
+        return None
+    return max(0.0, (current_time - start_time).total_seconds())
+
+
+def format_elapsed(seconds: float) -> str:
+    """経過秒数をHH:MM:SS形式に変換する"""
+    total_seconds = max(0, int(seconds))
+    hours = total_seconds // 3600
+    minutes = (total_seconds % 3600) // 60
+    secs = total_seconds % 60
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}"
+
+
+def calculate_elapsed_time(meeting_start_iso: str | None, current_iso: str) -> str:
+    """会議開始時刻からの経過時間を計算してHH:MM:SS形式で返す
+
+    Args:
+        meeting_start_iso: 会議開始時刻（ISO 8601形式）、Noneの場合は00:00:00を返す
+        current_iso: 現在のタイムスタンプ（ISO 8601形式）
+
+    Returns:
+        HH:MM:SS形式の経過時間
+    """
+    seconds = elapsed_seconds(meeting_start_iso, current_iso)
+    if seconds is None:
+        return "00:00:00"
+    return format_elapsed(seconds)
+
+
+def build_transcript_entry(
+    meeting: dict[str, Any],
+    text: str,
+    language: str = "ja",
+    start_sec: float | None = None,
+    end_sec: float | None = None,
+) -> dict[str, Any]:
+    """文字起こし結果に ID・タイムスタンプ・経過時間を付けたエントリを作成する
+
+    start_sec/end_sec（会議開始からの音声時刻）が分かる場合は、経過時間も音声時刻から求める。
+    ASRの待ち時間や処理遅延に関係なく、発話した時点のタイムラインになる。
+
+    Args:
+        meeting: 会議メタデータ
+        text: 文字起こしテキスト
+        language: 言語
+        start_sec: 発話の開始位置（会議開始からの秒数）
+        end_sec: 発話の終了位置（会議開始からの秒数）
+
+    Returns:
+        transcripts.json に追記するエントリ
+    """
+    current_timestamp = datetime.now(timezone.utc).isoformat()
+    entry = {
+        "id": str(uuid4()),
+        "timestamp": current_timestamp,
+        "text": text,
+        "language": language,
+        "elapsed_time": calculate_elapsed_time(meeting.get("started_at"), current_timestamp),
+    }
+    if start_sec is not None:
+        entry["start_sec"] = round(start_sec, 3)
+        entry["end_sec"] = round(end_sec if end_sec is not None else start_sec, 3)
+        entry["elapsed_time"] = format_elapsed(start_sec)
+    return entry
+
+
+def align_chunk_result(
+    store: DataStore,
+    meeting_id: str,
+    meeting: dict[str, Any],
+    chunk: dict[str, Any],
+    result: dict[str, Any],
+) -> tuple[float | None, float | None]:
+    """アップロードされたチャンクの文字起こし結果を音声時刻に対応付ける
+
+    チャンクの開始位置（マニフェストのオフセット）にASRのセグメント時刻を足して、
+    発話の開始・終了位置を求める。
+
+    Args:
+        store: データストア
+        meeting_id: 会議ID
+        meeting: 会議メタデータ
+        chunk: マニフェストのチャンクのエントリ
+        result: 文字起こし結果（duration, segments）
+
+    Returns:
+        (開始位置, 終了位置)。音声の長さが分からない場合は (None, None)
+    """
+    duration = result.get("duration")
+    if not duration:
+        return None, None
+
+    # 直前のチャンクの位置が分からない場合は、受信時刻をチャンクの終了位置とみなす
+    received_sec = elapsed_seconds(meeting.get("started_at"), chunk["received_at"])
+    fallback_offset = max(0.0, received_sec - duration) if received_sec is not None else 0.0
+    offset = store.set_audio_chunk_offset(meeting_id, chunk["chunk_id"], duration, fallback_offset)
+
+    segments = result.get("segments") or []
+    if segments:
+        return offset + segments[0].get("start", 0.0), offset + segments[-1].get("end", duration)
+    return offset, offset + duration
+
+
+def record_transcript(store: DataStore, meeting_id: str, entry: dict[str, Any]) -> None:
+    """文字起こしエントリを保存し、後続処理に通知する（脱線検知ジョブの登録を含む）
+
+    Args:
+        store: データストア
+        meeting_id: 会議ID
+        entry: 文字起こしエントリ
+    """
+    store.append_transcript(meeting_id, entry)
+    get_scheduler().notify_new_transcript(meeting_id)
+    event_bus.publish(meeting_id, EVENT_TRANSCRIPT, entry)
+    if settings.deviation_auto_enabled and entry.get("id"):
+        enqueue_deviation_check(get_job_queue(), meeting_id, entry["id"])
+
+
+async def transcribe_chunk(
+    store: DataStore,
+    meeting_id: str,
+    meeting: dict[str, Any],
+    chunk: dict[str, Any],
+) -> dict[str, Any]:
+    """保存済みのチャンクを文字起こしし、結果を記録する
+
+    記録後、チャンクのマニフェストを done にして結果を保存する（同じ冪等キーの再送に返すため）。
+
+    Args:
+        store: データストア
+        meeting_id: 会議ID
+        meeting: 会議メタデータ
+        chunk: マニフェストのチャンクのエントリ
+
+    Returns:
+        記録した文字起こしエントリ
+    """
+    # 音声文字起こし実行（保存済みのチャンクファイルをそのまま使う）
+    result = await transcribe_audio_file(store.get_audio_chunk_path(meeting_id, chunk))
+
+    # チャンクの位置とASRのセグメント時刻から、発話の音声時刻を求める
+    start_sec, end_sec = await asyncio.to_thread(
+        align_chunk_result, store, meeting_id, meeting, chunk, result
+    )
+
+    # 文字起こし結果にID・タイムスタンプ・経過時間を追加
+    entry = build_transcript_entry(
+        meeting,
+        result.get("text", ""),
+        result.get("language", "ja"),
+        start_sec=start_sec,
+        end_sec=end_sec,
+    )
+
+    await asyncio.to_thread(record_transcript, store, meeting_id, entry)
+    await asyncio.to_thread(
+        store.update_audio_chunk,
+        meeting_id,
+        chunk["chunk_id"],
+        status="done",
+        transcript_id=entry["id"],
+        result=entry,
+    )
+    await asyncio.to_thread(_touch_meeting, store, meeting_id)
+    return entry
+
+
+def _touch_meeting(store: DataStore, meeting_id: str) -> None:
+    """会議メタデータの更新日時を更新する"""
+    # 注意: parkingフィールドなどの既存データを保護するため、最新データを読み込んでロック内で更新
+    store.update_meeting(
+        meeting_id, lambda meeting: meeting.update(updated_at=datetime.now(timezone.utc).isoformat())
+    )
+
+
+def enqueue_chunk_transcription(queue: JobQueue, meeting_id: str, chunk_id: str) -> Job:
+    """保存済みチャンクの文字起こしジョブを登録する
+
+    Args:
+        queue: ジョブキュー
+        meeting_id: 会議ID
+        chunk_id: チャンクID
+
+    Returns:
+        登録したジョブ
+    """
+    return queue.enqueue(
+        JOB_TRANSCRIBE_CHUNK,
+        meeting_id,
+        payload={"chunk_id": chunk_id},
+        priority=TRANSCRIBE_CHUNK_PRIORITY,
+        # チャンクごとに1ジョブ（会議単位でまとめない）
+        dedup_key=f"{meeting_id}:{JOB_TRANSCRIBE_CHUNK}:{chunk_id}",
+    )
+
+
+async def _run_transcribe_chunk_job(store: DataStore, job: Job) -> dict[str, Any]:
+    """JOB_TRANSCRIBE_CHUNK のハンドラ"""
+    meeting_id = job.meeting_id
+    chunk_id = job.payload["chunk_id"]
+    meeting = await asyncio.to_thread(store.load_meeting, meeting_id)
+    chunk = await asyncio.to_thread(store.find_audio_chunk_by_id, meeting_id, chunk_id)
+    if not meeting or chunk is None:
+        logger.warning("Chunk to transcribe not found: meeting_id=%s, chunk_id=%s", meeting_id, chunk_id)
+        return {"skipped": True}
+    if chunk.get("status") == "done":
+        return {"transcript_id": chunk.get("transcript_id")}
+
+    await asyncio.to_thread(store.update_audio_chunk, meeting_id, chunk_id, status="processing")
+    try:
+        entry = await transcribe_chunk(store, meeting_id, meeting, chunk)
+    except Exception as e:
+        # リトライが残っている間は queued に戻し、最後の試行で失敗した場合のみ failed にする
+        status = "failed" if job.attempts >= job.max_attempts else "queued"
+        await asyncio.to_thread(
+            store.update_audio_chunk, meeting_id, chunk_id, status=status, error=str(e)
+        )
+        raise
+    return {"transcript_id": entry["id"]}
+
+
+def register_transcription_jobs(queue: JobQueue, store: DataStore) -> None:
+    """文字起こしジョブのハンドラを登録し、専用ワーカーで実行するよう設定する
+
+    Args:
+        queue: ジョブキュー
+        store: データストア
+    """
+    queue.register(JOB_TRANSCRIBE_CHUNK, partial(_run_transcribe_chunk_job, store))
+    queue.dedicate(JOB_TRANSCRIBE_CHUNK, settings.asr_workers)
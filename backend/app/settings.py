@@ -32,6 +32,13 @@ class Settings(BaseSettings):
     asr_provider: str = "azure_whisper"  # Azure OpenAI Whisper APIを使用
     asr_language: str = "ja"
     asr_temperature: float = 0.0
+    asr_cache_enabled: bool = True  # 同じ音声の文字起こし結果をキャッシュして再利用する
+    asr_cache_dir: str = ""  # キャッシュの保存先（空の場合は {data_dir}/asr_cache）
+    asr_cache_max_mb: int = 200  # キャッシュの最大サイズ（超過分は古いものから削除）
+    asr_hallucination_phrases_file: str = ""  # 幻聴フレーズの追加リスト（1行1フレーズ、"re:" で始まる行は正規表現）
+    asr_async_upload: bool = False  # 音声アップロードを受け付けた時点で応答し、文字起こしはジョブで実行する
+    asr_workers: int = 2  # 文字起こしジョブを同時に実行する専用ワーカー数
+    asr_idempotency_lease_sec: int = 300  # 処理中のまま応答が無い冪等キーを、再送で引き継げるようになるまでの秒数
     
     # Azure OpenAI Whisper設定
     azure_whisper_endpoint: str = ""
@@ -46,6 +53,79 @@ class Settings(BaseSettings):
     azure_openai_api_version_chat: str = "2024-12-01-preview"
     azure_openai_deployment: str = "gpt-5-mini"
     default_timezone: str = "Asia/Tokyo"
+    
+    # 会議要約の並列処理設定
+    summary_max_concurrency: int = 4  # チャンク要約・統合の最大並列呼び出し数
+    summary_reduce_fan_in: int = 4  # 1回の統合呼び出しでまとめる部分要約の数
+    summary_incremental: bool = True  # 自動要約で前回の要約以降の差分のみを要約する
+    summary_chunk_max_tokens: int = 8000  # 長文を分割する1チャンクあたりの最大トークン数
+    summary_chunk_overlap_tokens: int = 0  # 前のチャンクの末尾から次のチャンクに重ねるトークン数（行単位）
+    summary_tokenizer_encoding: str = "o200k_base"  # トークン数を数える tiktoken のエンコーディング（空の場合は概算）
+    summary_cache_enabled: bool = True  # 同じテキストの要約結果をキャッシュして再利用する
+    summary_cache_dir: str = ""  # キャッシュの保存先（空の場合は {data_dir}/summary_cache）
+    summary_cache_max_entries: int = 256  # キャッシュする要約の最大件数（超過分は古いものから削除）
+    
+    # 脱線検知のローカル判定・結果キャッシュ（文字n-gram TF-IDF で判定できる場合や判定済みのチャンクはLLMを呼ばない）
+    deviation_local_enabled: bool = True
+    deviation_local_on_track_score: float = 0.15  # 関連度がこれ以上なら「アジェンダに沿っている」と判定
+    deviation_local_off_track_score: float = 0.02  # コンテキストを含めた関連度がこれ以下なら「脱線」と判定（負の値で無効）
+    deviation_local_embedding_on_track_score: float = 0.35  # 埋め込みベクトルの類似度がこれ以上なら「アジェンダに沿っている」と判定（1より大きい値で無効）
+    deviation_local_embedding_off_track_score: float = 0.1  # 埋め込みベクトルの類似度もこれ以下の場合のみ「脱線」と判定（1以上で埋め込みを判定に使わない）
+    deviation_local_min_chars: int = 20  # ローカルで脱線と判定する最新チャンクの最小文字数
+    deviation_cache_max_entries: int = 512  # 脱線検知結果（最新チャンクごと）をキャッシュする最大件数
+    deviation_auto_enabled: bool = True  # 文字起こしの記録ごとにバックグラウンドで脱線検知を実行する
+    deviation_batch_enabled: bool = True  # 複数会議の脱線検知（LLM）をまとめて1回のAPI呼び出しで行う
+    deviation_batch_window_ms: int = 200  # まとめる判定を待つ時間（ミリ秒）
+    deviation_batch_max_size: int = 8  # 1回のAPI呼び出しでまとめる判定の最大件数
+    deviation_max_completion_tokens: int = 1000  # 判定1件あたりの出力トークン数の上限（reasoningモデルでは推論トークンを含む）
+    deviation_batch_max_completion_tokens: int = 8000  # まとめた判定の出力トークン数の上限
+    deviation_parse_retries: int = 1  # レスポンスをパースできない場合の再試行回数（上限を2倍にして再試行）
+    deviation_reasoning_effort: str = ""  # 判定時の reasoning_effort（minimal/low など、空の場合は送らない）
+    
+    # ローカルの埋め込みベクトル（アジェンダ候補の提示・ローカル判定）
+    embedding_model_dir: str = ""  # ONNX文埋め込みモデル（model.onnx, tokenizer.json）のディレクトリ（空の場合はハッシュベクトル）
+    embedding_dim: int = 2048  # ハッシュベクトルの次元数（小さいとn-gramの衝突が増える）
+    embedding_cache_size: int = 4096  # 埋め込みベクトルをキャッシュするチャンク数
+    
+    # Parking Lot（保留事項）のタイトル生成
+    parking_provisional_title_chars: int = 20  # タイトル生成が終わるまでの仮のタイトルの文字数
+    parking_title_cache_size: int = 1024  # 生成したタイトルを内容ごとにキャッシュする件数
+    parking_title_batch_window_ms: int = 2000  # 続けて追加された項目をまとめて生成するため、ジョブの実行を遅らせる時間
+    
+    # 自動要約のトリガー設定（会議中のスケジューラー）
+    summary_min_interval_sec: int = 60  # 要約生成の最小間隔
+    summary_max_interval_sec: int = 180  # 差分がある場合に要約を生成する最大間隔
+    summary_poll_interval_sec: int = 15  # トリガー条件の評価間隔
+    summary_trigger_chars: int = 600  # 要約を生成する差分の文字数
+    summary_trigger_chunks: int = 4  # 要約を生成する差分の文字起こし件数
+    scheduler_heartbeat_sec: int = 10  # 要約ループのリース更新間隔（有効期間はこの3倍）
+    
+    # バックグラウンドジョブキュー設定
+    job_queue_workers: int = 2  # ジョブを並列実行するワーカー数
+    job_max_attempts: int = 3  # ジョブの最大試行回数
+    job_retry_base_sec: int = 10  # リトライ間隔の基準秒数（試行ごとに2倍）
+    job_poll_interval_sec: int = 5  # 待機中ジョブの確認間隔
+    job_visibility_timeout_sec: int = 900  # 実行中ジョブのロック期限（超過すると再実行）
+    job_heartbeat_interval_sec: int = 60  # 実行中ジョブのロック期限を延長する間隔
+    
+    # 会議イベント配信（SSE）設定
+    sse_history_size: int = 200  # 再接続時の再送用に会議ごとに保持するイベント数
+    sse_queue_size: int = 100  # クライアントごとの未送信イベントの上限（超過すると切断）
+    sse_keepalive_sec: int = 15  # 接続維持コメントの送信間隔
+    sse_retry_ms: int = 3000  # クライアントの再接続間隔
+    
+    # WebSocket音声ストリームの発話区間検出（VAD）設定
+    vad_frame_ms: int = 30  # 判定フレームの長さ
+    vad_rms_threshold: float = 0.015  # 発話と判定する音量（RMS）
+    vad_silence_ms: int = 600  # セグメントを区切る無音の長さ
+    vad_pre_roll_ms: int = 300  # 発話開始前に含める無音の長さ
+    vad_min_speech_ms: int = 300  # これ未満の発話しか含まないセグメントは捨てる
+    vad_min_segment_sec: float = 3.0  # 無音で区切るセグメントの最小長
+    vad_max_segment_sec: float = 30.0  # 無音が無くても区切るセグメントの最大長
+    asr_stream_overlap_sec: float = 1.0  # 無音が無く区切った場合に次のセグメントへ重ねる長さ
+    # 暫定文字起こしは発話時間の約 window / interval 倍（既定値で約3.3倍）の音声を確定分とは別にASRへ送る
+    asr_partial_interval_sec: float = 3.0  # 発話中の暫定文字起こしの間隔（0で無効）
+    asr_partial_window_sec: float = 10.0  # 暫定文字起こしに使う直近の音声の長さ
 
 
 settings = Settings()
@@ -1,6 +1,55 @@
+import datetime as _dt
 import json
 import os
-from typing import Optional, Dict, Any, List
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, ContextManager, Dict, Iterator, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows（開発環境のみ。複数ワーカーでの実行は想定しない）
+    fcntl = None
+
+# プロセス内のロック（マニフェスト・文字起こし・会議メタデータは _file_lock でプロセス間も直列化する）
+# 音声チャンクのマニフェストの読み書きを直列化するロック
+_manifest_lock = threading.Lock()
+# 脱線検知履歴（deviations.jsonl）への追記を直列化するロック（プロセス内）
+_deviations_lock = threading.Lock()
+# 文字起こし（transcripts.json）の読み込み〜保存を直列化するロック
+_transcripts_lock = threading.Lock()
+# 会議メタデータ（meeting.json）の読み込み〜保存を会議ごとに直列化するロック
+_meeting_locks: Dict[str, threading.Lock] = {}
+_meeting_locks_guard = threading.Lock()
+
+
+def _meeting_lock(meeting_id: str) -> threading.Lock:
+    """会議メタデータのロックを取得（初回は作成）"""
+    with _meeting_locks_guard:
+        return _meeting_locks.setdefault(meeting_id, threading.Lock())
+
+
+@contextmanager
+def _file_lock(lock: threading.Lock, lock_path: str) -> Iterator[None]:
+    """プロセス内のロックとロックファイルの排他ロック（fcntl.flock）を取得する
+
+    uvicorn の複数ワーカーやジョブのワーカーは別プロセスのため、読み込み〜保存をプロセス間でも
+    直列化する。fcntl が無い環境（Windows）ではプロセス内のロックのみ取得する。
+
+    Args:
+        lock: プロセス内のロック
+        lock_path: ロックファイルのパス（無ければ作成する）
+    """
+    with lock:
+        if fcntl is None:
+            yield
+            return
+        os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+        with open(lock_path, "a") as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
 
 class DataStore:
     def __init__(self, base_dir: str):
@@ -24,6 +73,10 @@ class DataStore:
         """要約JSONファイルパスを取得"""
         return os.path.join(self._meeting_dir(meeting_id), "summary.json")
 
+    def _deviations_path(self, meeting_id: str) -> str:
+        """脱線検知履歴（JSON Lines）のファイルパスを取得"""
+        return os.path.join(self._meeting_dir(meeting_id), "deviations.jsonl")
+
     def _recording_path(self, meeting_id: str) -> str:
         """録音ファイルパスを取得"""
         return os.path.join(self._meeting_dir(meeting_id), "recording.webm")
@@ -46,16 +99,53 @@ class DataStore:
             pass
         raise TypeError(f"Type not serializable: {type(obj)}")
 
+    def _locked_meeting(self, meeting_id: str) -> ContextManager[None]:
+        """会議メタデータの読み込み〜保存を直列化するロック（プロセス間でも有効）"""
+        return _file_lock(_meeting_lock(meeting_id), f"{self._meeting_path(meeting_id)}.lock")
+
     def save_meeting(self, meeting_id: str, data: Dict[str, Any]):
-        """会議メタデータを保存"""
+        """会議メタデータを保存（全体を上書きする。既存の会議の変更には update_meeting を使う）"""
+        with self._locked_meeting(meeting_id):
+            self._write_meeting(meeting_id, data)
+
+    def _write_meeting(self, meeting_id: str, data: Dict[str, Any]):
+        """会議メタデータを書き込む（_locked_meeting() 内で呼ぶ）"""
         # 会議ディレクトリを作成
         meeting_dir = self._meeting_dir(meeting_id)
         os.makedirs(meeting_dir, exist_ok=True)
 
-        # 会議メタデータを保存
+        # 一時ファイルに書き込んでから置き換え、書き込み途中のファイルを読まないようにする
         path = self._meeting_path(meeting_id)
-        with open(path, "w", encoding="utf-8") as f:
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
             json.dump(data, f, ensure_ascii=False, indent=2, default=self._default_serializer)
+        os.replace(temp_path, path)
+
+    def update_meeting(
+        self, meeting_id: str, update: Callable[[Dict[str, Any]], None]
+    ) -> Optional[Dict[str, Any]]:
+        """会議メタデータを読み込み、変更して保存する
+
+        読み込みから保存までを会議ごとのロック内（ワーカープロセス間でも有効）で行うため、
+        同時に更新する他のリクエストやバックグラウンドジョブの変更を上書きしない。
+
+        Args:
+            meeting_id: 会議ID
+            update: 会議メタデータを直接変更する関数
+
+        Returns:
+            更新後の会議メタデータ（会議が見つからない場合はNone）
+        """
+        if not os.path.exists(self._meeting_path(meeting_id)):
+            # 存在しない会議のロックファイル（会議ディレクトリ）を作らない
+            return None
+        with self._locked_meeting(meeting_id):
+            meeting = self.load_meeting(meeting_id)
+            if meeting is None:
+                return None
+            update(meeting)
+            self._write_meeting(meeting_id, meeting)
+        return meeting
 
     def save_file(self, meeting_id: str, filename: str, content: str):
         """任意のファイルを会議ディレクトリに保存"""
@@ -65,16 +155,8 @@ class DataStore:
         with open(path, "w", encoding="utf-8") as f:
             f.write(content)
 
-    def append_audio_chunk(self, meeting_id: str, audio_data: bytes):
-        """音声チャンクを録音ファイルに追記する
-
-        WebM形式のチャンクを正しく結合するため、各チャンクを個別ファイルとして保存し、
-        ダウンロード時にFFmpegで結合する方式に変更。
-
-        Args:
-            meeting_id: 会議ID
-            audio_data: 音声データ（バイナリ）
-        """
+    def _write_audio_chunk(self, meeting_id: str, audio_data: bytes) -> Dict[str, Any]:
+        """音声チャンクをファイルに保存し、マニフェスト用のエントリを返す"""
         import uuid
         
         # 会議ディレクトリを作成
@@ -85,8 +167,9 @@ class DataStore:
         chunks_dir = os.path.join(meeting_dir, "audio_chunks")
         os.makedirs(chunks_dir, exist_ok=True)
         
-        # チャンクファイル名（タイムスタンプ付き）
-        chunk_filename = f"chunk_{uuid.uuid4().hex[:8]}.webm"
+        # チャンクファイル名（チャンクID付き）
+        chunk_id = uuid.uuid4().hex[:8]
+        chunk_filename = f"chunk_{chunk_id}.webm"
         chunk_path = os.path.join(chunks_dir, chunk_filename)
         
         # チャンクを個別ファイルとして保存
@@ -98,6 +181,319 @@ class DataStore:
         with open(legacy_path, "ab") as f:  # "ab" = append binary
             f.write(audio_data)
 
+        return {
+            "chunk_id": chunk_id,
+            "file": chunk_filename,
+            "size": len(audio_data),
+            "received_at": _dt.datetime.now(_dt.timezone.utc).isoformat(),
+            "idempotency_key": None,
+            "status": "received",
+        }
+
+    def append_audio_chunk(self, meeting_id: str, audio_data: bytes) -> Dict[str, Any]:
+        """音声チャンクを録音ファイルに追記する
+
+        WebM形式のチャンクを正しく結合するため、各チャンクを個別ファイルとして保存し、
+        ダウンロード時にFFmpegで結合する方式に変更。
+        保存したチャンクはマニフェスト（audio_chunks/manifest.json）に受信順で記録する。
+
+        Args:
+            meeting_id: 会議ID
+            audio_data: 音声データ（バイナリ）
+
+        Returns:
+            マニフェストに追加したチャンクのエントリ
+        """
+        with self._locked_manifest(meeting_id):
+            entry = self._write_audio_chunk(meeting_id, audio_data)
+            manifest = self.load_audio_manifest(meeting_id)
+            manifest.append(entry)
+            self._save_audio_manifest(meeting_id, manifest)
+        return entry
+
+    @staticmethod
+    def is_audio_chunk_claimable(entry: Dict[str, Any], lease_sec: float) -> bool:
+        """同じ冪等キーの再送で、チャンクの処理を引き継いでよいか
+
+        失敗したチャンクと、ジョブを登録しないまま lease_sec 秒以上経過した処理中のチャンク
+        （処理中にプロセスが停止したもの）は引き継げる。
+
+        Args:
+            entry: マニフェストのチャンクのエントリ
+            lease_sec: 処理中のチャンクを引き継げるようになるまでの秒数
+
+        Returns:
+            引き継げる場合はTrue
+        """
+        status = entry.get("status")
+        if status == "failed":
+            return True
+        if status not in ("pending", "processing") or entry.get("job_id"):
+            return False
+        claimed_at = entry.get("claimed_at") or entry.get("received_at")
+        try:
+            claimed = _dt.datetime.fromisoformat(claimed_at)
+        except (TypeError, ValueError):
+            return True
+        elapsed = _dt.datetime.now(_dt.timezone.utc) - claimed
+        return elapsed.total_seconds() >= lease_sec
+
+    def claim_audio_chunk(
+        self,
+        meeting_id: str,
+        audio_data: bytes,
+        idempotency_key: str,
+        status: str = "received",
+        seq: Optional[int] = None,
+        session_id: Optional[str] = None,
+        lease_sec: Optional[float] = None,
+    ) -> tuple[Dict[str, Any], bool]:
+        """冪等キー付きで音声チャンクを保存し、処理を開始する権利を取得する
+
+        同じ冪等キーのチャンクがマニフェストに既にある場合は保存せず、既存のエントリを返す。
+        既存のチャンクが引き継げる状態（is_audio_chunk_claimable）であれば、保存済みの音声を
+        再処理するため status と取得時刻を更新して取得する。
+        確認と更新はロック内で行うため、別のワーカープロセスに同時に届いた重複リクエストも
+        1件だけが取得する。
+
+        Args:
+            meeting_id: 会議ID
+            audio_data: 音声データ（バイナリ）
+            idempotency_key: 冪等キー
+            status: 取得時のステータス
+            seq: クライアントが付与したシーケンス番号
+            session_id: クライアントの録音セッションID
+            lease_sec: 処理中のチャンクを引き継げるようになるまでの秒数（省略時は引き継がない）
+
+        Returns:
+            (チャンクのエントリ, 処理を開始する権利を取得したか)
+        """
+        claimed_at = _dt.datetime.now(_dt.timezone.utc).isoformat()
+        with self._locked_manifest(meeting_id):
+            manifest = self.load_audio_manifest(meeting_id)
+            for existing in manifest:
+                if existing.get("idempotency_key") != idempotency_key:
+                    continue
+                if lease_sec is None or not self.is_audio_chunk_claimable(existing, lease_sec):
+                    return existing, False
+                existing.update(status=status, job_id=None, claimed_at=claimed_at)
+                self._save_audio_manifest(meeting_id, manifest)
+                return existing, True
+
+            entry = self._write_audio_chunk(meeting_id, audio_data)
+            entry["idempotency_key"] = idempotency_key
+            entry["status"] = status
+            entry["claimed_at"] = claimed_at
+            if seq is not None:
+                entry["seq"] = seq
+            if session_id is not None:
+                entry["session_id"] = session_id
+            manifest.append(entry)
+            self._save_audio_manifest(meeting_id, manifest)
+        return entry, True
+
+    def get_audio_chunk_path(self, meeting_id: str, entry: Dict[str, Any]) -> str:
+        """マニフェストのエントリからチャンクファイルのパスを取得"""
+        return os.path.join(self.get_audio_chunks_dir(meeting_id), entry["file"])
+
+    def append_audio_stream(
+        self,
+        meeting_id: str,
+        stream_id: str,
+        audio_data: bytes,
+        offset_sec: Optional[float] = None,
+    ):
+        """WebSocketで受信中の音声ストリームをチャンクファイルに追記する
+
+        1つのストリーム（WebMヘッダーから始まる連続データ）を1つのチャンクファイルとして保存する。
+        ダウンロード時は他のチャンクと同様に audio_chunks から FFmpeg で結合される。
+
+        Args:
+            meeting_id: 会議ID
+            stream_id: ストリームID（チャンクファイル名に使用）
+            audio_data: 受信した音声データ（バイナリ）
+            offset_sec: ストリームの開始位置（会議開始からの秒数、マニフェストに記録）
+        """
+        chunks_dir = self.get_audio_chunks_dir(meeting_id)
+        os.makedirs(chunks_dir, exist_ok=True)
+
+        chunk_filename = f"chunk_{stream_id}.webm"
+        chunk_path = os.path.join(chunks_dir, chunk_filename)
+        is_new = not os.path.exists(chunk_path)
+        with open(chunk_path, "ab") as f:
+            f.write(audio_data)
+
+        if is_new:
+            # ストリームの開始時にマニフェストへ登録する（サイズは確定時に更新しない）
+            with self._locked_manifest(meeting_id):
+                manifest = self.load_audio_manifest(meeting_id)
+                manifest.append({
+                    "chunk_id": stream_id,
+                    "file": chunk_filename,
+                    "received_at": _dt.datetime.now(_dt.timezone.utc).isoformat(),
+                    "idempotency_key": None,
+                    "status": "streaming",
+                    "offset_sec": offset_sec,
+                })
+                self._save_audio_manifest(meeting_id, manifest)
+
+    def _audio_manifest_path(self, meeting_id: str) -> str:
+        """音声チャンクのマニフェストファイルパスを取得"""
+        return os.path.join(self.get_audio_chunks_dir(meeting_id), "manifest.json")
+
+    def _locked_manifest(self, meeting_id: str) -> ContextManager[None]:
+        """マニフェストの読み込み〜保存を直列化するロック（プロセス間でも有効）"""
+        return _file_lock(_manifest_lock, f"{self._audio_manifest_path(meeting_id)}.lock")
+
+    def load_audio_manifest(self, meeting_id: str) -> List[Dict[str, Any]]:
+        """音声チャンクのマニフェスト（受信順のチャンク一覧）を読み込む"""
+        path = self._audio_manifest_path(meeting_id)
+        if not os.path.exists(path):
+            return []
+
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save_audio_manifest(self, meeting_id: str, manifest: List[Dict[str, Any]]):
+        """マニフェストを保存（_locked_manifest() 内で呼ぶ）"""
+        path = self._audio_manifest_path(meeting_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2, default=self._default_serializer)
+        os.replace(temp_path, path)
+
+    def find_audio_chunk(self, meeting_id: str, idempotency_key: str) -> Optional[Dict[str, Any]]:
+        """冪等キーに一致するチャンクをマニフェストから探す
+
+        Args:
+            meeting_id: 会議ID
+            idempotency_key: 冪等キー
+
+        Returns:
+            チャンクのエントリ（見つからない場合はNone）
+        """
+        for entry in self.load_audio_manifest(meeting_id):
+            if entry.get("idempotency_key") == idempotency_key:
+                return entry
+        return None
+
+    def find_audio_chunk_by_id(self, meeting_id: str, chunk_id: str) -> Optional[Dict[str, Any]]:
+        """チャンクIDに一致するチャンクをマニフェストから探す"""
+        for entry in self.load_audio_manifest(meeting_id):
+            if entry.get("chunk_id") == chunk_id:
+                return entry
+        return None
+
+    def update_audio_chunk(self, meeting_id: str, chunk_id: str, **fields: Any) -> Optional[Dict[str, Any]]:
+        """マニフェストのチャンクのエントリを更新する
+
+        Args:
+            meeting_id: 会議ID
+            chunk_id: チャンクID
+            **fields: 更新するフィールド
+
+        Returns:
+            更新後のエントリ（見つからない場合はNone）
+        """
+        with self._locked_manifest(meeting_id):
+            manifest = self.load_audio_manifest(meeting_id)
+            for entry in manifest:
+                if entry.get("chunk_id") == chunk_id:
+                    entry.update(fields)
+                    self._save_audio_manifest(meeting_id, manifest)
+                    return entry
+        return None
+
+    def mark_audio_chunk_queued(
+        self,
+        meeting_id: str,
+        chunk_id: str,
+        job_id: str,
+        from_statuses: tuple[str, ...] = ("pending", "received"),
+    ) -> Optional[Dict[str, Any]]:
+        """文字起こしジョブを登録したチャンクに job_id を記録し、ステータスを queued にする
+
+        ジョブの登録後にワーカーが先にチャンクを処理し始める（processing / done にする）ことがあるため、
+        ステータスは from_statuses のいずれかのままの場合のみ queued にする（ロック内で比較して更新）。
+
+        Args:
+            meeting_id: 会議ID
+            chunk_id: チャンクID
+            job_id: 登録した文字起こしジョブのID
+            from_statuses: queued に更新してよい現在のステータス
+
+        Returns:
+            更新後のエントリ（見つからない場合はNone）
+        """
+        with self._locked_manifest(meeting_id):
+            manifest = self.load_audio_manifest(meeting_id)
+            for entry in manifest:
+                if entry.get("chunk_id") == chunk_id:
+                    entry["job_id"] = job_id
+                    if entry.get("status") in from_statuses:
+                        entry["status"] = "queued"
+                    self._save_audio_manifest(meeting_id, manifest)
+                    return entry
+        return None
+
+    def set_audio_chunk_offset(
+        self,
+        meeting_id: str,
+        chunk_id: str,
+        duration_sec: float,
+        fallback_offset_sec: float,
+    ) -> float:
+        """チャンクの長さを記録し、会議の音声全体の中での開始位置（オフセット）を決める
+
+        直前のチャンク（seq があれば seq-1、無ければマニフェスト上の1つ前）の位置と長さが
+        分かっていれば、その終了位置を開始位置とする。分からない場合は fallback_offset_sec を使う。
+
+        Args:
+            meeting_id: 会議ID
+            chunk_id: チャンクID
+            duration_sec: チャンクの音声の長さ（秒）
+            fallback_offset_sec: 直前のチャンクから求められない場合の開始位置（秒）
+
+        Returns:
+            チャンクの開始位置（会議開始からの秒数）
+        """
+        with self._locked_manifest(meeting_id):
+            manifest = self.load_audio_manifest(meeting_id)
+            index = next(
+                (i for i, entry in enumerate(manifest) if entry.get("chunk_id") == chunk_id), None
+            )
+            if index is None:
+                return fallback_offset_sec
+
+            entry = manifest[index]
+            if entry.get("seq") is not None:
+                # seq はセッションごとの連番のため、同じセッションの直前のチャンクを探す
+                previous = next(
+                    (
+                        e for e in manifest
+                        if e.get("seq") == entry["seq"] - 1
+                        and e.get("session_id") == entry.get("session_id")
+                    ),
+                    None,
+                )
+            else:
+                previous = manifest[index - 1] if index > 0 else None
+
+            if (
+                previous is not None
+                and previous.get("offset_sec") is not None
+                and previous.get("duration_sec") is not None
+            ):
+                offset = previous["offset_sec"] + previous["duration_sec"]
+            else:
+                offset = fallback_offset_sec
+
+            entry["offset_sec"] = round(offset, 3)
+            entry["duration_sec"] = round(duration_sec, 3)
+            self._save_audio_manifest(meeting_id, manifest)
+        return offset
+
     def get_recording_path(self, meeting_id: str) -> str:
         """録音ファイルのパスを取得する（ダウンロード用）
 
@@ -121,17 +517,23 @@ class DataStore:
         return os.path.join(self._meeting_dir(meeting_id), "audio_chunks")
     
     def list_audio_chunks(self, meeting_id: str) -> list[str]:
-        """音声チャンクファイルのリストを取得（ソート済み）
+        """音声チャンクファイルのリストを取得（受信順）
 
         Args:
             meeting_id: 会議ID
 
         Returns:
-            音声チャンクファイルのパスのリスト（ファイル名でソート）
+            音声チャンクファイルのパスのリスト（マニフェストの受信順。
+            マニフェストが無い旧データはファイル名でソート）
         """
         chunks_dir = self.get_audio_chunks_dir(meeting_id)
         if not os.path.exists(chunks_dir):
             return []
+
+        manifest = self.load_audio_manifest(meeting_id)
+        if manifest:
+            listed = [os.path.join(chunks_dir, entry["file"]) for entry in manifest]
+            return [path for path in listed if os.path.exists(path)]
         
         chunk_files = [
             os.path.join(chunks_dir, f)
@@ -152,20 +554,44 @@ class DataStore:
         with open(path, "r", encoding="utf-8") as f:
             return json.load(f)
 
+    def _locked_transcripts(self, meeting_id: str) -> ContextManager[None]:
+        """文字起こしの読み込み〜保存を直列化するロック（プロセス間でも有効）"""
+        return _file_lock(_transcripts_lock, f"{self._transcripts_path(meeting_id)}.lock")
+
     def save_transcripts(self, meeting_id: str, transcripts: List[Dict[str, Any]]):
-        """文字起こしデータを保存"""
+        """文字起こしデータを保存（上書き）"""
+        with self._locked_transcripts(meeting_id):
+            self._write_transcripts(meeting_id, transcripts)
+
+    def _write_transcripts(self, meeting_id: str, transcripts: List[Dict[str, Any]]):
+        """文字起こしデータを書き込む（_locked_transcripts() 内で呼ぶ）"""
         meeting_dir = self._meeting_dir(meeting_id)
         os.makedirs(meeting_dir, exist_ok=True)
 
+        # 一時ファイルに書き込んでから置き換え、読み込み側が書き込み途中のファイルを読まないようにする
         path = self._transcripts_path(meeting_id)
-        with open(path, "w", encoding="utf-8") as f:
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
             json.dump(transcripts, f, ensure_ascii=False, indent=2, default=self._default_serializer)
+        os.replace(temp_path, path)
+
+    def transcripts_version(self, meeting_id: str) -> Optional[tuple]:
+        """transcripts.json の更新を判定するための値（更新時刻とサイズ）を取得"""
+        try:
+            stat = os.stat(self._transcripts_path(meeting_id))
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
 
     def append_transcript(self, meeting_id: str, transcript: Dict[str, Any]):
-        """文字起こしデータを追記"""
-        transcripts = self.load_transcripts(meeting_id)
-        transcripts.append(transcript)
-        self.save_transcripts(meeting_id, transcripts)
+        """文字起こしデータを追記
+
+        読み込みから保存までをロック内で行うため、複数のスレッド・ワーカープロセスから同時に追記しても欠落しない。
+        """
+        with self._locked_transcripts(meeting_id):
+            transcripts = self.load_transcripts(meeting_id)
+            transcripts.append(transcript)
+            self._write_transcripts(meeting_id, transcripts)
 
     def load_summary(self, meeting_id: str) -> Optional[Dict[str, Any]]:
         """要約データを読み込む"""
@@ -185,6 +611,35 @@ class DataStore:
         with open(path, "w", encoding="utf-8") as f:
             json.dump(summary, f, ensure_ascii=False, indent=2, default=self._default_serializer)
 
+    def append_deviation(self, meeting_id: str, record: Dict[str, Any]):
+        """脱線検知結果を履歴（deviations.jsonl）に1行追記"""
+        meeting_dir = self._meeting_dir(meeting_id)
+        os.makedirs(meeting_dir, exist_ok=True)
+
+        line = json.dumps(record, ensure_ascii=False, default=self._default_serializer)
+        with _deviations_lock:
+            with open(self._deviations_path(meeting_id), "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    def load_deviations(self, meeting_id: str) -> List[Dict[str, Any]]:
+        """脱線検知履歴を読み込む（追記順）"""
+        path = self._deviations_path(meeting_id)
+        if not os.path.exists(path):
+            return []
+
+        records = []
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # 書き込み途中で停止した行は読み飛ばす
+                    continue
+        return records
+
     def list_meetings(self) -> List[Dict[str, Any]]:
         """会議一覧を取得"""
         meetings_dir = os.path.join(self.base_dir, "meetings")
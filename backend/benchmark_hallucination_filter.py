@@ -0,0 +1,97 @@
+"""
+幻聴フィルタのマイクロベンチマーク
+
+従来の実装（re.findall 2回 + パターンごとの re.search）と、
+HallucinationFilter（1パスの文字種判定 + 1つにまとめた正規表現）の
+1件あたりの処理時間を、幻聴フレーズ数を変えて比較する。
+
+使用方法:
+python benchmark_hallucination_filter.py [--iterations 20000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import sys
+import timeit
+from pathlib import Path
+
+# プロジェクトルートをパスに追加
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from app.services.hallucination_filter import (  # noqa: E402
+    DEFAULT_HALLUCINATION_PHRASES,
+    REGEX_PREFIX,
+    HallucinationFilter,
+)
+
+SAMPLE_TEXTS = [
+    "えーと、それでは次の議題に移りたいと思います。来週のリリース計画についてですが、QAの進捗はどうでしょうか。",
+    "はい、テストケースは八割ほど消化していて、残りは金曜日までに終わる見込みです。",
+    "ご視聴ありがとうございました",
+    "Thank you for watching and please subscribe to the channel.",
+    "APIのレスポンスタイムが500msを超えているので、キャッシュを入れる方向で検討しています。",
+]
+
+
+def legacy_filter(text: str, patterns: list[str]) -> str:
+    """従来の実装（比較用）"""
+    if not text:
+        return ""
+    japanese_chars = re.findall(r'[぀-ゟ゠-ヿ一-龯]', text)
+    total_chars = len(re.findall(r'[^\s]', text))
+    japanese_ratio = len(japanese_chars) / total_chars if total_chars > 0 else 0
+    if total_chars > 5 and japanese_ratio < 0.2:
+        return ""
+    for pattern in patterns:
+        if re.search(pattern, text, re.IGNORECASE):
+            return ""
+    return text
+
+
+def make_phrases(count: int) -> list[str]:
+    """既定のフレーズに、ランダムなリテラルのフレーズを加えて count 件にする"""
+    rng = random.Random(0)
+    alphabet = "あいうえおかきくけこさしすせそたちつてとなにぬねのアイウエオ視聴登録配信"
+    phrases = list(DEFAULT_HALLUCINATION_PHRASES)
+    while len(phrases) < count:
+        phrases.append("".join(rng.choice(alphabet) for _ in range(rng.randint(6, 14))))
+    return phrases
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="幻聴フィルタのマイクロベンチマーク")
+    parser.add_argument("--iterations", type=int, default=20000, help="各テキストの繰り返し回数")
+    args = parser.parse_args()
+
+    print(f"{'phrases':>8} {'legacy (us)':>12} {'filter (us)':>12} {'speedup':>8}")
+    for count in (5, 50, 200, 500):
+        phrases = make_phrases(count)
+        legacy_patterns = [
+            p[len(REGEX_PREFIX):] if p.startswith(REGEX_PREFIX) else re.escape(p) for p in phrases
+        ]
+        engine = HallucinationFilter(phrases)
+
+        # 判定結果が従来の実装と一致することを確認
+        for text in SAMPLE_TEXTS:
+            assert engine.filter(text) == legacy_filter(text, legacy_patterns), text
+
+        calls = args.iterations * len(SAMPLE_TEXTS)
+        legacy_sec = timeit.timeit(
+            lambda patterns=legacy_patterns: [legacy_filter(t, patterns) for t in SAMPLE_TEXTS],
+            number=args.iterations,
+        )
+        engine_sec = timeit.timeit(
+            lambda engine=engine: [engine.filter(t) for t in SAMPLE_TEXTS], number=args.iterations
+        )
+        print(
+            f"{count:>8} {legacy_sec / calls * 1e6:>12.2f} {engine_sec / calls * 1e6:>12.2f} "
+            f"{legacy_sec / engine_sec:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
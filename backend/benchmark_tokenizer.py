@@ -0,0 +1,144 @@
+"""
+要約のチャンク分割のベンチマーク
+
+従来の実装（段落・行ごとに estimate_token_count を呼び直す分割）と、
+chunk_by_tokens（行ごとのトークン数を1回だけ数えて詰める分割）の処理時間と、
+チャンクのトークン数（上限に対する最大値・平均値）を、文字起こしの長さを変えて比較する。
+
+tiktoken のエンコーディングを読み込める環境では、tiktoken による分割も比較し、
+各チャンクのトークン数は tiktoken で数える（読み込めない場合は概算で数える）。
+
+使用方法:
+python benchmark_tokenizer.py [--max-tokens 8000] [--overlap 0] [--repeat 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# プロジェクトルートをパスに追加
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from app.meeting_summarizer.tokenizer import (  # noqa: E402
+    EstimateTokenizer,
+    TiktokenTokenizer,
+    chunk_by_tokens,
+    estimate_token_count,
+)
+from app.settings import settings  # noqa: E402
+
+SAMPLE_LINES = [
+    "山田: えーと、それでは次の議題に移りたいと思います。来週のリリース計画についてですが、QAの進捗はどうでしょうか。",
+    "佐藤: はい、テストケースは八割ほど消化していて、残りは金曜日までに終わる見込みです。",
+    "鈴木: APIのレスポンスタイムが500msを超えているので、キャッシュを入れる方向で検討しています。",
+    "田中: 了解です。デプロイの手順書は Confluence の release-2024 ページにまとめておきます。",
+    "山田: 予算の件は来月の定例で改めて確認しましょう。",
+]
+
+
+def make_transcript(chars: int, seed: int = 0) -> str:
+    """話者ラベル付きの発話を並べた長い文字起こし（数行ごとに空行で段落を区切る）"""
+    rng = random.Random(seed)
+    lines: list[str] = []
+    total = 0
+    while total < chars:
+        line = rng.choice(SAMPLE_LINES)
+        lines.append(line)
+        total += len(line) + 1
+        if rng.random() < 0.15:
+            lines.append("")
+    return "\n".join(lines)
+
+
+def legacy_split(text: str, max_tokens_per_chunk: int) -> list[str]:
+    """従来の実装（比較用）"""
+    if estimate_token_count(text) <= max_tokens_per_chunk:
+        return [text]
+    chunks: list[str] = []
+    current_chunk: list[str] = []
+    current_tokens = 0
+    for para in text.split("\n\n"):
+        para_tokens = estimate_token_count(para)
+        if para_tokens > max_tokens_per_chunk:
+            if current_chunk:
+                chunks.append("\n\n".join(current_chunk))
+                current_chunk = []
+                current_tokens = 0
+            for line in para.split("\n"):
+                line_tokens = estimate_token_count(line)
+                if current_tokens + line_tokens > max_tokens_per_chunk:
+                    if current_chunk:
+                        chunks.append("\n\n".join(current_chunk))
+                    current_chunk = [line]
+                    current_tokens = line_tokens
+                else:
+                    current_chunk.append(line)
+                    current_tokens += line_tokens
+        elif current_tokens + para_tokens > max_tokens_per_chunk:
+            if current_chunk:
+                chunks.append("\n\n".join(current_chunk))
+            current_chunk = [para]
+            current_tokens = para_tokens
+        else:
+            current_chunk.append(para)
+            current_tokens += para_tokens
+    if current_chunk:
+        chunks.append("\n\n".join(current_chunk))
+    return chunks
+
+
+def best_of(repeat: int, func) -> tuple[float, list[str]]:
+    """repeat 回実行した最短時間（秒）と結果を返す"""
+    best = float("inf")
+    result: list[str] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="要約のチャンク分割のベンチマーク")
+    parser.add_argument("--max-tokens", type=int, default=8000, help="チャンクあたりの最大トークン数")
+    parser.add_argument("--overlap", type=int, default=0, help="チャンク間で重ねるトークン数")
+    parser.add_argument("--repeat", type=int, default=3, help="各計測の繰り返し回数（最短時間を表示）")
+    args = parser.parse_args()
+
+    estimate = EstimateTokenizer()
+    try:
+        exact = TiktokenTokenizer(settings.summary_tokenizer_encoding)
+    except Exception as e:
+        print(f"tiktoken のエンコーディングを読み込めないため、概算のみ比較します: {e}\n")
+        exact = None
+    # チャンクのトークン数は、使える中で最も正確な方法で数える
+    meter = exact or estimate
+
+    methods = [
+        ("legacy", lambda text: legacy_split(text, args.max_tokens)),
+        ("estimate", lambda text: chunk_by_tokens(text, args.max_tokens, args.overlap, estimate)),
+    ]
+    if exact is not None:
+        methods.append(("tiktoken", lambda text: chunk_by_tokens(text, args.max_tokens, args.overlap, exact)))
+
+    print(f"tokens counted with: {meter.name}, max_tokens={args.max_tokens}, overlap={args.overlap}")
+    print(f"{'chars':>9} {'method':>9} {'ms':>9} {'chunks':>7} {'max tok':>8} {'avg tok':>8} {'over':>5}")
+    for chars in (50_000, 200_000, 1_000_000):
+        text = make_transcript(chars)
+        for name, split in methods:
+            seconds, chunks = best_of(args.repeat, lambda split=split, text=text: split(text))
+            sizes = meter.count_many(chunks)
+            over = sum(1 for size in sizes if size > args.max_tokens)
+            print(
+                f"{chars:>9} {name:>9} {seconds * 1e3:>9.1f} {len(chunks):>7} "
+                f"{max(sizes):>8} {sum(sizes) / len(sizes):>8.0f} {over:>5}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+"""pytest の共通設定"""
+from __future__ import annotations
+
+import os
+import tempfile
+
+import pytest
+
+# app.settings の読み込み前に、データの保存先をテスト用の一時ディレクトリにする
+os.environ.setdefault("DATA_DIR", tempfile.mkdtemp(prefix="facilitation-test-"))
+
+from app.storage import DataStore  # noqa: E402
+
+
+@pytest.fixture
+def store(tmp_path) -> DataStore:
+    """一時ディレクトリを保存先にしたデータストア"""
+    return DataStore(str(tmp_path))
@@ -0,0 +1,105 @@
+"""ASRキャッシュの利用のテスト"""
+from __future__ import annotations
+
+import asyncio
+import io
+import threading
+import wave
+
+import pytest
+
+from app.services import asr, streaming_asr
+from app.services.asr_cache import AsrCache
+
+
+def _write_wav(path, frames: bytes) -> None:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(16000)
+        wav_file.writeframes(frames)
+    path.write_bytes(buffer.getvalue())
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch: pytest.MonkeyPatch) -> AsrCache:
+    cache = AsrCache(str(tmp_path / "asr_cache"), max_bytes=10 * 1024 * 1024)
+    monkeypatch.setattr(asr, "get_asr_cache", lambda: cache)
+    return cache
+
+
+def test_same_audio_is_transcribed_once(tmp_path, cache: AsrCache) -> None:
+    wav_path = tmp_path / "a.wav"
+    _write_wav(wav_path, b"\x01\x02" * 8000)
+    calls: list[str] = []
+
+    async def transcribe(path: str) -> dict:
+        calls.append(path)
+        return {"text": "こんにちは"}
+
+    first = asyncio.run(asr._transcribe_with_cache("test", str(wav_path), transcribe))
+    second = asyncio.run(asr._transcribe_with_cache("test", str(wav_path), transcribe))
+
+    assert first == second == {"text": "こんにちは"}
+    assert len(calls) == 1
+
+
+def test_cache_bypass_neither_reads_nor_stores(tmp_path, cache: AsrCache) -> None:
+    wav_path = tmp_path / "a.wav"
+    _write_wav(wav_path, b"\x01\x02" * 8000)
+    calls: list[str] = []
+
+    async def transcribe(path: str) -> dict:
+        calls.append(path)
+        return {"text": "暫定"}
+
+    for _ in range(2):
+        asyncio.run(asr._transcribe_with_cache("test", str(wav_path), transcribe, use_cache=False))
+
+    assert len(calls) == 2
+    assert cache.stats()["hits"] + cache.stats()["misses"] == 0
+
+
+def test_partial_windows_skip_asr_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    received: list[dict] = []
+
+    async def fake_transcribe(path: str, use_cache: bool = True) -> dict:
+        received.append({"use_cache": use_cache})
+        return {"text": "途中の発言"}
+
+    monkeypatch.setattr(streaming_asr, "transcribe_audio_file", fake_transcribe)
+    transcriber = streaming_asr.PartialTranscriber("m1", "s1")
+
+    asyncio.run(transcriber._transcribe_window("seg", b"RIFF"))
+
+    assert received == [{"use_cache": False}]
+
+
+def test_cache_io_runs_off_the_event_loop(tmp_path, cache: AsrCache, monkeypatch: pytest.MonkeyPatch) -> None:
+    """WAVのハッシュ計算とキャッシュの読み書きは、イベントループのスレッドで行わない"""
+    wav_path = tmp_path / "a.wav"
+    _write_wav(wav_path, b"\x01\x02" * 8000)
+    threads: dict[str, int] = {}
+
+    def record(name, func):
+        def wrapper(*args, **kwargs):
+            threads[name] = threading.get_ident()
+            return func(*args, **kwargs)
+        return wrapper
+
+    monkeypatch.setattr(asr, "pcm_digest_from_wav", record("digest", asr.pcm_digest_from_wav))
+    monkeypatch.setattr(cache, "get", record("get", cache.get))
+    monkeypatch.setattr(cache, "put", record("put", cache.put))
+
+    async def transcribe(path: str) -> dict:
+        return {"text": "こんにちは"}
+
+    async def scenario() -> int:
+        await asr._transcribe_with_cache("test", str(wav_path), transcribe)
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(scenario())
+
+    assert set(threads) == {"digest", "get", "put"}
+    assert loop_thread not in threads.values()
@@ -0,0 +1,86 @@
+"""脱線検知のローカル判定のテスト"""
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import pytest
+
+from app.services import deviation
+
+AGENDA = [
+    {"title": "リリース計画", "expectedOutcome": "リリース日の決定"},
+    {"title": "予算の確認", "expectedOutcome": "来期予算の承認"},
+]
+OFF_TOPIC = "昨日のサッカーの試合は本当に面白かったですね、延長戦まで見ました"
+
+
+@pytest.fixture
+def local_settings(monkeypatch: pytest.MonkeyPatch):
+    settings = deviation.settings
+    monkeypatch.setattr(settings, "deviation_local_enabled", True)
+    monkeypatch.setattr(settings, "deviation_local_on_track_score", 0.15)
+    monkeypatch.setattr(settings, "deviation_local_off_track_score", 0.02)
+    monkeypatch.setattr(settings, "deviation_local_embedding_on_track_score", 0.35)
+    monkeypatch.setattr(settings, "deviation_local_embedding_off_track_score", 0.1)
+    monkeypatch.setattr(settings, "deviation_local_min_chars", 20)
+    return settings
+
+
+def _embedding_scores(monkeypatch: pytest.MonkeyPatch, scored: list[tuple[float, str]]) -> None:
+    monkeypatch.setattr(deviation, "suggest_agenda", lambda *args, **kwargs: scored)
+
+
+def test_embedding_similarity_decides_on_track(monkeypatch: pytest.MonkeyPatch, local_settings) -> None:
+    # TF-IDFでは関連が見つからない発話でも、埋め込みの類似度が高ければLLMを呼ばずに判定する
+    _embedding_scores(monkeypatch, [(0.8, "予算の確認"), (0.1, "リリース計画")])
+
+    result = deviation._local_deviation_check(OFF_TOPIC, "", AGENDA)
+
+    assert result is not None
+    assert result["is_deviation"] is False
+    assert result["best_agenda"] == "予算の確認"
+    assert result["similarity_score"] == 0.8
+    assert result["method"] == "local"
+
+
+def test_embedding_similarity_blocks_local_off_track(monkeypatch: pytest.MonkeyPatch, local_settings) -> None:
+    # TF-IDFの類似度が低くても、埋め込みの類似度が中間ならLLMで判定する
+    _embedding_scores(monkeypatch, [(0.2, "リリース計画"), (0.0, "予算の確認")])
+    assert deviation._local_deviation_check(OFF_TOPIC, "", AGENDA) is None
+
+    _embedding_scores(monkeypatch, [(0.05, "リリース計画"), (0.0, "予算の確認")])
+    result = deviation._local_deviation_check(OFF_TOPIC, "", AGENDA)
+    assert result is not None
+    assert result["is_deviation"] is True
+    assert result["suggested_agenda"] == ["リリース計画", "予算の確認"]
+
+
+def test_tfidf_on_track_without_embedding_match(monkeypatch: pytest.MonkeyPatch, local_settings) -> None:
+    _embedding_scores(monkeypatch, [])
+
+    result = deviation._local_deviation_check("来週のリリース日をいつにするか決めましょう", "", AGENDA)
+
+    assert result is not None
+    assert result["is_deviation"] is False
+    assert result["best_agenda"] == "リリース計画"
+
+
+def test_local_check_runs_off_event_loop(monkeypatch: pytest.MonkeyPatch, local_settings) -> None:
+    threads: list[int] = []
+
+    def fake_suggest(*args, **kwargs):
+        threads.append(threading.get_ident())
+        return [(0.9, "リリース計画")]
+
+    monkeypatch.setattr(deviation, "suggest_agenda", fake_suggest)
+    transcripts = [{"id": "t1", "text": OFF_TOPIC}]
+
+    async def run() -> tuple[dict, int]:
+        result = await deviation.check_realtime_deviation(transcripts, AGENDA)
+        return result, threading.get_ident()
+
+    result, loop_thread = asyncio.run(run())
+
+    assert result["method"] == "local"
+    assert threads and all(ident != loop_thread for ident in threads)
@@ -0,0 +1,126 @@
+"""脱線検知（LLM）のマイクロバッチのテスト"""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.services import ai_deviation
+from app.services.ai_deviation import (
+    AIDeviationService,
+    DeviationAnalysis,
+    DeviationBatchItem,
+    DeviationBatchResponse,
+    DeviationParseError,
+)
+
+AGENDA = [{"title": "リリース計画", "expectedOutcome": "リリース日の決定"}]
+TEXTS = ["発話A", "発話B", "発話C"]
+
+
+@pytest.fixture
+def service(monkeypatch: pytest.MonkeyPatch) -> AIDeviationService:
+    monkeypatch.setattr(ai_deviation.settings, "deviation_batch_enabled", True)
+    monkeypatch.setattr(ai_deviation.settings, "deviation_batch_max_size", len(TEXTS))
+    monkeypatch.setattr(ai_deviation.settings, "deviation_batch_window_ms", 50)
+    service = AIDeviationService()
+
+    async def single(latest_text, context_text, agenda_items, threshold):
+        single.calls.append(latest_text)
+        return _analysis(f"single:{latest_text}")
+
+    single.calls = []
+    monkeypatch.setattr(service, "_check_deviation_ai_with_context", single)
+    return service
+
+
+def _analysis(best_agenda: str) -> DeviationAnalysis:
+    return DeviationAnalysis(
+        is_deviation=False,
+        confidence=0.9,
+        similarity_score=0.9,
+        best_agenda=best_agenda,
+        message="",
+        suggested_agenda=[],
+        recent_text="",
+        reasoning="",
+        timestamp="",
+    )
+
+
+def _batch_item(item_id: int) -> DeviationBatchItem:
+    return DeviationBatchItem(
+        id=item_id,
+        is_deviation=False,
+        confidence=0.8,
+        similarity_score=0.8,
+        best_agenda=f"batch:{TEXTS[item_id]}",
+        reasoning="",
+        suggested_agenda=[],
+    )
+
+
+def _submit_all(service: AIDeviationService, texts: list[str]) -> list:
+    async def run() -> list:
+        return await asyncio.gather(
+            *(
+                service.check_deviation_with_context({"id": text, "text": text}, [], AGENDA, 0.3)
+                for text in texts
+            ),
+            return_exceptions=True,
+        )
+
+    return asyncio.run(run())
+
+
+def test_batch_results_are_scattered_by_id(service: AIDeviationService, monkeypatch: pytest.MonkeyPatch) -> None:
+    async def request(*args, **kwargs):
+        # 順不同で、項目1の結果が欠けたレスポンス
+        return DeviationBatchResponse(results=[_batch_item(2), _batch_item(0)])
+
+    monkeypatch.setattr(service, "_request_deviation", request)
+
+    results = _submit_all(service, TEXTS)
+
+    assert [r.best_agenda for r in results] == ["batch:発話A", "single:発話B", "batch:発話C"]
+    assert service._check_deviation_ai_with_context.calls == ["発話B"]
+    stats = service.get_batch_stats()
+    assert stats["batches"] == 1
+    assert stats["batched_items"] == 3
+    assert stats["fallback_items"] == 1
+
+
+def test_unparseable_batch_falls_back_per_item(service: AIDeviationService, monkeypatch: pytest.MonkeyPatch) -> None:
+    async def request(*args, **kwargs):
+        raise DeviationParseError("broken")
+
+    monkeypatch.setattr(service, "_request_deviation", request)
+
+    results = _submit_all(service, TEXTS)
+
+    assert [r.best_agenda for r in results] == [f"single:{text}" for text in TEXTS]
+    assert service.get_batch_stats()["fallback_items"] == 3
+
+
+def test_api_error_is_returned_to_every_caller(service: AIDeviationService, monkeypatch: pytest.MonkeyPatch) -> None:
+    async def request(*args, **kwargs):
+        raise RuntimeError("503")
+
+    monkeypatch.setattr(service, "_request_deviation", request)
+
+    results = _submit_all(service, TEXTS)
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert service._check_deviation_ai_with_context.calls == []
+
+
+def test_single_item_uses_individual_check(service: AIDeviationService, monkeypatch: pytest.MonkeyPatch) -> None:
+    async def request(*args, **kwargs):
+        raise AssertionError("single items must not use the batch request")
+
+    monkeypatch.setattr(service, "_request_deviation", request)
+
+    results = _submit_all(service, TEXTS[:1])
+
+    assert results[0].best_agenda == "single:発話A"
+    assert service.get_batch_stats()["batches"] == 0
@@ -0,0 +1,101 @@
+"""脱線検知（LLM）のレスポンスの検証と再試行のテスト"""
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+
+from app.services import ai_deviation, deviation
+from app.services.ai_deviation import (
+    DEVIATION_RESPONSE_FORMAT,
+    AIDeviationService,
+    DeviationParseError,
+    DeviationResponse,
+)
+
+AGENDA = [{"title": "リリース計画", "expectedOutcome": "リリース日の決定"}]
+
+VALID = json.dumps({
+    "is_deviation": False,
+    "confidence": 0.9,
+    "similarity_score": 0.8,
+    "best_agenda": "リリース計画",
+    "reasoning": "リリース日の話題",
+    "suggested_agenda": [],
+}, ensure_ascii=False)
+EMPTY = ""
+INVALID_JSON = '{"is_deviation": false, "confidence": 0.9'  # 出力トークンの上限で途切れた
+SCHEMA_VIOLATION = json.dumps({"is_deviation": "maybe", "confidence": 0.9})
+
+
+class StubAzure:
+    """_call_azure_openai の代わりに、用意した返答を順に返す"""
+
+    def __init__(self, replies: list[str]):
+        self.replies = list(replies)
+        self.budgets: list[int] = []
+
+    async def __call__(self, prompt, system_prompt="", max_completion_tokens=0, response_format=None):
+        self.budgets.append(max_completion_tokens)
+        content = self.replies.pop(0)
+        if not content:
+            raise ValueError("Azure OpenAI APIから空のレスポンスが返されました")
+        return content
+
+
+@pytest.fixture
+def service(monkeypatch: pytest.MonkeyPatch) -> AIDeviationService:
+    monkeypatch.setattr(ai_deviation.settings, "deviation_max_completion_tokens", 500)
+    monkeypatch.setattr(ai_deviation.settings, "deviation_parse_retries", 2)
+    return AIDeviationService()
+
+
+def _request(service: AIDeviationService):
+    return asyncio.run(service._request_deviation(
+        "発話", "system", DEVIATION_RESPONSE_FORMAT, DeviationResponse
+    ))
+
+
+@pytest.mark.parametrize("bad_reply", [EMPTY, INVALID_JSON, SCHEMA_VIOLATION])
+def test_bad_reply_is_retried_with_doubled_budget(
+    service: AIDeviationService, monkeypatch: pytest.MonkeyPatch, bad_reply: str
+) -> None:
+    stub = StubAzure([bad_reply, VALID])
+    monkeypatch.setattr(service, "_call_azure_openai", stub)
+
+    response = _request(service)
+
+    assert response.best_agenda == "リリース計画"
+    assert stub.budgets == [500, 1000]
+    stats = service.get_usage_stats()
+    assert stats["parse_failures"] == 1
+    assert stats["parse_retries"] == 1
+
+
+def test_parse_error_after_last_retry(service: AIDeviationService, monkeypatch: pytest.MonkeyPatch) -> None:
+    stub = StubAzure([EMPTY, INVALID_JSON, SCHEMA_VIOLATION])
+    monkeypatch.setattr(service, "_call_azure_openai", stub)
+
+    with pytest.raises(DeviationParseError):
+        _request(service)
+
+    assert stub.budgets == [500, 1000, 2000]
+    stats = service.get_usage_stats()
+    assert stats["parse_failures"] == 3
+    assert stats["parse_retries"] == 2
+
+
+def test_realtime_check_falls_back_when_reply_cannot_be_parsed(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(deviation.settings, "deviation_local_enabled", False)
+    monkeypatch.setattr(deviation.settings, "deviation_batch_enabled", False)
+    monkeypatch.setattr(deviation.settings, "deviation_parse_retries", 1)
+    stub = StubAzure([INVALID_JSON, SCHEMA_VIOLATION])
+    monkeypatch.setattr(deviation.ai_deviation_service, "_call_azure_openai", stub)
+    transcripts = [{"id": f"t{i}", "text": "来週のリリース日を決めましょう"} for i in range(3)]
+
+    result = asyncio.run(deviation.check_realtime_deviation(transcripts, AGENDA))
+
+    assert len(stub.budgets) == 2
+    assert result["method"] == "fallback"
+    assert result["best_agenda"] == "リリース計画"
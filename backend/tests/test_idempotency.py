@@ -0,0 +1,112 @@
+"""音声アップロードの冪等キーのテスト"""
+from __future__ import annotations
+
+import datetime as _dt
+import threading
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routers import transcripts as transcripts_router
+from app.storage import DataStore
+
+AUDIO = b"\x1a\x45\xdf\xa3" + b"\x00" * 2000
+
+
+def _age(store: DataStore, meeting_id: str, chunk_id: str, seconds: float) -> None:
+    claimed_at = _dt.datetime.now(_dt.timezone.utc) - _dt.timedelta(seconds=seconds)
+    store.update_audio_chunk(meeting_id, chunk_id, claimed_at=claimed_at.isoformat())
+
+
+def test_claim_returns_existing_entry_for_duplicate_key(store: DataStore) -> None:
+    first, claimed = store.claim_audio_chunk("m1", AUDIO, "k", status="processing", lease_sec=300)
+    second, claimed_again = store.claim_audio_chunk("m1", AUDIO, "k", status="processing", lease_sec=300)
+
+    assert claimed and not claimed_again
+    assert second["chunk_id"] == first["chunk_id"]
+    assert len(store.load_audio_manifest("m1")) == 1
+
+
+def test_stale_processing_chunk_is_taken_over(store: DataStore) -> None:
+    chunk, _ = store.claim_audio_chunk("m1", AUDIO, "k", status="processing", lease_sec=300)
+    _age(store, "m1", chunk["chunk_id"], 600)
+
+    retried, claimed = store.claim_audio_chunk("m1", AUDIO, "k", status="processing", lease_sec=300)
+
+    assert claimed
+    assert retried["chunk_id"] == chunk["chunk_id"]
+    # 引き継いだ直後は新しいリースになり、さらに再送しても取得できない
+    assert not store.claim_audio_chunk("m1", AUDIO, "k", status="processing", lease_sec=300)[1]
+
+
+def test_queued_chunk_is_not_taken_over(store: DataStore) -> None:
+    chunk, _ = store.claim_audio_chunk("m1", AUDIO, "k", status="pending", lease_sec=300)
+    store.mark_audio_chunk_queued("m1", chunk["chunk_id"], "job-1")
+    _age(store, "m1", chunk["chunk_id"], 600)
+
+    assert not store.claim_audio_chunk("m1", AUDIO, "k", status="pending", lease_sec=300)[1]
+
+
+def test_failed_chunk_is_claimed_by_only_one_retry(store: DataStore) -> None:
+    chunk, _ = store.claim_audio_chunk("m1", AUDIO, "k", status="processing", lease_sec=300)
+    store.update_audio_chunk("m1", chunk["chunk_id"], status="failed", error="boom")
+
+    results: list[bool] = []
+    barrier = threading.Barrier(8)
+
+    def retry() -> None:
+        barrier.wait()
+        results.append(store.claim_audio_chunk("m1", AUDIO, "k", status="processing", lease_sec=300)[1])
+
+    threads = [threading.Thread(target=retry) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results.count(True) == 1
+
+
+@pytest.mark.parametrize(
+    ("idempotency_key", "seq", "session_id", "expected"),
+    [
+        ("abc", None, None, "abc"),
+        ("abc", 3, "s1", "s1:abc"),
+        (None, 3, "s1", "seq:s1:3"),
+        (None, 3, None, None),
+        (None, None, "s1", None),
+    ],
+)
+def test_idempotency_key_is_scoped_by_session(idempotency_key, seq, session_id, expected) -> None:
+    assert transcripts_router._idempotency_key(idempotency_key, seq, session_id) == expected
+
+
+@pytest.fixture
+def meeting_id() -> str:
+    meeting_id = uuid.uuid4().hex
+    transcripts_router.store.save_meeting(meeting_id, {"id": meeting_id, "title": "test"})
+    return meeting_id
+
+
+def _upload(client: TestClient, meeting_id: str, **form) -> object:
+    return client.post(
+        f"/meetings/{meeting_id}/transcribe?async=true",
+        files={"file": ("chunk.webm", AUDIO, "audio/webm")},
+        data={key: str(value) for key, value in form.items()},
+    )
+
+
+def test_upload_replays_same_session_seq(meeting_id: str) -> None:
+    client = TestClient(app)
+
+    first = _upload(client, meeting_id, seq=1, session_id="s1")
+    replay = _upload(client, meeting_id, seq=1, session_id="s1")
+    other_session = _upload(client, meeting_id, seq=1, session_id="s2")
+
+    assert first.status_code == 202
+    assert replay.status_code == 202
+    assert replay.headers.get("Idempotent-Replayed") == "true"
+    assert replay.json()["chunk_id"] == first.json()["chunk_id"]
+    assert other_session.json()["chunk_id"] != first.json()["chunk_id"]
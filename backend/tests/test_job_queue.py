@@ -0,0 +1,160 @@
+"""JobQueue のテスト"""
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+from app.core.sqlite import connect
+from app.services import job_queue as job_queue_module
+from app.services.job_queue import (
+    JOB_STATUS_FAILED,
+    JOB_STATUS_QUEUED,
+    JOB_STATUS_RUNNING,
+    JOB_STATUS_SUCCEEDED,
+    JobQueue,
+)
+
+
+@pytest.fixture
+def queue(tmp_path) -> JobQueue:
+    return JobQueue(str(tmp_path / "jobs.sqlite3"))
+
+
+def _expire_lock(queue: JobQueue, job_id: str) -> None:
+    """実行中のジョブのロック期限を切らす（プロセス停止の再現）"""
+    with connect(queue.db_path) as conn:
+        conn.execute("UPDATE jobs SET locked_until = ? WHERE id = ?", (time.time() - 1, job_id))
+
+
+def _locked_until(queue: JobQueue, job_id: str) -> float:
+    with connect(queue.db_path) as conn:
+        return conn.execute("SELECT locked_until FROM jobs WHERE id = ?", (job_id,)).fetchone()[0]
+
+
+def test_enqueue_deduplicates_waiting_job(queue: JobQueue) -> None:
+    first = queue.enqueue("summary", "m1", payload={"n": 1}, priority=50)
+    second = queue.enqueue("summary", "m1", payload={"n": 2}, priority=10)
+
+    assert second.id == first.id
+    assert second.payload == {"n": 2}
+    assert second.priority == 10
+
+
+def test_expired_lock_is_reclaimed_while_attempts_remain(queue: JobQueue) -> None:
+    job = queue.enqueue("summary", "m1", max_attempts=2)
+    claimed = queue.claim_next()
+    assert claimed.id == job.id and claimed.attempts == 1
+
+    _expire_lock(queue, job.id)
+    reclaimed = queue.claim_next()
+
+    assert reclaimed.id == job.id
+    assert reclaimed.attempts == 2
+    assert reclaimed.status == JOB_STATUS_RUNNING
+
+
+def test_expired_lock_on_final_attempt_fails_job(queue: JobQueue) -> None:
+    job = queue.enqueue("summary", "m1", max_attempts=1)
+    queue.claim_next()
+
+    _expire_lock(queue, job.id)
+
+    assert queue.claim_next() is None
+    failed = queue.get(job.id)
+    assert failed.status == JOB_STATUS_FAILED
+    assert failed.attempts == 1
+    assert "Lock expired" in failed.error
+
+
+def test_fail_retries_until_max_attempts(queue: JobQueue) -> None:
+    job = queue.enqueue("summary", "m1", max_attempts=2)
+    queue.fail(queue.claim_next(), "boom")
+    assert queue.get(job.id).status == JOB_STATUS_QUEUED
+
+    with connect(queue.db_path) as conn:
+        conn.execute("UPDATE jobs SET run_after = 0 WHERE id = ?", (job.id,))
+    queue.fail(queue.claim_next(), "boom")
+    assert queue.get(job.id).status == JOB_STATUS_FAILED
+
+
+def test_stale_worker_cannot_fail_reclaimed_job(queue: JobQueue) -> None:
+    """ロック期限切れで他のワーカーが取得し直したジョブを、元のワーカーの失敗で待機中に戻さない"""
+    job = queue.enqueue("summary", "m1", max_attempts=3)
+    stale = queue.claim_next()
+    _expire_lock(queue, job.id)
+    other = JobQueue(queue.db_path)
+    reclaimed = other.claim_next()
+
+    assert not queue.fail(stale, "timeout")
+
+    current = queue.get(job.id)
+    assert current.status == JOB_STATUS_RUNNING
+    assert current.attempts == reclaimed.attempts == 2
+    assert other.heartbeat(job.id)
+    # 新しい実行のロックが残っているため、他のワーカーは取得できない
+    assert queue.claim_next() is None
+
+
+def test_stale_worker_cannot_complete_reclaimed_job(queue: JobQueue) -> None:
+    job = queue.enqueue("summary", "m1", max_attempts=3)
+    stale = queue.claim_next()
+    _expire_lock(queue, job.id)
+    other = JobQueue(queue.db_path)
+    reclaimed = other.claim_next()
+
+    assert not queue.complete(stale, {"run": "stale"})
+    assert queue.get(job.id).status == JOB_STATUS_RUNNING
+
+    assert other.complete(reclaimed, {"run": "new"})
+    done = queue.get(job.id)
+    assert done.status == JOB_STATUS_SUCCEEDED
+    assert done.result == {"run": "new"}
+
+
+def test_same_worker_stale_attempt_is_ignored(queue: JobQueue) -> None:
+    """同じプロセスの別のワーカーが取得し直した場合も、古い試行の記録は無視する"""
+    job = queue.enqueue("summary", "m1", max_attempts=3)
+    stale = queue.claim_next()
+    _expire_lock(queue, job.id)
+    reclaimed = queue.claim_next()
+
+    assert not queue.fail(stale, "timeout")
+    assert queue.complete(reclaimed, None)
+    assert queue.get(job.id).status == JOB_STATUS_SUCCEEDED
+
+
+def test_heartbeat_extends_lock_only_for_owner(queue: JobQueue) -> None:
+    job = queue.enqueue("summary", "m1")
+    queue.claim_next()
+    _expire_lock(queue, job.id)
+
+    assert queue.heartbeat(job.id)
+    assert _locked_until(queue, job.id) > time.time()
+
+    other = JobQueue(queue.db_path)
+    assert not other.heartbeat(job.id)
+
+
+def test_running_job_lock_is_renewed(queue: JobQueue, monkeypatch: pytest.MonkeyPatch) -> None:
+    """ロック期限より長く実行されるジョブも、ハートビートにより他のワーカーに取得されない"""
+    monkeypatch.setattr(job_queue_module.settings, "job_visibility_timeout_sec", 1)
+    monkeypatch.setattr(job_queue_module.settings, "job_heartbeat_interval_sec", 0.2)
+
+    async def slow_handler(job):
+        await asyncio.sleep(1.5)
+        return {"ok": True}
+
+    queue.register("slow", slow_handler)
+    job = queue.enqueue("slow", "m1")
+
+    async def scenario() -> None:
+        claimed = await asyncio.to_thread(queue.claim_next)
+        execution = asyncio.create_task(queue._execute(claimed))
+        await asyncio.sleep(1.2)
+        assert await asyncio.to_thread(queue.claim_next) is None
+        await execution
+
+    asyncio.run(scenario())
+    assert queue.get(job.id).result == {"ok": True}
@@ -0,0 +1,151 @@
+"""保留事項のタイトル生成のテスト"""
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import pytest
+
+from app.routers import meetings as meetings_router
+from app.services import parking_titles
+from app.services.job_queue import JobQueue
+from app.services.parking_titles import (
+    JOB_PARKING_TITLE,
+    ParkingTitleCache,
+    content_hash,
+    enqueue_parking_titles,
+)
+from app.storage import DataStore
+
+
+def test_update_meeting_keeps_concurrent_changes(store: DataStore) -> None:
+    """保留事項の追加と更新日時の更新を同時に行っても、追加した項目が消えない"""
+    store.save_meeting("m1", {"id": "m1", "parking": []})
+    barrier = threading.Barrier(2)
+
+    def add_items() -> None:
+        barrier.wait()
+        for i in range(50):
+            store.update_meeting("m1", lambda m, i=i: m["parking"].append({"id": str(i)}))
+
+    def touch() -> None:
+        barrier.wait()
+        for i in range(50):
+            store.update_meeting("m1", lambda m, i=i: m.update(updated_at=str(i)))
+
+    threads = [threading.Thread(target=add_items), threading.Thread(target=touch)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    meeting = store.load_meeting("m1")
+    assert len(meeting["parking"]) == 50
+    assert meeting["updated_at"] == "49"
+
+
+def test_update_meeting_returns_none_for_missing_meeting(store: DataStore) -> None:
+    assert store.update_meeting("missing", lambda m: None) is None
+
+
+def test_content_hash_normalizes_width_and_spaces() -> None:
+    assert content_hash("ＡＢＣ  予算") == content_hash("ABC 予算")
+
+
+def test_title_cache_evicts_least_recently_used() -> None:
+    cache = ParkingTitleCache(2)
+    cache.put("a", "A")
+    cache.put("b", "B")
+    cache.get("a")
+    cache.put("c", "C")
+
+    assert cache.get("a") == "A"
+    assert cache.get("b") is None
+
+
+def test_enqueue_delays_job_for_batch_window(tmp_path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(parking_titles.settings, "parking_title_batch_window_ms", 60_000)
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"))
+
+    first = enqueue_parking_titles(queue, "m1")
+    second = enqueue_parking_titles(queue, "m1")
+
+    assert second.id == first.id
+    assert queue.claim_next() is None
+
+
+def test_job_applies_titles_without_overwriting_new_items(
+    store: DataStore, tmp_path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(parking_titles, "_title_cache", ParkingTitleCache(16))
+    store.save_meeting("m1", {"id": "m1", "parking": [
+        {"id": "p1", "content": "来期の予算配分", "title": "来期の", "title_pending": True},
+    ]})
+
+    async def generate(texts: list[str]) -> list[str | None]:
+        # 生成中に別のリクエストが項目を追加する
+        store.update_meeting("m1", lambda m: m["parking"].append(
+            {"id": "p2", "content": "採用計画", "title": "採用", "title_pending": True}
+        ))
+        return ["予算配分の検討" for _ in texts]
+
+    monkeypatch.setattr(parking_titles.ai_deviation_service, "generate_parking_titles", generate)
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"))
+    queue.enqueue(JOB_PARKING_TITLE, "m1")
+    job = queue.claim_next()
+
+    result = asyncio.run(parking_titles._run_parking_title_job(store, job))
+
+    parking = {item["id"]: item for item in store.load_meeting("m1")["parking"]}
+    assert result["updated"] == 1
+    assert parking["p1"]["title"] == "予算配分の検討"
+    assert parking["p1"]["title_pending"] is False
+    # 生成中に追加された項目は消えず、次のジョブで生成される
+    assert parking["p2"]["title_pending"] is True
+
+
+def test_title_job_racing_end_meeting_keeps_title(
+    tmp_path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """会議終了の処理中にタイトルが反映されても、会議終了の保存で上書きされない"""
+    store = meetings_router.store
+    monkeypatch.setattr(parking_titles, "_title_cache", ParkingTitleCache(16))
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"))
+    monkeypatch.setattr(meetings_router, "get_job_queue", lambda: queue)
+    store.save_meeting("race", {
+        "id": "race",
+        "created_at": "2026-01-01T00:00:00+00:00",
+        "title": "定例",
+        "purpose": "進捗確認",
+        "deliverable_template": "",
+        "participants": [],
+        "agenda": [],
+        "status": "in_progress",
+        "parking": [
+            {"id": "p1", "content": "来期の予算配分", "title": "来期の", "title_pending": True},
+        ],
+    })
+
+    async def generate(texts: list[str]) -> list[str | None]:
+        return ["予算配分の検討" for _ in texts]
+
+    monkeypatch.setattr(parking_titles.ai_deviation_service, "generate_parking_titles", generate)
+    queue.enqueue(JOB_PARKING_TITLE, "race")
+    job = queue.claim_next()
+
+    class Scheduler:
+        def stop_meeting_scheduler(self, meeting_id: str) -> None:
+            # 会議終了の処理の途中（会議データの確認後、保存前）にタイトル生成ジョブが完了する
+            title_job = parking_titles._run_parking_title_job(store, job)
+            thread = threading.Thread(target=asyncio.run, args=(title_job,))
+            thread.start()
+            thread.join()
+
+    monkeypatch.setattr(meetings_router, "get_scheduler", Scheduler)
+
+    asyncio.run(meetings_router.end_meeting("race"))
+
+    meeting = store.load_meeting("race")
+    assert meeting["status"] == "completed"
+    assert meeting["parking"][0]["title"] == "予算配分の検討"
+    assert meeting["parking"][0]["title_pending"] is False
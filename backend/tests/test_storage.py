@@ -0,0 +1,77 @@
+"""DataStore のテスト"""
+from __future__ import annotations
+
+import threading
+
+from app.storage import DataStore
+
+
+def test_append_transcript_concurrent(store: DataStore) -> None:
+    """複数のスレッドから同時に追記しても、文字起こしが欠落しない"""
+    meeting_id = "m1"
+    threads_count = 4
+    per_thread = 50
+    errors: list[Exception] = []
+    barrier = threading.Barrier(threads_count)
+
+    def worker(worker_id: int) -> None:
+        barrier.wait()
+        try:
+            for i in range(per_thread):
+                store.append_transcript(meeting_id, {"id": f"{worker_id}-{i}", "text": "x"})
+        except Exception as e:  # noqa: BLE001
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(threads_count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    ids = [t["id"] for t in store.load_transcripts(meeting_id)]
+    assert len(ids) == threads_count * per_thread
+    assert len(set(ids)) == len(ids)
+
+
+def test_append_transcript_reader_never_sees_partial_file(store: DataStore) -> None:
+    """追記中に読み込んでも、書き込み途中のJSONを読まない"""
+    meeting_id = "m1"
+    stop = threading.Event()
+    errors: list[Exception] = []
+
+    def reader() -> None:
+        while not stop.is_set():
+            try:
+                store.load_transcripts(meeting_id)
+            except Exception as e:  # noqa: BLE001
+                errors.append(e)
+
+    thread = threading.Thread(target=reader)
+    thread.start()
+    try:
+        for i in range(100):
+            store.append_transcript(meeting_id, {"id": str(i), "text": "あ" * 200})
+    finally:
+        stop.set()
+        thread.join()
+
+    assert errors == []
+    assert len(store.load_transcripts(meeting_id)) == 100
+
+
+def test_mark_audio_chunk_queued_does_not_overwrite_progress(store: DataStore) -> None:
+    """ワーカーが先に処理したチャンクは、ジョブ登録後に queued へ戻さない"""
+    meeting_id = "m1"
+    pending, _ = store.claim_audio_chunk(meeting_id, b"a" * 10, "key-1", status="pending")
+    done, _ = store.claim_audio_chunk(meeting_id, b"b" * 10, "key-2", status="pending")
+    store.update_audio_chunk(meeting_id, done["chunk_id"], status="done")
+
+    queued = store.mark_audio_chunk_queued(meeting_id, pending["chunk_id"], "job-1")
+    kept = store.mark_audio_chunk_queued(meeting_id, done["chunk_id"], "job-2")
+
+    assert queued["status"] == "queued"
+    assert queued["job_id"] == "job-1"
+    assert kept["status"] == "done"
+    assert kept["job_id"] == "job-2"
+    assert store.find_audio_chunk_by_id(meeting_id, done["chunk_id"])["status"] == "done"
@@ -0,0 +1,76 @@
+"""複数のワーカープロセスからの DataStore の同時更新のテスト"""
+from __future__ import annotations
+
+import multiprocessing
+import os
+
+import pytest
+
+from app import storage
+from app.storage import DataStore
+
+pytestmark = pytest.mark.skipif(storage.fcntl is None, reason="fcntl が無い環境ではプロセス間のロックを使わない")
+
+PROCESSES = 4
+AUDIO = b"\x1a\x45\xdf\xa3" + b"\x00" * 2000
+
+
+def _process_main(barrier, results, target, args) -> None:
+    store = DataStore(args[0])
+    barrier.wait()
+    try:
+        results.put(target(store, *args[1:]))
+    except Exception as e:  # noqa: BLE001
+        results.put(e)
+
+
+def _run_in_processes(target, base_dir: str, *args) -> list:
+    """target(store, *args) を複数のプロセスで同時に実行し、結果を集める"""
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(PROCESSES)
+    results = context.Queue()
+    processes = [
+        context.Process(target=_process_main, args=(barrier, results, target, (base_dir, *args)))
+        for _ in range(PROCESSES)
+    ]
+    for process in processes:
+        process.start()
+    collected = [results.get(timeout=60) for _ in processes]
+    for process in processes:
+        process.join(timeout=60)
+    errors = [result for result in collected if isinstance(result, Exception)]
+    assert errors == []
+    return collected
+
+
+def _claim_chunks(store: DataStore, rounds: int) -> list[bool]:
+    return [
+        store.claim_audio_chunk("m1", AUDIO, f"k{i}", status="processing", lease_sec=300)[1]
+        for i in range(rounds)
+    ]
+
+
+def test_duplicate_claims_across_processes_have_one_winner(tmp_path) -> None:
+    rounds = 20
+    collected = _run_in_processes(_claim_chunks, str(tmp_path), rounds)
+
+    # 冪等キーごとに、いずれか1つのプロセスだけが処理を開始する権利を取得する
+    for i in range(rounds):
+        assert sum(claimed[i] for claimed in collected) == 1
+    manifest = DataStore(str(tmp_path)).load_audio_manifest("m1")
+    assert sorted(entry["idempotency_key"] for entry in manifest) == sorted(f"k{i}" for i in range(rounds))
+
+
+def _append_transcripts(store: DataStore, per_process: int) -> int:
+    for i in range(per_process):
+        store.append_transcript("m1", {"id": f"{os.getpid()}-{i}", "text": "x"})
+    return per_process
+
+
+def test_transcript_appends_across_processes_are_not_lost(tmp_path) -> None:
+    per_process = 30
+    _run_in_processes(_append_transcripts, str(tmp_path), per_process)
+
+    ids = [t["id"] for t in DataStore(str(tmp_path)).load_transcripts("m1")]
+    assert len(ids) == PROCESSES * per_process
+    assert len(set(ids)) == len(ids)
@@ -0,0 +1,51 @@
+"""ストリーミング文字起こしのつなぎ目の重複除去のテスト"""
+from __future__ import annotations
+
+from app.services.streaming_asr import merge_overlapping, strip_overlap
+
+
+def test_merge_removes_real_overlap() -> None:
+    previous = "本日は来週のリリース計画について確認します。まずQAの進捗ですが"
+    window = "確認します。まずQAの進捗ですが、八割ほど終わっています"
+
+    assert merge_overlapping(previous, window) == (
+        "本日は来週のリリース計画について確認します。まずQAの進捗ですが、八割ほど終わっています"
+    )
+
+
+def test_merge_tolerates_cut_off_word_at_window_start() -> None:
+    previous = "予算の件は来月の定例で改めて確認しましょう"
+    # 窓の先頭で途切れた語が別の文字として認識された場合
+    window = "ん定例で改めて確認しましょう。次の議題です"
+
+    assert merge_overlapping(previous, window) == "予算の件は来月の定例で改めて確認しましょう。次の議題です"
+
+
+def test_merge_keeps_unrelated_windows_sharing_a_phrase() -> None:
+    previous = "それについては検討していますという状況です"
+    window = "資料を確認していますので後で共有します"
+
+    assert merge_overlapping(previous, window) == previous + window
+
+
+def test_merge_without_overlap_concatenates() -> None:
+    assert merge_overlapping("", "最初の窓") == "最初の窓"
+    assert merge_overlapping("前の窓のテキスト", "まったく別の内容") == "前の窓のテキストまったく別の内容"
+
+
+def test_strip_overlap_removes_repeated_head() -> None:
+    previous = "デプロイの手順書はページにまとめておきます"
+    text = "ページにまとめておきます。以上です"
+
+    assert strip_overlap(previous, text) == "。以上です"
+
+
+def test_strip_overlap_keeps_text_without_anchored_overlap() -> None:
+    # 共通の言い回しが途中にあるだけの場合は取り除かない
+    previous = "それについては検討していますという状況です"
+    text = "資料を確認していますので後で共有します"
+    assert strip_overlap(previous, text) == text
+
+    # 前のテキストの末尾まで続かない一致も取り除かない
+    assert strip_overlap("確認しましょう。では次へ", "確認しましょう。それから") == "確認しましょう。それから"
+    assert strip_overlap("", "テキスト") == "テキスト"
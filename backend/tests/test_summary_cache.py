@@ -0,0 +1,115 @@
+"""要約結果キャッシュのテスト"""
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from app.core import disk_cache
+from app.meeting_summarizer import service
+from app.meeting_summarizer.cache import SummaryCache, make_cache_key
+from app.meeting_summarizer.schema import MeetingSummaryOutput
+
+
+def test_cache_key_changes_with_prompt_version() -> None:
+    assert make_cache_key("本文", "v1", "gpt") == make_cache_key("本文", "v1", "gpt")
+    assert make_cache_key("本文", "v1", "gpt") != make_cache_key("本文", "v2", "gpt")
+    assert make_cache_key("本文", "v1", "gpt") != make_cache_key("本文", "v1", "gpt-mini")
+    assert make_cache_key("本文", "v1", "gpt") != make_cache_key("本文2", "v1", "gpt")
+
+
+def test_cache_key_changes_with_chunk_settings(monkeypatch: pytest.MonkeyPatch) -> None:
+    before = make_cache_key("本文", "v1", "gpt")
+    monkeypatch.setattr(service.settings, "summary_chunk_max_tokens", 1234)
+    assert make_cache_key("本文", "v1", "gpt") != before
+
+
+def test_cache_evicts_least_recently_used(tmp_path) -> None:
+    cache = SummaryCache(str(tmp_path), max_entries=2)
+    cache.put("aa1", {"n": 1})
+    time.sleep(0.01)
+    cache.put("bb2", {"n": 2})
+    time.sleep(0.01)
+    assert cache.get("aa1") == {"n": 1}
+    time.sleep(0.01)
+    cache.put("cc3", {"n": 3})
+
+    assert cache.get("bb2") is None
+    assert cache.get("aa1") == {"n": 1}
+    assert cache.stats()["evictions"] == 1
+
+
+def test_put_and_stats_use_in_memory_index(tmp_path, monkeypatch: pytest.MonkeyPatch) -> None:
+    cache = SummaryCache(str(tmp_path), max_entries=2)
+
+    def fail_walk(*args, **kwargs):
+        raise AssertionError("キャッシュディレクトリを走査してはいけない")
+
+    monkeypatch.setattr(disk_cache.os, "walk", fail_walk)
+    for key in ("aa1", "bb2", "cc3"):
+        cache.put(key, {"key": key})
+
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["evictions"] == 1
+
+
+def test_entry_stored_by_another_worker_is_shared(tmp_path) -> None:
+    # 同じディレクトリを共有する別プロセスのキャッシュ
+    cache = SummaryCache(str(tmp_path), max_entries=2)
+    other = SummaryCache(str(tmp_path), max_entries=2)
+
+    other.put("aa1", {"n": 1})
+
+    assert cache.get("aa1") == {"n": 1}
+    assert cache.stats()["entries"] == 1
+    # 他のプロセスが削除したエントリはミスになり、索引からも外れる
+    other.put("bb2", {"n": 2})
+    other.put("cc3", {"n": 3})
+    assert cache.get("aa1") is None
+    assert cache.stats()["entries"] == 0
+
+
+@pytest.fixture
+def summarizer(tmp_path, monkeypatch: pytest.MonkeyPatch) -> dict:
+    """LLM呼び出しを置き換え、チャンクを小さくして map/reduce を通す"""
+    cache = SummaryCache(str(tmp_path / "summary_cache"), max_entries=16)
+    state = {"calls": 0, "fail_reduce": False, "cache": cache}
+
+    def fake_summarize(text, use_fallback, system_prompt_template=service.SYSTEM_PROMPT):
+        state["calls"] += 1
+        if system_prompt_template == service.REDUCE_SYSTEM_PROMPT and state["fail_reduce"]:
+            return None
+        return MeetingSummaryOutput(summary=text[:10])
+
+    monkeypatch.setattr(service, "_summarize_text", fake_summarize)
+    monkeypatch.setattr(service, "get_summary_cache", lambda: cache)
+    monkeypatch.setattr(service.settings, "azure_openai_endpoint", "https://example.invalid")
+    monkeypatch.setattr(service.settings, "azure_openai_api_key", "test")
+    monkeypatch.setattr(service.settings, "summary_chunk_max_tokens", 50)
+    return state
+
+
+TEXT = "\n".join(f"発言{i}: 予算と日程について確認しました。" for i in range(40))
+
+
+def test_summary_is_cached_after_successful_reduce(summarizer: dict) -> None:
+    first = service.summarize_meeting(TEXT)
+    calls = summarizer["calls"]
+    second = service.summarize_meeting(TEXT)
+
+    assert calls > 1
+    assert summarizer["calls"] == calls
+    assert second == first
+
+
+def test_reduce_fallback_is_not_cached(summarizer: dict) -> None:
+    summarizer["fail_reduce"] = True
+    service.summarize_meeting(TEXT)
+
+    assert summarizer["cache"].stats()["stores"] == 0
+
+    # 統合に成功した再実行の結果はキャッシュされる
+    summarizer["fail_reduce"] = False
+    service.summarize_meeting(TEXT)
+    assert summarizer["cache"].stats()["stores"] == 1
@@ -0,0 +1,104 @@
+"""自動要約（チェックポイント・スケジューラー）のテスト"""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.meeting_summarizer.schema import MeetingSummaryOutput
+from app.schemas.job import Job
+from app.services import summary_service
+from app.services.meeting_scheduler import MeetingScheduler, SummaryLeaseStore
+from app.services.summary_window import select_delta_window
+from app.storage import DataStore
+
+
+def _job(payload: dict) -> Job:
+    return Job(
+        id="j1", type=summary_service.JOB_SUMMARY, meeting_id="m1", status="running",
+        priority=50, attempts=1, max_attempts=3, payload=payload,
+        created_at="", updated_at="",
+    )
+
+
+def test_summary_job_saves_checkpoint(store: DataStore, monkeypatch: pytest.MonkeyPatch) -> None:
+    """要約API（非同期）で保存した要約にもチェックポイントを記録し、次回は差分だけを要約する"""
+    transcripts = [{"id": f"t{i}", "text": f"発言{i}"} for i in range(3)]
+    store.save_transcripts("m1", transcripts)
+    monkeypatch.setattr(
+        summary_service, "summarize_meeting", lambda text, verbose=False: MeetingSummaryOutput(summary="要約")
+    )
+
+    summary_service._run_summary_job(store, _job({
+        "text": "発言0\n発言1\n発言2",
+        "checkpoint": summary_service.make_checkpoint(transcripts),
+    }))
+
+    assert store.load_summary("m1")["checkpoint"] == {"transcript_count": 3, "last_transcript_id": "t2"}
+    store.append_transcript("m1", {"id": "t3", "text": "発言3"})
+    window = select_delta_window(store, "m1")
+    assert window.has_previous
+    assert [t["id"] for t in window.transcripts] == ["t3"]
+
+
+def test_summary_job_without_checkpoint_resummarizes_all(
+    store: DataStore, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    store.save_transcripts("m1", [{"id": "t0", "text": "発言0"}])
+    monkeypatch.setattr(
+        summary_service, "summarize_meeting", lambda text, verbose=False: MeetingSummaryOutput(summary="要約")
+    )
+
+    summary_service._run_summary_job(store, _job({"text": "発言0"}))
+
+    window = select_delta_window(store, "m1")
+    assert not window.has_previous
+    assert len(window.transcripts) == 1
+
+
+@pytest.fixture
+def leases(tmp_path) -> SummaryLeaseStore:
+    return SummaryLeaseStore(str(tmp_path / "scheduler.sqlite3"))
+
+
+def test_crashed_loop_is_restarted_by_reconcile(
+    store: DataStore, leases: SummaryLeaseStore, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    scheduler = MeetingScheduler(store, leases)
+    runs: list[str] = []
+
+    async def crashing_loop(meeting_id: str) -> None:
+        runs.append(meeting_id)
+        if len(runs) == 1:
+            raise RuntimeError("boom")
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(scheduler, "_run_summary_loop", crashing_loop)
+
+    async def scenario() -> None:
+        await scheduler.start_meeting_scheduler("m1")
+        await asyncio.sleep(0.01)
+        # 異常終了したループは実行中の一覧から外れる
+        assert "m1" not in scheduler.active_meetings
+        assert "m1" not in scheduler.tasks
+
+        await scheduler._reconcile()
+        await asyncio.sleep(0.01)
+        assert "m1" in scheduler.active_meetings
+        assert not scheduler.tasks["m1"].done()
+        scheduler._stop_local_loop("m1")
+
+    asyncio.run(scenario())
+    assert runs == ["m1", "m1"]
+
+
+def test_topic_shift_reaches_owner_on_another_worker(store: DataStore, leases: SummaryLeaseStore) -> None:
+    owner = MeetingScheduler(store, leases)
+    other = MeetingScheduler(store, SummaryLeaseStore(leases.db_path))
+    leases.activate("m1")
+    assert leases.try_acquire("m1", owner.worker_id, 60)
+
+    other.notify_topic_shift("m1")
+
+    assert owner.leases.take_topic_shift("m1")
+    assert not owner.leases.take_topic_shift("m1")
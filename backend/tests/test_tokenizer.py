@@ -0,0 +1,127 @@
+"""トークン数上限でのチャンク分割のテスト"""
+from __future__ import annotations
+
+from itertools import pairwise
+
+import pytest
+
+from app.meeting_summarizer.tokenizer import (
+    EstimateTokenizer,
+    TiktokenTokenizer,
+    chunk_by_tokens,
+    estimate_token_count,
+)
+
+LINES = [
+    "山田: 次の議題に移ります。来週のリリース計画について確認させてください。",
+    "佐藤: テストケースは八割ほど消化していて、残りは金曜日までに終わる見込みです。",
+    "鈴木: APIのレスポンスタイムが500msを超えているので、キャッシュを検討しています。",
+    "田中: デプロイの手順書は release-2024 のページにまとめておきます。",
+]
+
+
+def _transcript(n_lines: int, paragraph_every: int = 0) -> str:
+    lines: list[str] = []
+    for i in range(n_lines):
+        lines.append(f"{i:03d} {LINES[i % len(LINES)]}")
+        if paragraph_every and (i + 1) % paragraph_every == 0:
+            lines.append("")
+    return "\n".join(lines)
+
+
+@pytest.fixture
+def byte_tokenizer() -> TiktokenTokenizer:
+    """1バイト=1トークンのエンコーディング（オフラインで使える tiktoken）"""
+    import tiktoken
+
+    encoding = tiktoken.Encoding(
+        name="bytes",
+        pat_str=r"""[^\n]+|\n""",
+        mergeable_ranks={bytes([i]): i for i in range(256)},
+        special_tokens={},
+    )
+    tokenizer = TiktokenTokenizer.__new__(TiktokenTokenizer)
+    tokenizer.encoding = encoding
+    tokenizer.name = "tiktoken:bytes"
+    return tokenizer
+
+
+def test_short_text_is_single_chunk() -> None:
+    text = _transcript(3)
+    assert chunk_by_tokens(text, 10_000, tokenizer=EstimateTokenizer()) == [text]
+
+
+@pytest.mark.parametrize("max_tokens", [200, 500, 1000])
+def test_estimate_chunks_stay_within_budget(max_tokens: int) -> None:
+    text = _transcript(200, paragraph_every=5)
+    chunks = chunk_by_tokens(text, max_tokens, tokenizer=EstimateTokenizer())
+
+    assert len(chunks) > 1
+    assert all(estimate_token_count(chunk) <= max_tokens for chunk in chunks)
+    # 重なりが無い場合は、チャンクを繋げると元の行がすべて順に並ぶ
+    assert [line for chunk in chunks for line in chunk.split("\n") if line] == [
+        line for line in text.split("\n") if line
+    ]
+
+
+@pytest.mark.parametrize("max_tokens", [256, 1024])
+def test_tiktoken_chunks_stay_within_budget(byte_tokenizer: TiktokenTokenizer, max_tokens: int) -> None:
+    text = _transcript(100, paragraph_every=4)
+    chunks = chunk_by_tokens(text, max_tokens, tokenizer=byte_tokenizer)
+
+    assert len(chunks) > 1
+    assert all(byte_tokenizer.count(chunk) <= max_tokens for chunk in chunks)
+    assert [line for chunk in chunks for line in chunk.split("\n") if line] == [
+        line for line in text.split("\n") if line
+    ]
+
+
+def test_overlap_repeats_tail_lines(byte_tokenizer: TiktokenTokenizer) -> None:
+    text = _transcript(60)
+    max_tokens, overlap_tokens = 800, 250
+    chunks = chunk_by_tokens(text, max_tokens, overlap_tokens, tokenizer=byte_tokenizer)
+
+    assert len(chunks) > 1
+    assert all(byte_tokenizer.count(chunk) <= max_tokens for chunk in chunks)
+    for previous, current in pairwise(chunks):
+        previous_lines = previous.split("\n")
+        current_lines = current.split("\n")
+        shared = [line for line in current_lines if line in previous_lines]
+        # 次のチャンクの先頭は前のチャンクの末尾の行で、重なりは上限以下
+        assert shared and shared == previous_lines[-len(shared):] == current_lines[:len(shared)]
+        assert byte_tokenizer.count("\n".join(shared)) <= overlap_tokens
+    # 重なりを除くと元の行がすべて順に並ぶ
+    seen: list[str] = []
+    for chunk in chunks:
+        seen.extend(line for line in chunk.split("\n") if line not in seen)
+    assert seen == text.split("\n")
+
+
+def test_overlap_is_capped_at_half_budget(byte_tokenizer: TiktokenTokenizer) -> None:
+    text = _transcript(60)
+    chunks = chunk_by_tokens(text, 600, overlap_tokens=10_000, tokenizer=byte_tokenizer)
+
+    assert all(byte_tokenizer.count(chunk) <= 600 for chunk in chunks)
+    # 重なりだけのチャンクができず、必ず先に進む
+    assert len(chunks) < len(text.split("\n"))
+
+
+def test_long_line_is_split_within_budget(byte_tokenizer: TiktokenTokenizer) -> None:
+    long_line = "あ" * 2000  # 1文字=3バイト（3トークン）
+    text = f"{LINES[0]}\n{long_line}\n{LINES[1]}"
+    chunks = chunk_by_tokens(text, 500, tokenizer=byte_tokenizer)
+
+    assert all(byte_tokenizer.count(chunk) <= 500 for chunk in chunks)
+    # 文字の途中で区切らない（重なりが無いため、全チャンクで元の文字数になる）
+    assert sum(chunk.count("あ") for chunk in chunks) == 2000
+    assert "\ufffd" not in "".join(chunks)
+
+
+def test_paragraph_break_preferred(byte_tokenizer: TiktokenTokenizer) -> None:
+    text = _transcript(40, paragraph_every=3)
+    chunks = chunk_by_tokens(text, 700, tokenizer=byte_tokenizer)
+
+    # 段落の区切りが後半にあるため、最後以外のチャンクは段落の終わりで区切られる
+    for chunk in chunks[:-1]:
+        last_index = int(chunk.split("\n")[-1][:3])
+        assert (last_index + 1) % 3 == 0